@@ -1,11 +1,27 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Any, Dict, List, Optional
 
 
 class Settings(BaseSettings):
     # Hugging Face
     huggingface_api_token: str
     huggingface_model: str = "mistralai/Mistral-7B-Instruct-v0.2"
+    huggingface_api_url: str = "https://router.huggingface.co/v1/chat/completions"
+    huggingface_enabled: bool = True  # False to use only inference_backends
+    inference_cache_ttl_hours: int = 168  # Lifetime of cache_inferencias rows
+
+    # Inference backends: any OpenAI-compatible chat completions endpoint (llama.cpp, vLLM, ...)
+    # as JSON, e.g. [{"name": "local", "url": "http://llm:8080/v1/chat/completions", "model": "qwen2.5-7b"}]
+    # ("api_key" and "timeout" are optional)
+    inference_backends: List[Dict[str, Any]] = []
+    inference_timeout_seconds: float = 120.0
+    # A request still unanswered after the backend's p95 latency is hedged on the next backend
+    inference_hedge_delay_seconds: float = 10.0  # Used until a backend has enough latency samples
+    inference_hedge_min_delay_seconds: float = 1.0
+    # Bulk re-inference campaigns (python -m campaigns)
+    campaign_concurrency: int = 4  # Assessments in flight at once
+    campaign_rate_per_minute: float = 30.0  # Assessments started per minute (0 = unlimited)
+    campaign_watch_interval_seconds: int = 60  # How often the API checks for an activated campaign
 
     # Database
     mariadb_host: str = "localhost"
@@ -13,15 +29,58 @@ class Settings(BaseSettings):
     mariadb_database: str = "seismic_db"
     mariadb_user: str = "seismic_user"
     mariadb_password: str
+    database_echo: bool = False  # Log every SQL statement (debug only)
+    database_pool_size: int = 10
+    database_max_overflow: int = 20  # Extra connections opened under burst load
+    database_pool_timeout: int = 30  # Seconds to wait for a free connection
+    database_pool_recycle: int = 1800  # Reconnect before MariaDB's wait_timeout drops the socket
+
+    # Monthly partitions of eventos_sismicos / impactos_pais
+    partition_months_ahead: int = 3  # Future partitions kept ready
+    partition_retention_months: int = 0  # Older partitions move to *_archive tables (0 = keep all)
+
+    # Optional read replica for the read-only API routes (same credentials)
+    mariadb_replica_host: Optional[str] = None
+    mariadb_replica_port: int = 3306
+    replica_max_lag_seconds: float = 30.0  # Events written this recently are read from the primary
 
     # USGS API
     usgs_api_url: str = "https://earthquake.usgs.gov/fdsnws/event/1/query"
-    polling_interval_seconds: int = 180
+    # Summary feed polled with conditional GETs; its band must not exceed min_magnitude_threshold
+    usgs_feed_url: str = "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/4.5_day.geojson"
+    usgs_ingestion_mode: str = "feed"  # "feed" (conditional GET + query gap-fill) or "query"
+    usgs_gap_fill_max_hours: int = 168  # Longest downtime backfilled from the query API
+    polling_interval_seconds: int = 180  # Base interval of the adaptive poll scheduler
+    polling_min_interval_seconds: int = 30  # Used for polling_fast_window_seconds after a significant event
+    polling_max_interval_seconds: int = 600  # Ceiling while no new events arrive
+    polling_significant_magnitude: float = 6.0
+    polling_fast_window_seconds: int = 3600
+    polling_jitter_ratio: float = 0.1  # Random offset per poll, as a fraction of the interval
+    # USGS revisions of stored events that re-run the impact assessment
+    # (smaller ones only update the event row)
+    revision_magnitude_threshold: float = 0.3
+    revision_depth_threshold_km: float = 20.0
+    revision_location_threshold_km: float = 25.0  # Epicenter shift
+    ingestion_cpu_workers: int = 2  # Processes decoding AI responses for the ingestion worker (0 = inline)
 
     # FastAPI
     fastapi_host: str = "0.0.0.0"
     fastapi_port: int = 8000
     cors_origins: str = "http://localhost:3000"
+    ws_replay_buffer_size: int = 500  # new_earthquake messages kept for reconnecting clients
+
+    # Response compression (brotli when installed and accepted, else gzip)
+    compression_minimum_size: int = 1024  # Smaller bodies are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Logging
+    log_level: str = "INFO"
+    log_dir: str = "/app/logs"
+    log_json: bool = True
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_event_sample_rate: float = 0.1  # Fraction of per-event detail logs kept
 
     # Seismic calculation constants
     min_magnitude_threshold: float = 4.5  # Minimum magnitude to process
@@ -35,6 +94,12 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"mysql+aiomysql://{self.mariadb_user}:{self.mariadb_password}@{self.mariadb_host}:{self.mariadb_port}/{self.mariadb_database}"
 
+    @property
+    def replica_database_url(self) -> Optional[str]:
+        if not self.mariadb_replica_host:
+            return None
+        return f"mysql+aiomysql://{self.mariadb_user}:{self.mariadb_password}@{self.mariadb_replica_host}:{self.mariadb_replica_port}/{self.mariadb_database}"
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
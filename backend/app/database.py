@@ -2,27 +2,56 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=True,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
 
-# Create session factory
+def _create_engine(url: str):
+    # No pool_pre_ping: it costs a round-trip per checkout. Connections are
+    # recycled before the server's idle timeout can close them instead.
+    return create_async_engine(
+        url,
+        echo=settings.database_echo,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+    )
+
+
+# Primary: all writes (SeismicProcessor) and startup warm-up
+engine = _create_engine(settings.database_url)
+
+# Read replica for dashboard traffic; falls back to the primary when not configured
+read_engine = _create_engine(settings.replica_database_url) if settings.replica_database_url else engine
+has_replica = read_engine is not engine
+
+# Create session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+def create_primary_engine():
+    """
+    New engine on the primary
+
+    Async drivers bind connections to the event loop that opened them, so
+    code running its own loop (the ingestion worker thread) needs its own pool.
+    """
+    return _create_engine(settings.database_url)
+
+
 # Base class for models
 Base = declarative_base()
 
 
 async def get_db():
-    """Dependency for getting database sessions"""
+    """Dependency for getting database sessions on the primary"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -30,6 +59,15 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Dependency for read-only routes; uses the replica when configured"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Recent response times kept per backend for its p95
+LATENCY_SAMPLES = 50
+
+# Below this many samples the configured default hedge delay is used instead
+MIN_LATENCY_SAMPLES = 5
+
+# A 503 means the model is still loading; wait and ask the same backend again
+MODEL_LOADING_RETRIES = 3
+MODEL_LOADING_WAIT_SECONDS = 20
+
+
+class InferenceBackend:
+    """
+    One OpenAI-compatible chat completions endpoint
+
+    The Hugging Face router, a local llama.cpp or vLLM server and the
+    benchmark stub all speak the same protocol, so a backend is just a URL,
+    a model name and an optional bearer token. Each backend keeps its recent
+    latencies; their p95 ranks backends and sets the hedge delay.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        model: str,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.timeout = float(timeout or settings.inference_timeout_seconds)
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.wins = 0
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < MIN_LATENCY_SAMPLES:
+            return None
+        samples = sorted(self.latencies)
+        return samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this backend before asking the next one"""
+        p95 = self.p95()
+        delay = p95 if p95 is not None else settings.inference_hedge_delay_seconds
+        return max(delay, settings.inference_hedge_min_delay_seconds)
+
+    def score(self) -> float:
+        """Routing cost, lower is tried first; each consecutive failure doubles it"""
+        return self.hedge_delay() * 2 ** min(self.consecutive_failures, 6)
+
+    def record_latency(self, seconds: float):
+        self.latencies.append(seconds)
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+
+    async def complete(self, client: httpx.AsyncClient, messages: List[Dict[str, str]], **params: Any) -> bytes:
+        """POST a chat completion and return the raw response body"""
+        self.requests += 1
+        for attempt in range(MODEL_LOADING_RETRIES + 1):
+            response = await client.post(
+                self.url,
+                headers=self.headers,
+                json={"model": self.model, "messages": messages, **params},
+                timeout=self.timeout,
+            )
+            if response.status_code != 503 or attempt == MODEL_LOADING_RETRIES:
+                break
+            logger.warning(f"Model on {self.name} is loading, retrying in {MODEL_LOADING_WAIT_SECONDS} seconds...")
+            await asyncio.sleep(MODEL_LOADING_WAIT_SECONDS)
+        response.raise_for_status()
+        return response.content
+
+    def status(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "name": self.name,
+            "model": self.model,
+            "requests": self.requests,
+            "failures": self.failures,
+            "wins": self.wins,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "hedge_delay_seconds": round(self.hedge_delay(), 3),
+        }
+
+
+def load_backends() -> List[InferenceBackend]:
+    """The Hugging Face router (unless disabled) plus every INFERENCE_BACKENDS entry"""
+    backends = []
+    if settings.huggingface_enabled:
+        backends.append(InferenceBackend(
+            "huggingface",
+            settings.huggingface_api_url,
+            settings.huggingface_model or "Qwen/Qwen2.5-7B-Instruct",
+            settings.huggingface_api_token,
+        ))
+    for index, entry in enumerate(settings.inference_backends):
+        backends.append(InferenceBackend(
+            entry.get("name") or f"backend-{index + 1}",
+            entry["url"],
+            entry.get("model") or settings.huggingface_model,
+            entry.get("api_key"),
+            entry.get("timeout"),
+        ))
+    if not backends:
+        logger.warning("No inference backends configured, every assessment will use the fallback")
+    return backends
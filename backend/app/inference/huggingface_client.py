@@ -1,28 +1,84 @@
 import httpx
-import json
+import orjson
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+import time
+from concurrent.futures import Executor
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set, Tuple
 from app.config import settings
+from app.inference.backends import InferenceBackend, load_backends
+from app.inference.impact_schema import FieldIssue, extract_json_array, validate_impacts
+from app.inference.inference_cache import InferenceCache, cache_key
+from app.metrics import (
+    AI_RESPONSE_FIELD_ISSUES,
+    INFERENCE_BACKEND_FAILURES,
+    INFERENCE_CACHE_HITS,
+    INFERENCE_FALLBACKS,
+    INFERENCE_HEDGE_WINS,
+    INFERENCE_HEDGES,
+    INFERENCE_SECONDS,
+    PARSE_FAILURES,
+)
 
 logger = logging.getLogger(__name__)
 
+# Stored with every impact row; bump whenever the system or user prompt changes
+PROMPT_VERSION = "1"
+
+# modelo_ia of the rule-based estimate used when no backend answers
+FALLBACK_MODEL = "fallback"
+
+
+def decode_completion(body: bytes) -> Tuple[str, str, Optional[List[Dict[str, Any]]], List[FieldIssue]]:
+    """
+    Decode a chat completion body and validate the impact array inside its content
+
+    Module-level and side-effect free so it can run in a process pool.
+    Returns (model, generated text, valid impact entries or None if no JSON
+    array was found, field issues found by validation).
+    """
+    result = orjson.loads(body)
+    text = result.get("choices", [{}])[0].get("message", {}).get("content") or ""
+    parsed = extract_json_array(text)
+    if parsed is None:
+        return result.get("model", "unknown"), text, None, []
+    impacts, issues = validate_impacts(parsed)
+    return result.get("model", "unknown"), text, impacts, issues
+
 
 class HuggingFaceInferenceClient:
     """
-    Client for Hugging Face Chat Completion API
+    Client for OpenAI-compatible chat completion APIs (Hugging Face router by default)
     Uses chat models to infer seismic impact with real-world context
+
+    Requests are hedged across ``backends``: the fastest one by recent p95
+    is asked first, and if it has not produced a valid assessment after
+    its p95 latency (or fails), the next one is asked too. The first
+    response with a valid impact entry (see impact_schema) wins and the
+    others are cancelled, so one slow backend no longer sets the tail
+    latency.
     """
 
-    def __init__(self):
-        self.api_token = settings.huggingface_api_token
+    def __init__(self, cpu_executor: Optional[Executor] = None, backends: Optional[List[InferenceBackend]] = None):
+        # Response decoding runs here when set (a process pool in the ingestion worker)
+        self.cpu_executor = cpu_executor
+        self.cache = InferenceCache()
+        # Kept open so consecutive inferences reuse the TLS connections
+        self._client: Optional[httpx.AsyncClient] = None
+        # Part of the cache key, so assessments cached before backends existed stay valid
         self.model = settings.huggingface_model or "Qwen/Qwen2.5-7B-Instruct"
-        # New chat completion endpoint
-        self.api_url = "https://router.huggingface.co/v1/chat/completions"
-        self.headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "application/json"
-        }
+        self.backends = backends if backends is not None else load_backends()
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.inference_timeout_seconds)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def infer_impact(
         self,
@@ -48,57 +104,120 @@ class HuggingFaceInferenceClient:
             latitud, longitud, magnitud, profundidad, radio_km, lugar, historical_context
         )
 
-        try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json={
-                        "model": self.model,
-                        "messages": [
-                            {"role": "system", "content": system_message},
-                            {"role": "user", "content": user_message}
-                        ],
-                        "max_tokens": 2500,
-                        "temperature": 0.3,
-                        "top_p": 0.9,
-                    },
-                )
+        key = cache_key(self.model, system_message, user_message)
+        cached = self.cache.get(key)
+        if cached is not None:
+            INFERENCE_CACHE_HITS.inc()
+            return cached
 
-                if response.status_code == 503:
-                    # Model is loading, wait and retry
-                    logger.warning("Model is loading, retrying in 20 seconds...")
-                    await asyncio.sleep(20)
-                    return await self.infer_impact(latitud, longitud, magnitud, profundidad, radio_km, lugar)
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+        try:
+            with INFERENCE_SECONDS.time():
+                parsed_impacts = await self._hedged_completion(messages)
+        except Exception as e:
+            logger.error(f"Error calling inference backends: {e}")
+            parsed_impacts = None
 
-                response.raise_for_status()
-                result = response.json()
+        if not parsed_impacts:
+            logger.warning("No backend returned a valid assessment, using fallback")
+            return self._fallback_estimation(latitud, longitud, magnitud, profundidad, radio_km)
 
-                # Extract generated text from chat completion response
-                generated_text = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        # Apply post-processing to fix unrealistic estimates
+        parsed_impacts = self._apply_magnitude_based_corrections(parsed_impacts, magnitud, profundidad)
 
-                logger.info(f"Received response from HF API. Model: {result.get('model', 'unknown')}")
-                logger.debug(f"Generated text: {generated_text[:200]}...")
+        self.cache.put(key, parsed_impacts)
+        return parsed_impacts
 
-                # Parse JSON from response
-                parsed_impacts = self._parse_ai_response(generated_text)
+    async def _hedged_completion(self, messages: List[Dict[str, str]]) -> Optional[List[Dict[str, Any]]]:
+        """Validated impacts from the first backend to answer with any, or None"""
+        ranked = sorted(self.backends, key=InferenceBackend.score)
+        pending: Set[asyncio.Task] = set()
+        launched = 0
 
-                if not parsed_impacts:
-                    logger.warning("AI returned empty or invalid response, using fallback")
-                    return self._fallback_estimation(latitud, longitud, magnitud, profundidad, radio_km)
+        def launch():
+            nonlocal launched
+            pending.add(asyncio.create_task(self._attempt(ranked[launched], messages)))
+            launched += 1
 
-                # Apply post-processing to fix unrealistic estimates
-                parsed_impacts = self._apply_magnitude_based_corrections(parsed_impacts, magnitud, profundidad)
+        if not ranked:
+            return None
+        launch()
+        try:
+            while pending:
+                # The next backend is asked once the latest one exceeds its p95
+                timeout = ranked[launched - 1].hedge_delay() if launched < len(ranked) else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    INFERENCE_HEDGES.inc()
+                    logger.info(f"Hedging inference on {ranked[launched].name} after {timeout:.1f}s")
+                    launch()
+                    continue
+
+                for task in done:
+                    backend, impacts = task.result()
+                    if impacts:
+                        backend.wins += 1
+                        for impact in impacts:
+                            impact["modelo_ia"] = backend.model
+                        if backend is not ranked[0]:
+                            INFERENCE_HEDGE_WINS.inc()
+                        return impacts
+                # Everything that finished failed: do not wait out the delay
+                if launched < len(ranked):
+                    launch()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(
+        self, backend: InferenceBackend, messages: List[Dict[str, str]]
+    ) -> Tuple[InferenceBackend, List[Dict[str, Any]]]:
+        """One request to one backend; failures return no impacts instead of raising"""
+        start = time.perf_counter()
+        try:
+            body = await backend.complete(
+                self._http(), messages, max_tokens=2500, temperature=0.3, top_p=0.9
+            )
+            backend.record_latency(time.perf_counter() - start)
+
+            # Extract and validate the impacts in the chat completion response
+            if self.cpu_executor is not None:
+                model, generated_text, impacts, issues = await asyncio.get_running_loop().run_in_executor(
+                    self.cpu_executor, decode_completion, body
+                )
+            else:
+                model, generated_text, impacts, issues = decode_completion(body)
 
-                return parsed_impacts
+            logger.info(f"Received response from {backend.name}. Model: {model}")
+            logger.debug(f"Generated text: {generated_text[:200]}...")
 
+            if impacts is None:
+                PARSE_FAILURES.inc()
+                logger.warning("No JSON array found in AI response")
+                logger.debug(f"Raw response: {generated_text}")
+                impacts = []
+            else:
+                self._record_issues(issues)
+                logger.info(f"Successfully parsed {len(impacts)} impact assessments from AI")
+        except asyncio.CancelledError:
+            # Lost the race; the time waited is still a lower bound on its latency
+            backend.latencies.append(time.perf_counter() - start)
+            raise
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error calling Hugging Face API: {e.response.status_code} - {e.response.text}")
-            return self._fallback_estimation(latitud, longitud, magnitud, profundidad, radio_km)
+            logger.error(f"HTTP error calling {backend.name}: {e.response.status_code} - {e.response.text[:200]}")
+            impacts = []
         except Exception as e:
-            logger.error(f"Error calling Hugging Face API: {e}")
-            # Return fallback estimation
-            return self._fallback_estimation(latitud, longitud, magnitud, profundidad, radio_km)
+            logger.error(f"Error calling {backend.name}: {e}")
+            impacts = []
+
+        if not impacts:
+            backend.record_failure()
+            INFERENCE_BACKEND_FAILURES.inc()
+        return backend, impacts
 
     def _build_system_message(self) -> str:
         """Build system message for the AI"""
@@ -210,87 +329,16 @@ Analyze now:"""
 
         return prompt
 
-    def _parse_ai_response(self, text: str) -> List[Dict[str, Any]]:
-        """Parse JSON from AI response"""
-        try:
-            # Try to find JSON array in the response
-            start_idx = text.find("[")
-            end_idx = text.rfind("]") + 1
-
-            if start_idx == -1 or end_idx == 0:
-                logger.warning("No JSON array found in AI response")
-                return []
-
-            json_text = text[start_idx:end_idx]
-            parsed = json.loads(json_text)
-
-            # Validate structure
-            if not isinstance(parsed, list):
-                logger.warning("AI response is not a list")
-                return []
-
-            # Validate each impact entry
-            validated = []
-            for impact in parsed:
-                if self._validate_impact_structure(impact):
-                    validated.append(impact)
-
-            logger.info(f"Successfully parsed {len(validated)} impact assessments from AI")
-            return validated
-
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            logger.debug(f"Raw response: {text}")
-            return []
-        except Exception as e:
-            logger.error(f"Error parsing AI response: {e}")
-            logger.debug(f"Raw response: {text}")
-            return []
-
-    def _validate_impact_structure(self, impact: Dict[str, Any]) -> bool:
-        """Validate that impact has required fields"""
-        required_fields = [
-            "pais",
-            "ciudades_afectadas",
-            "muertes_estimadas",
-            "heridos_estimados",
-            "perdidas_monetarias_usd",
-            "nivel_destruccion",
-        ]
-
-        for field in required_fields:
-            if field not in impact:
-                logger.warning(f"Impact entry missing required field: {field}")
-                return False
-
-        # Validate nivel_destruccion values and normalize to uppercase
-        valid_levels = ["BAJO", "MODERADO", "ALTO", "CATASTROFICO"]
-        nivel = str(impact.get("nivel_destruccion", "")).upper()
-        if nivel not in valid_levels:
-            logger.warning(f"Invalid nivel_destruccion: {impact.get('nivel_destruccion')}, defaulting to BAJO")
-            impact["nivel_destruccion"] = "BAJO"
-        else:
-            impact["nivel_destruccion"] = nivel
-
-        # Ensure ciudades_afectadas is a list
-        if not isinstance(impact.get("ciudades_afectadas"), list):
-            impact["ciudades_afectadas"] = [str(impact.get("ciudades_afectadas", "Unknown"))]
-
-        # Ensure fuentes_inferidas is a list (optional field)
-        if "fuentes_inferidas" in impact and not isinstance(impact.get("fuentes_inferidas"), list):
-            impact["fuentes_inferidas"] = [str(impact.get("fuentes_inferidas", "AI inference"))]
-        elif "fuentes_inferidas" not in impact:
-            impact["fuentes_inferidas"] = ["AI analysis"]
-
-        # Ensure factores_considerados is a list (new field, optional)
-        if "factores_considerados" in impact and not isinstance(impact.get("factores_considerados"), list):
-            impact["factores_considerados"] = [str(impact.get("factores_considerados"))]
-        elif "factores_considerados" not in impact:
-            impact["factores_considerados"] = ["Standard seismic analysis"]
-
-        # razonamiento and codigo_construccion are optional text fields - no validation needed
-
-        return True
+    @staticmethod
+    def _record_issues(issues: List[FieldIssue]):
+        if not issues:
+            return
+        for (field, issue_type), count in Counter(issues).items():
+            AI_RESPONSE_FIELD_ISSUES.inc(field, issue_type, amount=count)
+        logger.warning(
+            "AI response validation issues: %s",
+            ", ".join(f"{field} ({issue_type})" for field, issue_type in issues),
+        )
 
     def _apply_magnitude_based_corrections(
         self, impacts: List[Dict[str, Any]], magnitud: float, profundidad: float
@@ -394,6 +442,7 @@ Analyze now:"""
         self, latitud: float, longitud: float, magnitud: float, profundidad: float, radio_km: float
     ) -> List[Dict[str, Any]]:
         """Fallback estimation when AI fails"""
+        INFERENCE_FALLBACKS.inc()
         logger.info("Using fallback estimation for earthquake impact")
 
         # Simple rule-based estimation
@@ -427,5 +476,6 @@ Analyze now:"""
                 "fuentes_inferidas": ["Fallback estimation - AI unavailable"],
                 "nivel_preparacion_sismica": "Media",
                 "densidad_poblacional": "Media",
+                "modelo_ia": FALLBACK_MODEL,
             }
         ]
@@ -0,0 +1,214 @@
+import json
+import re
+from typing import Any, Dict, List, Literal, Optional, Set, Tuple
+import orjson
+from pydantic import BaseModel, BeforeValidator, ConfigDict, StringConstraints, TypeAdapter, ValidationError, ValidationInfo
+from typing_extensions import Annotated, NotRequired, TypedDict
+
+# (field, error type) of every problem found in a response, for the metrics
+FieldIssue = Tuple[str, str]
+
+NIVELES_DESTRUCCION = ("BAJO", "MODERADO", "ALTO", "CATASTROFICO")
+
+# Start of an array of objects; skips "[" in prose before the JSON
+_ARRAY_START = re.compile(r"\[\s*[{\]]")
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",(\s*[\]}])")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+_decoder = json.JSONDecoder()
+
+
+def _report(info: ValidationInfo, field: str, issue: str):
+    if info.context is not None:
+        info.context["issues"].append((field, issue))
+
+
+def _nivel(value: Any, info: ValidationInfo) -> str:
+    nivel = str(value).strip().upper()
+    if nivel not in NIVELES_DESTRUCCION:
+        _report(info, "nivel_destruccion", "defaulted")
+        return "BAJO"
+    return nivel
+
+
+def _count(value: Any) -> Any:
+    """Integers from the number formats models write ("1,200", "50-100", 3.0)"""
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        match = _NUMBER.search(value.replace(",", "").replace("_", ""))
+        if match:
+            return int(float(match.group()))
+    return value
+
+
+def _string_list(value: Any) -> Any:
+    if value is None or isinstance(value, list):
+        return value
+    return [str(value)]
+
+
+def _text(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+Count = Annotated[int, BeforeValidator(_count)]
+StringList = Annotated[List[str], BeforeValidator(_string_list)]
+Text = Annotated[Optional[str], BeforeValidator(_text)]
+Pais = Annotated[str, StringConstraints(min_length=1)]
+NivelDestruccion = Literal["BAJO", "MODERADO", "ALTO", "CATASTROFICO"]
+
+
+class ImpactEntry(TypedDict):
+    """
+    One country entry of an AI impact response, as stored in impactos_pais
+
+    Only native pydantic-core types, so well-formed responses validate
+    without calling back into Python and come out as plain dicts.
+    """
+
+    __pydantic_config__ = ConfigDict(str_strip_whitespace=True, coerce_numbers_to_str=True)
+
+    pais: Pais
+    ciudades_afectadas: List[str]
+    muertes_estimadas: int
+    heridos_estimados: int
+    perdidas_monetarias_usd: int
+    nivel_destruccion: NivelDestruccion
+    fuentes_inferidas: NotRequired[List[str]]
+    factores_considerados: NotRequired[List[str]]
+    razonamiento: NotRequired[str]
+    codigo_construccion: NotRequired[str]
+    nivel_preparacion_sismica: NotRequired[str]
+    densidad_poblacional: NotRequired[str]
+
+
+class ImpactAssessment(BaseModel):
+    """The same entry with coercions, for the entries ImpactEntry rejects"""
+
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True, coerce_numbers_to_str=True)
+
+    pais: Pais
+    ciudades_afectadas: StringList
+    muertes_estimadas: Count
+    heridos_estimados: Count
+    perdidas_monetarias_usd: Count
+    nivel_destruccion: Annotated[NivelDestruccion, BeforeValidator(_nivel)]
+    fuentes_inferidas: Optional[StringList] = None
+    factores_considerados: Optional[StringList] = None
+    razonamiento: Text = None
+    codigo_construccion: Text = None
+    nivel_preparacion_sismica: Text = None
+    densidad_poblacional: Text = None
+
+
+# Compiled once; a well-formed response is a single call into pydantic-core
+_entries_adapter = TypeAdapter(List[ImpactEntry])
+_entry_adapter = TypeAdapter(ImpactEntry)
+_tolerant_adapter = TypeAdapter(ImpactAssessment)
+
+
+def extract_json_array(text: str) -> Optional[List[Any]]:
+    """
+    The JSON array in a model's reply, or None
+
+    Tries, cheapest first (orjson before the stdlib decoder): the whole
+    reply (models that follow the instructions), the contents of a ```json
+    fence, then every "[{" in the text up to the last "]" or, with
+    raw_decode, up to wherever the array ends so trailing prose is ignored,
+    and finally the same with trailing commas removed. A lone object
+    becomes a one-element list.
+    """
+    stripped = text.strip()
+    if stripped[:1] in ("[", "{"):
+        try:
+            return _as_list(orjson.loads(stripped))
+        except orjson.JSONDecodeError:
+            pass
+
+    fence = _FENCE.search(text)
+    if fence:
+        try:
+            return _as_list(orjson.loads(fence.group(1)))
+        except orjson.JSONDecodeError:
+            text = fence.group(1)
+
+    end = text.rfind("]") + 1
+    for match in _ARRAY_START.finditer(text):
+        try:
+            # Usually the array runs to the last "]"
+            return orjson.loads(text[match.start():end])
+        except orjson.JSONDecodeError:
+            pass
+        try:
+            return _decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            pass
+
+    repaired = _TRAILING_COMMA.sub(r"\1", text)
+    for match in _ARRAY_START.finditer(repaired):
+        try:
+            return _decoder.raw_decode(repaired, match.start())[0]
+        except ValueError:
+            pass
+    return None
+
+
+def _as_list(parsed: Any) -> Optional[List[Any]]:
+    if isinstance(parsed, list):
+        return parsed
+    if isinstance(parsed, dict):
+        return [parsed]
+    return None
+
+
+def validate_impacts(parsed: List[Any]) -> Tuple[List[Dict[str, Any]], List[FieldIssue]]:
+    """
+    Entries of a parsed response that match the impact schema, as plain dicts
+
+    The whole array goes through the native ImpactEntry schema first. Only
+    if that fails are the offending entries retried with ImpactAssessment's
+    coercions (lowercase levels, "1,200", a string instead of a list);
+    fields fixed that way are reported as "coerced", and entries that still
+    fail are dropped, not the whole response. Returns the valid entries and
+    the issues found.
+    """
+    issues: List[FieldIssue] = []
+    try:
+        impacts = _entries_adapter.validate_python(parsed)
+    except ValidationError as e:
+        # entry index -> fields the native schema rejected
+        failed: Dict[int, Set[str]] = {}
+        for error in e.errors():
+            loc = error["loc"]
+            failed.setdefault(loc[0], set()).add(_field_of(loc[1:]))
+
+        impacts = []
+        for index, entry in enumerate(parsed):
+            if index not in failed:
+                impacts.append(_entry_adapter.validate_python(entry))
+                continue
+            reported: List[FieldIssue] = []
+            try:
+                impact = _tolerant_adapter.validate_python(entry, context={"issues": reported})
+            except ValidationError as entry_error:
+                issues.extend((_field_of(error["loc"]), error["type"]) for error in entry_error.errors())
+                continue
+            issues.extend(reported)
+            issues.extend((field, "coerced") for field in failed[index] - {field for field, _ in reported})
+            impacts.append(impact.model_dump(exclude_none=True))
+
+    for impact in impacts:
+        impact.setdefault("fuentes_inferidas", ["AI analysis"])
+        impact.setdefault("factores_considerados", ["Standard seismic analysis"])
+    return impacts, issues
+
+
+def _field_of(loc: Tuple[Any, ...]) -> str:
+    # Empty when the entry itself is not an object
+    return str(loc[0]) if loc else "(entry)"
@@ -0,0 +1,83 @@
+import copy
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.seismic_event import CacheInferencia
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(*parts: str) -> str:
+    """sha256 of the model and prompt, the cache_inferencias.hash_consulta value"""
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+class InferenceCache:
+    """
+    Parsed AI impact assessments keyed by prompt hash
+
+    An in-memory LRU in front of the cache_inferencias table. Entries are
+    preloaded at startup, so repeated prompts (an event processed again
+    after a failed commit or a restart) skip the model round-trip. New
+    entries are queued and written by ``flush`` on the caller's session.
+    """
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._pending: List[Tuple[str, List[Dict[str, Any]]]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def load(self, db: AsyncSession):
+        """Drop expired rows and preload the most recent live ones"""
+        now = datetime.utcnow()
+        await db.execute(delete(CacheInferencia).where(CacheInferencia.expires_at < now))
+        await db.commit()
+
+        result = await db.execute(
+            select(CacheInferencia.hash_consulta, CacheInferencia.respuesta_ia)
+            .order_by(CacheInferencia.id.desc())
+            .limit(self.max_entries)
+        )
+        self._entries.clear()
+        for key, impacts in reversed(result.all()):
+            if isinstance(impacts, list):
+                self._entries[key] = impacts
+        logger.info(f"Inference cache preloaded with {len(self._entries)} entries")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        impacts = self._entries.get(key)
+        if impacts is None:
+            return None
+        self._entries.move_to_end(key)
+        # Callers post-process impacts in place
+        return copy.deepcopy(impacts)
+
+    def put(self, key: str, impacts: List[Dict[str, Any]]):
+        if key in self._entries:
+            return
+        self._entries[key] = copy.deepcopy(impacts)
+        self._pending.append((key, self._entries[key]))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def flush(self, db: AsyncSession):
+        """Persist entries added since the last flush; failures are only logged"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        expires_at = datetime.utcnow() + timedelta(hours=settings.inference_cache_ttl_hours)
+        try:
+            for key, impacts in pending:
+                db.add(CacheInferencia(hash_consulta=key, respuesta_ia=impacts, expires_at=expires_at))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Could not persist {len(pending)} inference cache entries: {e}")
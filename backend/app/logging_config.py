@@ -0,0 +1,160 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from app.config import settings
+
+LOG_FILE_NAME = "seismic_system.log"
+
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None)).keys()
+) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Render log records as one JSON object per line
+    Fields passed through ``extra=`` are kept as top-level keys
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class EventDetailSampler(logging.Filter):
+    """
+    Keep only a fraction of per-event detail records
+
+    Records logged with ``extra={"event_detail": True}`` below WARNING are
+    sampled at ``rate``; everything else passes through untouched.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "event_detail", False) or record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the handlers' formatting to the listener thread
+
+    The stock handler runs the full formatter before enqueueing. Here the
+    caller's thread only interpolates the message and, when there is one,
+    renders the traceback to text (traceback objects must not outlive the
+    frames they reference); the console layout, JSON encoding and file I/O
+    run on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Configure root logging so no handler does I/O on the event loop thread
+
+    Records are pushed onto an in-memory queue and written by a
+    QueueListener thread to the console and a size-rotated JSON file.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    handlers = [console_handler]
+    file_error = None
+
+    log_dir = Path(settings.log_dir)
+    try:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_dir / LOG_FILE_NAME,
+            maxBytes=settings.log_max_bytes,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JSONFormatter() if settings.log_json else console_handler.formatter)
+        handlers.append(file_handler)
+    except OSError as e:
+        file_error = e
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(EventDetailSampler(settings.log_event_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    if file_error is not None:
+        logging.getLogger(__name__).warning(f"File logging disabled, cannot write to {log_dir}: {file_error}")
+    return _listener
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the listener thread
+
+    The queue handler is then replaced on the root logger by the listener's
+    handlers, so records logged afterwards (late shutdown messages) are
+    written directly instead of queued with nobody left to write them.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _NonBlockingQueueHandler):
+            root.removeHandler(handler)
+            for direct in _listener.handlers:
+                for log_filter in handler.filters:
+                    direct.addFilter(log_filter)
+                root.addHandler(direct)
+    _listener = None
+
+
+def log_file_path() -> str:
+    """Path of the active JSON log file"""
+    return str(Path(settings.log_dir) / LOG_FILE_NAME)
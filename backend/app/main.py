@@ -1,91 +1,230 @@
+import time
+
+# Time-to-ready is measured from the moment the app module starts loading
+STARTUP_BEGIN = time.perf_counter()
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 import logging
 from datetime import datetime
-from pathlib import Path
+from typing import Dict, Optional
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.compression import CompressionMiddleware
 from app.config import settings
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, engine, read_engine
+from app.logging_config import setup_logging, shutdown_logging, log_file_path
+from app.metrics import TIME_TO_READY_SECONDS, render_metrics
+from app.models.seismic_event import CampaniaInferencia
+from app.responses import FastJSONResponse
 from app.routes import events, websocket
-from app.services.seismic_processor import SeismicProcessor
-
-# Create logs directory if it doesn't exist
-log_dir = Path("/app/logs")
-log_dir.mkdir(exist_ok=True)
-
-# Configure logging with both console and file
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Console output
-        logging.FileHandler(f"/app/logs/seismic_system_{datetime.now().strftime('%Y-%m-%d')}.log")  # File output
-    ]
-)
+from app.services.event_store import event_store
+from app.services.ingestion_worker import ingestion_worker
+from app.services.read_models import record_committed_event, record_revised_event
+from app.services.stats_aggregator import stats_aggregator
+from app.services.tile_index import tile_index
+
+IMPORT_SECONDS = time.perf_counter() - STARTUP_BEGIN
+
+# Console and rotating JSON file output, written off the event loop thread
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Background task control
 background_task = None
+partition_task = None
+startup_task = None
+campaign_task = None
+
+# Warm-up steps gating /ready: name -> "pending" | "ok" | "failed"
+startup_components: Dict[str, str] = {
+    "database_pool": "pending",
+    "stats_aggregator": "pending",
+    "tile_index": "pending",
+    "event_store": "pending",
+    "ingestion_worker": "pending",
+}
+time_to_ready: Optional[float] = None
+
+# How often monthly partitions are pre-created and retention applied
+PARTITION_MAINTENANCE_SECONDS = 24 * 60 * 60
+
+# Window of the stats_update messages pushed after each poll (dashboard default)
+STATS_PUSH_DAYS = 30
+
+
+def mark_started(component: str, status: str = "ok"):
+    """Record a finished warm-up step; the last one flips /ready"""
+    global time_to_ready
+    startup_components[component] = status
+    if time_to_ready is None and "pending" not in startup_components.values():
+        time_to_ready = time.perf_counter() - STARTUP_BEGIN
+        TIME_TO_READY_SECONDS.set(time_to_ready)
+        logger.info(
+            f"🚀 Ready in {time_to_ready:.2f}s (imports {IMPORT_SECONDS:.2f}s)",
+            extra={"time_to_ready_s": round(time_to_ready, 3), "import_s": round(IMPORT_SECONDS, 3)},
+        )
+
+
+async def prewarm_pool(pool_engine: AsyncEngine, size: int):
+    """Open ``size`` connections at once so the first requests skip the handshake"""
+    async def touch():
+        async with pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(touch() for _ in range(size)))
+
+
+async def warm_database_pool():
+    try:
+        await prewarm_pool(engine, settings.database_pool_size)
+        if read_engine is not engine:
+            await prewarm_pool(read_engine, settings.database_pool_size)
+        mark_started("database_pool")
+    except Exception as e:
+        logger.error(f"Could not pre-warm the database pool: {e}")
+        mark_started("database_pool", "failed")
+
+
+async def warm_stats_aggregator():
+    """Load recent events into the in-memory stats aggregator"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await stats_aggregator.warm(db)
+        mark_started("stats_aggregator")
+    except Exception as e:
+        logger.error(f"Could not warm stats aggregator, stats will be served from SQL: {e}")
+        mark_started("stats_aggregator", "failed")
 
 
-async def polling_task():
+async def warm_tile_index():
+    """Index stored events for the map tile endpoint"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await tile_index.warm(db)
+        mark_started("tile_index")
+    except Exception as e:
+        logger.error(f"Could not warm tile index, tiles will be built from SQL: {e}")
+        mark_started("tile_index", "failed")
+
+
+async def warm_event_store():
+    """Load stored events into the columnar store behind GET /api/events/"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await event_store.warm(db)
+        mark_started("event_store")
+    except Exception as e:
+        logger.error(f"Could not load event store, event lists will be queried from SQL: {e}")
+        mark_started("event_store", "failed")
+
+
+async def warm_up():
     """
-    Background task that polls USGS API for new earthquakes
-    Logs every poll attempt with detailed information
+    Startup warm-up, run in the background so the server accepts requests
+    (and answers /health) immediately; /ready turns true once it is done.
+    The ingestion worker preloads its own state and reports back.
     """
-    logger.info("=" * 80)
-    logger.info("🌍 EARTHQUAKE POLLING TASK STARTED")
-    logger.info(f"   Polling interval: {settings.polling_interval_seconds} seconds")
-    logger.info(f"   Minimum magnitude threshold: {settings.min_magnitude_threshold}")
-    logger.info(f"   USGS API: {settings.usgs_api_url}")
-    logger.info("=" * 80)
+    await warm_database_pool()
+    await asyncio.gather(warm_stats_aggregator(), warm_tile_index(), warm_event_store())
 
-    processor = SeismicProcessor()
-    poll_count = 0
 
+async def dispatch_worker_messages():
+    """
+    Apply results from the ingestion worker on the API loop
+    Updates in-memory read models and notifies WebSocket clients
+    """
     while True:
-        poll_count += 1
-        poll_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+        kind, payload = await ingestion_worker.outbox.get()
         try:
-            logger.info("")
-            logger.info("-" * 80)
-            logger.info(f"📡 POLL #{poll_count} - {poll_time}")
-            logger.info(f"   Querying USGS API for new earthquakes (mag >= {settings.min_magnitude_threshold})...")
+            if kind == "committed":
+                record_committed_event(*payload)
+                continue
+            if kind == "revised":
+                record_revised_event(*payload)
+                continue
+            if kind == "ready":
+                logger.info(f"Ingestion worker warmed up: {payload}")
+                mark_started("ingestion_worker")
+                continue
 
-            async with AsyncSessionLocal() as db:
-                start_time = datetime.now()
-                processed_ids = await processor.process_new_earthquakes(db)
-                elapsed_time = (datetime.now() - start_time).total_seconds()
-
-                if processed_ids:
-                    logger.info(f"   ✅ SUCCESS: Processed {len(processed_ids)} new earthquake(s) in {elapsed_time:.2f}s")
-
-                    # Log details for each processed event
-                    for idx, event_id in enumerate(processed_ids, 1):
-                        event_data = await processor.get_event_with_impacts(db, event_id)
-                        if event_data:
-                            mag = event_data.get('magnitud', 'N/A')
-                            lugar = event_data.get('lugar', 'Unknown location')
-                            logger.info(f"      [{idx}] Event: {event_id} | Magnitude: {mag} | Location: {lugar}")
-
-                            # Notify WebSocket clients
-                            await websocket.notify_new_earthquake(event_data)
-                            logger.info(f"      [{idx}] WebSocket notification sent")
+            for event_id, event_data in payload.items():
+                # Notify WebSocket clients
+                if kind == "updated":
+                    await websocket.notify_earthquake_updated(event_data)
                 else:
-                    logger.info(f"   ℹ️  No new earthquakes found in {elapsed_time:.2f}s")
+                    await websocket.notify_new_earthquake(event_data)
+                logger.info(
+                    "Event %s notified (mag %s, %s)",
+                    event_id,
+                    event_data["event"]["magnitud"],
+                    event_data["event"]["lugar"],
+                    extra={"event_detail": True, "event_id": event_id},
+                )
+
+            if stats_aggregator.ready:
+                await websocket.notify_stats_update(stats_aggregator.summary(STATS_PUSH_DAYS))
+        except Exception as e:
+            logger.error(f"❌ Error dispatching {kind} message from ingestion worker: {e}", exc_info=True)
 
-            logger.info(f"   Next poll in {settings.polling_interval_seconds} seconds")
-            logger.info("-" * 80)
 
+async def partition_maintenance_task():
+    """Daily job keeping future monthly partitions ready and archiving expired ones"""
+    from app.services.partitions import maintain_partitions
+
+    while True:
+        try:
+            async with engine.begin() as conn:
+                await maintain_partitions(
+                    conn,
+                    settings.partition_months_ahead,
+                    settings.partition_retention_months,
+                )
+            if settings.partition_retention_months > 0:
+                # Archived events must drop out of the event lists and the map
+                # (the stats aggregator evicts old buckets on its own)
+                async with AsyncSessionLocal() as db:
+                    if event_store.ready:
+                        await event_store.warm(db)
+                    if tile_index.ready:
+                        await tile_index.warm(db)
         except Exception as e:
-            logger.error(f"   ❌ ERROR in polling task: {e}", exc_info=True)
-            logger.info(f"   Retrying in {settings.polling_interval_seconds} seconds...")
-            logger.info("-" * 80)
+            logger.error(f"❌ Partition maintenance failed: {e}", exc_info=True)
+        await asyncio.sleep(PARTITION_MAINTENANCE_SECONDS)
+
+
+async def campaign_activation_task():
+    """
+    Rebuild the stats aggregator when a re-inference campaign is activated
+
+    Campaigns run and switch the served impacts from `python -m campaigns`,
+    another process, so the only signal here is campanias_inferencia.
+    """
+    async def latest_activation():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(func.max(CampaniaInferencia.activated_at)))
 
-        # Wait before next poll
-        await asyncio.sleep(settings.polling_interval_seconds)
+    seen = None
+    try:
+        seen = await latest_activation()
+    except Exception as e:
+        logger.error(f"❌ Could not read inference campaigns: {e}")
+    while True:
+        await asyncio.sleep(settings.campaign_watch_interval_seconds)
+        try:
+            activated = await latest_activation()
+            if activated is None or activated == seen:
+                continue
+            seen = activated
+            logger.info("🔁 Inference campaign activated, rebuilding the stats aggregator")
+            async with AsyncSessionLocal() as db:
+                await stats_aggregator.warm(db)
+            await websocket.notify_stats_update(stats_aggregator.summary(STATS_PUSH_DAYS))
+        except Exception as e:
+            logger.error(f"❌ Could not refresh after a campaign activation: {e}", exc_info=True)
 
 
 @asynccontextmanager
@@ -97,20 +236,40 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Seismic Monitoring System")
     logger.info(f"Polling interval: {settings.polling_interval_seconds} seconds")
 
-    # Start background polling task
-    global background_task
-    background_task = asyncio.create_task(polling_task())
+    # Start the ingestion worker thread and the task relaying its results
+    logger.info("=" * 80)
+    logger.info("🌍 EARTHQUAKE POLLING TASK STARTED")
+    logger.info(f"   Polling interval: {settings.polling_interval_seconds} seconds")
+    logger.info(f"   Minimum magnitude threshold: {settings.min_magnitude_threshold}")
+    logger.info(f"   USGS API: {settings.usgs_api_url}")
+    logger.info("=" * 80)
+    global background_task, partition_task, startup_task, campaign_task
+    ingestion_worker.start()
+    background_task = asyncio.create_task(dispatch_worker_messages())
+    startup_task = asyncio.create_task(warm_up())
+    campaign_task = asyncio.create_task(campaign_activation_task())
+    # Partitioning is MariaDB-specific (SQLite is used by the benchmarks)
+    if engine.dialect.name in ("mysql", "mariadb"):
+        partition_task = asyncio.create_task(partition_maintenance_task())
 
     yield
 
     # Shutdown
     logger.info("Shutting down Seismic Monitoring System")
+    if startup_task:
+        startup_task.cancel()
+    if partition_task:
+        partition_task.cancel()
+    if campaign_task:
+        campaign_task.cancel()
+    await ingestion_worker.stop()
     if background_task:
         background_task.cancel()
         try:
             await background_task
         except asyncio.CancelledError:
             logger.info("Background task cancelled successfully")
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -119,6 +278,7 @@ app = FastAPI(
     description="Global earthquake evaluation and impact assessment system",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -130,6 +290,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it wraps CORS and compresses every HTTP response
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
 # Include routers
 app.include_router(events.router)
 app.include_router(websocket.router)
@@ -144,6 +312,8 @@ async def root():
         "endpoints": {
             "events": "/api/events",
             "websocket": "/ws",
+            "ready": "/ready",
+            "metrics": "/metrics",
             "docs": "/docs",
         },
     }
@@ -155,7 +325,7 @@ async def health_check():
     Health check endpoint
     Returns polling status and system information
     """
-    polling_active = background_task is not None and not background_task.done()
+    polling_active = ingestion_worker.running
 
     return {
         "status": "healthy",
@@ -174,18 +344,56 @@ async def health_check():
         }
     }
 
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe, separate from /health (liveness)
+    503 until the database pool, in-memory read models and the
+    ingestion worker have finished warming up
+    """
+    ready = time_to_ready is not None
+    return FastJSONResponse(
+        {
+            "ready": ready,
+            "components": startup_components,
+            "time_to_ready_s": round(time_to_ready, 3) if ready else None,
+            "import_s": round(IMPORT_SECONDS, 3),
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus-style metrics
+    Hot-path latency histograms and pipeline counters
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/polling-status")
 async def polling_status():
     """
     Detailed polling status endpoint
-    Shows if polling task is running and when next poll will occur
+    Shows if polling task is running, the adaptive interval and when the next poll will occur
     """
-    polling_active = background_task is not None and not background_task.done()
+    polling_active = ingestion_worker.running
+
+    scheduler = ingestion_worker.scheduler
 
     return {
         "polling_active": polling_active,
         "message": "✅ Polling is ACTIVE and running" if polling_active else "❌ Polling is NOT running",
+        "poll_count": ingestion_worker.poll_count,
         "polling_interval_seconds": settings.polling_interval_seconds,
-        "description": f"USGS API is checked every {settings.polling_interval_seconds} seconds for new earthquakes with magnitude >= {settings.min_magnitude_threshold}",
-        "log_file": f"/app/logs/seismic_system_{datetime.now().strftime('%Y-%m-%d')}.log"
+        **scheduler.status(),
+        "inference_backends": [backend.status() for backend in ingestion_worker.inference_backends],
+        "description": (
+            f"USGS API is checked every {scheduler.interval:.0f} seconds (adaptive, "
+            f"{scheduler.min_interval:.0f}-{scheduler.max_interval:.0f}s) for new earthquakes "
+            f"with magnitude >= {settings.min_magnitude_threshold}"
+        ),
+        "log_file": log_file_path()
     }
@@ -0,0 +1,220 @@
+"""
+Minimal Prometheus-style metrics
+
+Counters, gauges and histograms are plain Python objects. They are
+updated from both the API event loop and the ingestion worker thread, so
+each metric guards its values with its own lock (uncontended, a sample
+stays a few arithmetic operations) and is rendered from a consistent
+snapshot. ``render_metrics`` produces the text exposition format served at
+``/metrics``.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds; covers fast DB commits up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Seconds from detection to delivered assessment; queued events can wait several polls
+ASSESSMENT_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        with self._lock:
+            lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {_fmt(self.value)}"]
+
+
+class LabeledCounter(_Metric):
+    """Counter with one series per combination of label values"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str]):
+        super().__init__(name, documentation)
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for label_values, value in sorted(self.values.items()):
+            pairs = ",".join(
+                '%s="%s"' % (label, str(label_value).replace("\\", "\\\\").replace('"', '\\"'))
+                for label, label_value in zip(self.labels, label_values)
+            )
+            lines.append(f"{self.name}{{{pairs}}} {_fmt(value)}")
+        return lines
+
+
+class LabeledGauge(LabeledCounter):
+    """Gauge with one series per combination of label values"""
+
+    type_name = "gauge"
+
+    def set(self, *label_values: str, value: float):
+        with self._lock:
+            self.values[label_values] = value
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self.value = 0.0
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {_fmt(self.value)}"]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock duration of the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_fmt(bound)}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {_fmt(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text format"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# Hot-path timings
+USGS_FETCH_SECONDS = Histogram("seismic_usgs_fetch_seconds", "USGS API fetch latency")
+INFERENCE_SECONDS = Histogram("seismic_inference_seconds", "Per-event impact inference latency")
+DB_COMMIT_SECONDS = Histogram("seismic_db_commit_seconds", "Database commit time per processed event")
+WS_BROADCAST_SECONDS = Histogram("seismic_ws_broadcast_seconds", "WebSocket broadcast time per message")
+POLL_CYCLE_SECONDS = Histogram("seismic_poll_cycle_seconds", "Full polling cycle duration")
+TIME_TO_ASSESSMENT_SECONDS = Histogram(
+    "seismic_time_to_assessment_seconds",
+    "Seconds from detection to the impact assessment reaching clients",
+    ASSESSMENT_BUCKETS,
+)
+SIGNIFICANT_TIME_TO_ASSESSMENT_SECONDS = Histogram(
+    "seismic_significant_time_to_assessment_seconds",
+    "Seconds from detection to the impact assessment reaching clients, significant events only",
+    ASSESSMENT_BUCKETS,
+)
+
+# Counters
+EVENTS_PROCESSED = Counter("seismic_events_processed_total", "Earthquakes processed and stored")
+EVENT_CACHE_HITS = Counter("seismic_event_cache_hits_total", "Polled earthquakes already stored and skipped")
+EVENTS_MERGED = Counter("seismic_events_merged_total", "Duplicate USGS reports merged into an existing event as aliases")
+EVENTS_REVISED = Counter("seismic_events_revised_total", "Stored events updated after USGS revised them")
+REVISION_REASSESSMENTS = Counter(
+    "seismic_revision_reassessments_total", "Revisions past a threshold that re-ran the impact assessment"
+)
+INFERENCE_FALLBACKS = Counter("seismic_inference_fallbacks_total", "Impact assessments served by the rule-based fallback")
+INFERENCE_HEDGES = Counter("seismic_inference_hedges_total", "Inference requests hedged on another backend after the p95 delay")
+INFERENCE_HEDGE_WINS = Counter("seismic_inference_hedge_wins_total", "Assessments answered first by a backend other than the preferred one")
+INFERENCE_BACKEND_FAILURES = Counter(
+    "seismic_inference_backend_failures_total", "Backend requests that failed or returned no valid assessment"
+)
+PARSE_FAILURES = Counter("seismic_parse_failures_total", "USGS features or AI responses that could not be parsed")
+AI_RESPONSE_FIELD_ISSUES = LabeledCounter(
+    "seismic_ai_response_field_issues_total",
+    "AI impact entries rejected (or coerced, type=defaulted) by schema validation, per field and error type",
+    ("field", "type"),
+)
+USGS_NOT_MODIFIED = Counter("seismic_usgs_not_modified_total", "USGS feed polls answered with 304 Not Modified")
+POLL_MISSED_TICKS = Counter("seismic_poll_missed_ticks_total", "Poll deadlines skipped because a poll overran")
+ASSESSMENTS_DEFERRED = Counter("seismic_assessments_deferred_total", "Queued assessments left for a later poll by the time budget")
+INFERENCE_CACHE_HITS = Counter("seismic_inference_cache_hits_total", "Impact assessments served from the inference cache")
+SINGLE_FLIGHT_REQUESTS = LabeledCounter(
+    "seismic_single_flight_requests_total",
+    "Coalesced API reads per route; role=leader ran the queries, role=follower shared a leader's result",
+    ("route", "role"),
+)
+
+# Gauges
+WS_CONNECTIONS = Gauge("seismic_ws_connections", "Open WebSocket connections")
+POLL_INTERVAL_SECONDS = Gauge("seismic_poll_interval_seconds", "Current adaptive USGS polling interval")
+ASSESSMENT_QUEUE_DEPTH = Gauge("seismic_assessment_queue_depth", "Detected earthquakes waiting for an impact assessment")
+TIME_TO_READY_SECONDS = Gauge("seismic_time_to_ready_seconds", "Seconds from app import until /ready turned true")
+SINGLE_FLIGHT_RATIO = LabeledGauge(
+    "seismic_single_flight_coalescing_ratio", "Fraction of a route's requests served from another request's result", ("route",)
+)
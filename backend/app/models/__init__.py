@@ -1,3 +1,21 @@
-from app.models.seismic_event import EventoSismico, ImpactoPais, CacheInferencia
+from app.models.seismic_event import (
+    EventoSismico,
+    ImpactoPais,
+    CacheInferencia,
+    CampaniaInferencia,
+    EVENT_COLUMNS,
+    IMPACT_COLUMNS,
+    IMPACT_SUMMARY_COLUMNS,
+    IMPACT_HEAVY_FIELDS,
+)
 
-__all__ = ["EventoSismico", "ImpactoPais", "CacheInferencia"]
+__all__ = [
+    "EventoSismico",
+    "ImpactoPais",
+    "CacheInferencia",
+    "CampaniaInferencia",
+    "EVENT_COLUMNS",
+    "IMPACT_COLUMNS",
+    "IMPACT_SUMMARY_COLUMNS",
+    "IMPACT_HEAVY_FIELDS",
+]
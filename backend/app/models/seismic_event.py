@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, DateTime, Enum, ForeignKey, JSON, TIMESTAMP, Index, Text
+from sqlalchemy import and_, Column, Integer, BigInteger, String, DECIMAL, DateTime, Enum, JSON, TIMESTAMP, Index, Text, UniqueConstraint
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -12,10 +12,18 @@ class NivelDestruccion(str, enum.Enum):
 
 
 class EventoSismico(Base):
+    """
+    Mirrors the partitioned DDL (init.sql, migrations/002): MariaDB only
+    allows unique keys that include fecha_utc, so event_id alone is not
+    unique in the database. SeismicProcessor.process_single_earthquake
+    checks for the event with a locking read in the inserting transaction.
+    The primary key is (id, fecha_utc) in the DDL; the ORM identity is id.
+    """
+
     __tablename__ = "eventos_sismicos"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    event_id = Column(String(50), unique=True, nullable=False, index=True)
+    event_id = Column(String(50), nullable=False)
     magnitud = Column(DECIMAL(3, 1), nullable=False)
     profundidad = Column(DECIMAL(6, 2), nullable=False)
     latitud = Column(DECIMAL(9, 6), nullable=False)
@@ -24,10 +32,15 @@ class EventoSismico(Base):
     lugar = Column(String(255))
     radio_afectacion_km = Column(DECIMAL(8, 2))
     fuente_api = Column(String(50), default="USGS")
+    revision = Column(BigInteger, nullable=False, default=0, server_default="0")  # Sync token, bumped on every write
+    version_impactos = Column(Integer, nullable=False, default=0, server_default="0")  # Active impact generation
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
 
     __table_args__ = (
+        UniqueConstraint('event_id', 'fecha_utc', name='uq_event_fecha'),
+        Index('idx_event', 'event_id'),
         Index('idx_magnitud', 'magnitud'),
+        Index('idx_revision', 'revision'),
     )
 
 
@@ -35,7 +48,8 @@ class ImpactoPais(Base):
     __tablename__ = "impactos_pais"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    event_id = Column(String(50), ForeignKey('eventos_sismicos.event_id', ondelete='CASCADE'), nullable=False)
+    # No foreign key: partitioned tables cannot have one (see migrations/002)
+    event_id = Column(String(50), nullable=False)
     pais = Column(String(100), nullable=False)
     ciudades_afectadas = Column(JSON)
     muertes_estimadas = Column(Integer, default=0)
@@ -48,16 +62,50 @@ class ImpactoPais(Base):
     codigo_construccion = Column(String(255), nullable=True)  # NEW: Building code info
     nivel_preparacion_sismica = Column(String(50))
     densidad_poblacional = Column(String(50))
+    # 0 for live ingestion, else the campanias_inferencia.id that wrote the row
+    version_impactos = Column(Integer, nullable=False, default=0, server_default="0")
+    modelo_ia = Column(String(100), nullable=True)
+    version_prompt = Column(String(20), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
 
     __table_args__ = (
         Index('idx_event_pais', 'event_id', 'pais'),
+        Index('idx_event_version', 'event_id', 'version_impactos'),
         Index('idx_pais', 'pais'),
         Index('idx_nivel', 'nivel_destruccion'),
         Index('idx_fecha', 'created_at'),
     )
 
 
+class AliasEvento(Base):
+    """Other USGS network IDs under which a stored event has been published"""
+
+    __tablename__ = "alias_eventos"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    alias_id = Column(String(50), unique=True, nullable=False)
+    event_id = Column(String(50), nullable=False, index=True)  # Canonical eventos_sismicos.event_id
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+
+class CampaniaInferencia(Base):
+    """A bulk re-assessment of stored events with one model and prompt version"""
+
+    __tablename__ = "campanias_inferencia"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    modelo_ia = Column(String(100), nullable=False)
+    version_prompt = Column(String(20), nullable=False)
+    filtro = Column(JSON)  # Event selection, see app.services.reinference
+    estado = Column(String(20), nullable=False, default="en_curso")  # en_curso, completada, activada
+    total_eventos = Column(Integer, nullable=False, default=0)
+    eventos_procesados = Column(Integer, nullable=False, default=0)
+    fallos = Column(Integer, nullable=False, default=0)
+    checkpoint_at = Column(TIMESTAMP, nullable=True)  # Last committed chunk
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    activated_at = Column(TIMESTAMP, nullable=True, index=True)
+
+
 class CacheInferencia(Base):
     __tablename__ = "cache_inferencias"
 
@@ -66,3 +114,47 @@ class CacheInferencia(Base):
     respuesta_ia = Column(JSON)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     expires_at = Column(TIMESTAMP, nullable=True, index=True)
+
+
+# Join condition selecting only the impact rows of each event's active generation
+CURRENT_IMPACTS = and_(
+    ImpactoPais.event_id == EventoSismico.event_id,
+    ImpactoPais.version_impactos == EventoSismico.version_impactos,
+)
+
+# Column projections used to serialize rows without loading ORM objects
+EVENT_COLUMNS = (
+    EventoSismico.event_id,
+    EventoSismico.magnitud,
+    EventoSismico.profundidad,
+    EventoSismico.latitud,
+    EventoSismico.longitud,
+    EventoSismico.fecha_utc,
+    EventoSismico.lugar,
+    EventoSismico.radio_afectacion_km,
+    EventoSismico.fuente_api,
+    EventoSismico.revision,
+    EventoSismico.version_impactos,
+)
+
+IMPACT_COLUMNS = (
+    ImpactoPais.pais,
+    ImpactoPais.ciudades_afectadas,
+    ImpactoPais.muertes_estimadas,
+    ImpactoPais.heridos_estimados,
+    ImpactoPais.perdidas_monetarias_usd,
+    ImpactoPais.nivel_destruccion,
+    ImpactoPais.fuentes_inferidas,
+    ImpactoPais.razonamiento_ia,
+    ImpactoPais.factores_considerados,
+    ImpactoPais.codigo_construccion,
+    ImpactoPais.nivel_preparacion_sismica,
+    ImpactoPais.densidad_poblacional,
+    ImpactoPais.modelo_ia,
+    ImpactoPais.version_prompt,
+)
+
+# Large TEXT/JSON columns only needed when an impact is expanded
+IMPACT_HEAVY_FIELDS = frozenset({"fuentes_inferidas", "razonamiento_ia", "factores_considerados"})
+
+IMPACT_SUMMARY_COLUMNS = tuple(column for column in IMPACT_COLUMNS if column.key not in IMPACT_HEAVY_FIELDS)
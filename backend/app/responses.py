@@ -0,0 +1,32 @@
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# datetime, enums and dataclasses are handled natively by orjson
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not serialize natively"""
+    if isinstance(obj, Decimal):
+        # Integral aggregates (SUM of INT columns) stay integers, like jsonable_encoder
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize API/WebSocket payloads straight from DB values"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that also accepts DECIMAL values from the database
+
+    Endpoints return this directly so FastAPI skips ``jsonable_encoder``
+    and rows go to orjson untouched.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,14 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_, func
+from sqlalchemy import select, desc, func
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.database import get_db
-from app.models.seismic_event import EventoSismico, ImpactoPais, NivelDestruccion
-from app.services.seismic_processor import SeismicProcessor
+from app.database import get_db, get_read_db, has_replica
+from app.models.seismic_event import (
+    CURRENT_IMPACTS,
+    EventoSismico,
+    ImpactoPais,
+    NivelDestruccion,
+    EVENT_COLUMNS,
+    IMPACT_COLUMNS,
+    IMPACT_SUMMARY_COLUMNS,
+)
+from app.responses import FastJSONResponse, dumps
+from app.services.event_queries import (
+    active_versions,
+    get_event_with_impacts,
+    get_events_with_impacts,
+    get_impacts_for_events,
+)
+from app.services.event_store import SORT_FIELDS, event_store
+from app.services.read_models import recent_writes
+from app.services.stats_aggregator import stats_aggregator
+from app.services.tile_index import MAX_TILE_ZOOM, tile_index, tile_from_database
+from app.single_flight import SingleFlight
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 
+# Upper bound for /batch so one request cannot pull the whole table
+MAX_BATCH_IDS = 200
+
+# Page size bounds for /changes
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 1000
+
+# Concurrent identical reads share one query (see app.single_flight)
+event_detail_flight = SingleFlight("event_detail")
+stats_flight = SingleFlight("stats_summary")
+
+IMPACT_VIEWS = {"summary": IMPACT_SUMMARY_COLUMNS, "full": IMPACT_COLUMNS}
+IMPACT_COLUMNS_BY_NAME = {column.key: column for column in IMPACT_COLUMNS}
+
+SORT_QUERY = Query(
+    "-fecha_utc",
+    pattern="^-?(%s)$" % "|".join(SORT_FIELDS),
+    description="fecha_utc, magnitud or profundidad; a leading - sorts descending",
+)
+VIEW_QUERY = Query(None, pattern="^(summary|full)$", description="summary omits AI reasoning, factors and sources")
+FIELDS_QUERY = Query(None, description="Comma-separated impact fields to return (overrides view)")
+
+
+def _impact_columns(view: Optional[str], fields: Optional[str], default: str) -> tuple:
+    """Resolve view/fields query parameters to the impact columns to select"""
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in IMPACT_COLUMNS_BY_NAME]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown impact fields: {', '.join(unknown)}")
+        return tuple(IMPACT_COLUMNS_BY_NAME[name] for name in dict.fromkeys(names))
+    return IMPACT_VIEWS[view or default]
+
+
+def _to_columns(events: List[dict]) -> dict:
+    """Struct-of-arrays layout: field names once, then one array per field"""
+    columns = list(events[0]) if events else [column.key for column in EVENT_COLUMNS]
+    return {
+        "columns": columns,
+        "data": {name: [event[name] for event in events] for name in columns},
+    }
+
+
+async def _event_rows(db: AsyncSession, event_ids: List[str]) -> dict:
+    """event_id -> EVENT_COLUMNS row of the given events"""
+    if not event_ids:
+        return {}
+    result = await db.execute(select(*EVENT_COLUMNS).where(EventoSismico.event_id.in_(event_ids)))
+    return {row["event_id"]: dict(row) for row in result.mappings()}
+
 
 @router.get("/")
 async def get_events(
@@ -18,76 +87,235 @@ async def get_events(
     max_magnitude: Optional[float] = Query(None, ge=0, le=10),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db),
+    include: Optional[str] = Query(None, description="Comma-separated extras; 'impacts' embeds impact assessments"),
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    format: str = Query("rows", pattern="^(rows|columns)$", description="columns returns one array per field"),
+    sort: str = SORT_QUERY,
+    db: AsyncSession = Depends(get_read_db),
+    primary: AsyncSession = Depends(get_db),
 ):
     """
     Get list of seismic events with optional filters
+    total is the size of this page, matched the number of events matching the filters
+    Use include=impacts to embed impacts (summary view unless view/fields say otherwise)
+    format=columns sends {"columns": [...], "data": {field: [...]}} instead of
+    one object per event, which is smaller and faster to parse for map views
     """
-    query = select(EventoSismico).order_by(desc(EventoSismico.fecha_utc))
-
-    # Apply filters
-    filters = []
-    if min_magnitude is not None:
-        filters.append(EventoSismico.magnitud >= min_magnitude)
-    if max_magnitude is not None:
-        filters.append(EventoSismico.magnitud <= max_magnitude)
+    start_dt = end_dt = None
     if start_date:
         try:
             start_dt = datetime.fromisoformat(start_date)
-            filters.append(EventoSismico.fecha_utc >= start_dt)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid start_date format")
     if end_date:
         try:
             end_dt = datetime.fromisoformat(end_date)
-            filters.append(EventoSismico.fecha_utc <= end_dt)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid end_date format")
 
-    if filters:
-        query = query.where(and_(*filters))
+    # Page events read from the primary, with their impacts
+    fresh_ids = []
+    if event_store.ready:
+        # Filter, sort and count in memory; the database only returns the page's rows
+        page_ids, matched = event_store.query(
+            min_magnitude, max_magnitude, start_dt, end_dt, sort, offset, limit
+        )
+        # The store is fed by commits on the primary: events written or revised
+        # recently, or still missing on a lagging replica, are read from the primary
+        fresh_ids = [event_id for event_id in page_ids if event_id in recent_writes]
+        rows = await _event_rows(db, [event_id for event_id in page_ids if event_id not in recent_writes])
+        if has_replica:
+            fresh_ids += [event_id for event_id in page_ids if event_id not in rows and event_id not in fresh_ids]
+        if fresh_ids:
+            rows.update(await _event_rows(primary, fresh_ids))
+        events = [rows[event_id] for event_id in page_ids if event_id in rows]
+    else:
+        filters = []
+        if min_magnitude is not None:
+            filters.append(EventoSismico.magnitud >= min_magnitude)
+        if max_magnitude is not None:
+            filters.append(EventoSismico.magnitud <= max_magnitude)
+        if start_dt is not None:
+            filters.append(EventoSismico.fecha_utc >= start_dt)
+        if end_dt is not None:
+            filters.append(EventoSismico.fecha_utc <= end_dt)
 
-    query = query.limit(limit).offset(offset)
+        column = getattr(EventoSismico, sort.lstrip("-"))
+        query = (
+            select(*EVENT_COLUMNS)
+            .where(*filters)
+            .order_by(desc(column) if sort.startswith("-") else column)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await db.execute(query)
+        events = [dict(row) for row in result.mappings()]
+        matched = await db.scalar(select(func.count(EventoSismico.id)).where(*filters))
 
-    result = await db.execute(query)
-    events = result.scalars().all()
+    if include and "impacts" in include.split(","):
+        impact_columns = _impact_columns(view, fields, default="summary")
+        versions = active_versions(events)
+        impacts = await get_impacts_for_events(
+            db,
+            {event_id: version for event_id, version in versions.items() if event_id not in fresh_ids},
+            impact_columns,
+        )
+        if fresh_ids:
+            impacts.update(await get_impacts_for_events(
+                primary,
+                {event_id: version for event_id, version in versions.items() if event_id in fresh_ids},
+                impact_columns,
+            ))
+        for event in events:
+            event["impacts"] = impacts.get(event["event_id"], [])
 
-    return {
+    if format == "columns":
+        return FastJSONResponse({
+            "total": len(events),
+            "matched": matched,
+            "limit": limit,
+            "offset": offset,
+            **_to_columns(events),
+        })
+
+    return FastJSONResponse({
         "total": len(events),
+        "matched": matched,
         "limit": limit,
         "offset": offset,
-        "events": [
-            {
-                "event_id": event.event_id,
-                "magnitud": float(event.magnitud),
-                "profundidad": float(event.profundidad),
-                "latitud": float(event.latitud),
-                "longitud": float(event.longitud),
-                "fecha_utc": event.fecha_utc.isoformat(),
-                "lugar": event.lugar,
-                "radio_afectacion_km": float(event.radio_afectacion_km) if event.radio_afectacion_km else None,
-                "fuente_api": event.fuente_api,
-            }
-            for event in events
-        ],
-    }
+        "events": events,
+    })
+
+
+@router.get("/batch")
+async def get_events_batch(
+    ids: str = Query(..., description="Comma-separated event IDs"),
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db),
+    primary: AsyncSession = Depends(get_db),
+):
+    """
+    Get several events with their impact assessments in one request
+    Events the replica may not have caught up with are read from the primary
+    """
+    event_ids = list(dict.fromkeys(event_id.strip() for event_id in ids.split(",") if event_id.strip()))
+    if not event_ids:
+        raise HTTPException(status_code=400, detail="No event IDs given")
+    if len(event_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} event IDs per request")
+
+    impact_columns = _impact_columns(view, fields, default="full")
+    fresh_ids = [event_id for event_id in event_ids if event_id in recent_writes]
+    events = await get_events_with_impacts(
+        db, [event_id for event_id in event_ids if event_id not in recent_writes], impact_columns
+    )
+    if has_replica:
+        fresh_ids += [event_id for event_id in event_ids if event_id not in events and event_id not in fresh_ids]
+    if fresh_ids:
+        events.update(await get_events_with_impacts(primary, fresh_ids, impact_columns))
+        events = {event_id: events[event_id] for event_id in event_ids if event_id in events}
+
+    return FastJSONResponse({
+        "total": len(events),
+        "events": list(events.values()),
+        "missing": [event_id for event_id in event_ids if event_id not in events],
+    })
+
+
+@router.get("/changes")
+async def get_event_changes(
+    since: int = Query(0, ge=0, description="sync_token from the previous response; 0 for a full sync"),
+    limit: int = Query(DEFAULT_CHANGES_LIMIT, ge=1, le=MAX_CHANGES_LIMIT),
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get events created or updated after a sync token, oldest change first
+    Keep calling with the returned sync_token while has_more is true
+    """
+    result = await db.execute(
+        select(*EVENT_COLUMNS)
+        .where(EventoSismico.revision > since)
+        .order_by(EventoSismico.revision)
+        .limit(limit + 1)
+    )
+    events = [dict(row) for row in result.mappings()]
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    impacts = await get_impacts_for_events(
+        db,
+        active_versions(events),
+        _impact_columns(view, fields, default="summary"),
+    )
+    for event in events:
+        event["impacts"] = impacts.get(event["event_id"], [])
+
+    return FastJSONResponse({
+        "total": len(events),
+        "events": events,
+        "sync_token": str(events[-1]["revision"] if events else since),
+        "has_more": has_more,
+    })
+
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def get_event_tile(
+    z: int,
+    x: int,
+    y: int,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get event clusters (count, max magnitude, centroid) for one map tile
+    Uses slippy-map XYZ tile numbering; each tile holds up to 8x8 clusters
+    """
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        raise HTTPException(status_code=400, detail=f"Zoom must be between 0 and {MAX_TILE_ZOOM}")
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Tile coordinates out of range for this zoom")
+
+    if tile_index.ready:
+        body = tile_index.tile(z, x, y)
+    else:
+        body = await tile_from_database(db, z, x, y)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{event_id}")
 async def get_event_detail(
     event_id: str,
-    db: AsyncSession = Depends(get_db),
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: AsyncSession = Depends(get_read_db),
+    primary: AsyncSession = Depends(get_db),
 ):
     """
     Get detailed information about a specific event including all impact assessments
+    Heavy AI text can be fetched on demand, e.g. fields=pais,razonamiento_ia
     """
-    processor = SeismicProcessor()
-    event_data = await processor.get_event_with_impacts(db, event_id)
+    impact_columns = _impact_columns(view, fields, default="full")
 
-    if not event_data:
+    async def load() -> Optional[bytes]:
+        # Just broadcast or revised: the replica may not have it yet, or hold the old values
+        source = primary if event_id in recent_writes else db
+        event_data = await get_event_with_impacts(source, event_id, impact_columns)
+        if event_data is None and has_replica and source is db:
+            # Not replicated yet (e.g. written by another instance) before calling it missing
+            event_data = await get_event_with_impacts(primary, event_id, impact_columns)
+        return dumps(event_data) if event_data else None
+
+    # Every client refetches a broadcast event at once; one query serves them all
+    key = (event_id, tuple(column.key for column in impact_columns))
+    body = await event_detail_flight.run(key, load)
+
+    if body is None:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    return event_data
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/country/{country_name}")
@@ -95,14 +323,25 @@ async def get_events_by_country(
     country_name: str,
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get all events that affected a specific country
     """
-    # Get impacts for the country
+    # Impacts for the country joined with their events in one query
     query = (
-        select(ImpactoPais)
+        select(
+            ImpactoPais.event_id,
+            EventoSismico.magnitud,
+            EventoSismico.fecha_utc,
+            EventoSismico.lugar,
+            ImpactoPais.ciudades_afectadas,
+            ImpactoPais.muertes_estimadas,
+            ImpactoPais.heridos_estimados,
+            ImpactoPais.perdidas_monetarias_usd,
+            ImpactoPais.nivel_destruccion,
+        )
+        .join(EventoSismico, CURRENT_IMPACTS)
         .where(ImpactoPais.pais.ilike(f"%{country_name}%"))
         .order_by(desc(ImpactoPais.created_at))
         .limit(limit)
@@ -110,49 +349,52 @@ async def get_events_by_country(
     )
 
     result = await db.execute(query)
-    impacts = result.scalars().all()
+    rows = result.all()
 
-    # Get event IDs
-    event_ids = [impact.event_id for impact in impacts]
-
-    # Get events
-    events_query = select(EventoSismico).where(EventoSismico.event_id.in_(event_ids))
-    events_result = await db.execute(events_query)
-    events = {event.event_id: event for event in events_result.scalars().all()}
-
-    return {
+    return FastJSONResponse({
         "country": country_name,
-        "total": len(impacts),
+        "total": len(rows),
         "results": [
             {
                 "event": {
-                    "event_id": impact.event_id,
-                    "magnitud": float(events[impact.event_id].magnitud),
-                    "fecha_utc": events[impact.event_id].fecha_utc.isoformat(),
-                    "lugar": events[impact.event_id].lugar,
+                    "event_id": event_id,
+                    "magnitud": magnitud,
+                    "fecha_utc": fecha_utc,
+                    "lugar": lugar,
                 },
                 "impact": {
-                    "ciudades_afectadas": impact.ciudades_afectadas,
-                    "muertes_estimadas": impact.muertes_estimadas,
-                    "heridos_estimados": impact.heridos_estimados,
-                    "perdidas_monetarias_usd": impact.perdidas_monetarias_usd,
-                    "nivel_destruccion": impact.nivel_destruccion.value,
+                    "ciudades_afectadas": ciudades,
+                    "muertes_estimadas": muertes,
+                    "heridos_estimados": heridos,
+                    "perdidas_monetarias_usd": perdidas,
+                    "nivel_destruccion": nivel,
                 },
             }
-            for impact in impacts
-            if impact.event_id in events
+            for event_id, magnitud, fecha_utc, lugar, ciudades, muertes, heridos, perdidas, nivel in rows
         ],
-    }
+    })
 
 
 @router.get("/stats/summary")
 async def get_statistics(
     days: int = Query(30, ge=1, le=365),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get statistical summary of recent seismic activity
+    Served from the in-memory aggregator once it is warmed, SQL otherwise
     """
+    async def load() -> bytes:
+        if stats_aggregator.ready:
+            return dumps(stats_aggregator.summary(days))
+        return dumps(await _statistics_from_sql(db, days))
+
+    # Refreshed by every client after each broadcast
+    body = await stats_flight.run(days, load)
+    return Response(content=body, media_type="application/json")
+
+
+async def _statistics_from_sql(db: AsyncSession, days: int) -> dict:
     start_date = datetime.utcnow() - timedelta(days=days)
 
     # Total events
@@ -171,21 +413,29 @@ async def get_statistics(
 
     # Highest magnitude
     max_mag_query = (
-        select(EventoSismico)
+        select(
+            EventoSismico.event_id,
+            EventoSismico.magnitud,
+            EventoSismico.lugar,
+            EventoSismico.fecha_utc,
+        )
         .where(EventoSismico.fecha_utc >= start_date)
         .order_by(desc(EventoSismico.magnitud))
         .limit(1)
     )
     max_mag_result = await db.execute(max_mag_query)
-    highest_event = max_mag_result.scalar_one_or_none()
+    highest_event = max_mag_result.mappings().first()
 
     # Total estimated casualties
     casualties_query = select(
         func.sum(ImpactoPais.muertes_estimadas),
         func.sum(ImpactoPais.heridos_estimados),
         func.sum(ImpactoPais.perdidas_monetarias_usd),
-    ).join(EventoSismico, ImpactoPais.event_id == EventoSismico.event_id).where(
-        EventoSismico.fecha_utc >= start_date
+    ).join(EventoSismico, CURRENT_IMPACTS).where(
+        EventoSismico.fecha_utc >= start_date,
+        # Redundant (impacts are created after their event) but lets
+        # MariaDB prune old impactos_pais partitions
+        ImpactoPais.created_at >= start_date,
     )
     casualties_result = await db.execute(casualties_query)
     deaths, injuries, losses = casualties_result.one()
@@ -197,8 +447,8 @@ async def get_statistics(
             func.count(ImpactoPais.id).label("event_count"),
             func.sum(ImpactoPais.muertes_estimadas).label("total_deaths"),
         )
-        .join(EventoSismico, ImpactoPais.event_id == EventoSismico.event_id)
-        .where(EventoSismico.fecha_utc >= start_date)
+        .join(EventoSismico, CURRENT_IMPACTS)
+        .where(EventoSismico.fecha_utc >= start_date, ImpactoPais.created_at >= start_date)
         .group_by(ImpactoPais.pais)
         .order_by(desc("total_deaths"))
         .limit(10)
@@ -212,15 +462,8 @@ async def get_statistics(
     return {
         "period_days": days,
         "total_events": total_events,
-        "average_magnitude": float(avg_magnitude) if avg_magnitude else 0,
-        "highest_magnitude_event": {
-            "event_id": highest_event.event_id,
-            "magnitud": float(highest_event.magnitud),
-            "lugar": highest_event.lugar,
-            "fecha_utc": highest_event.fecha_utc.isoformat(),
-        }
-        if highest_event
-        else None,
+        "average_magnitude": avg_magnitude or 0,
+        "highest_magnitude_event": dict(highest_event) if highest_event else None,
         "estimated_casualties": {
             "deaths": deaths or 0,
             "injuries": injuries or 0,
@@ -237,8 +480,14 @@ async def trigger_processing(
     """
     Manually trigger processing of new earthquakes from USGS
     """
+    # Deferred: the inference stack is only needed by this admin route
+    from app.services.seismic_processor import SeismicProcessor
+
     processor = SeismicProcessor()
-    processed_ids = await processor.process_new_earthquakes(db)
+    try:
+        processed_ids = await processor.process_new_earthquakes(db)
+    finally:
+        await processor.aclose()
 
     return {
         "message": "Processing completed",
@@ -1,8 +1,13 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from collections import deque
+from typing import Deque, List, Optional, Tuple
 import json
 import asyncio
 import logging
+from app.config import settings
+from app.metrics import WS_BROADCAST_SECONDS, WS_CONNECTIONS
+from app.responses import dumps
+from app.services.revisions import revision_clock
 
 logger = logging.getLogger(__name__)
 
@@ -12,37 +17,68 @@ router = APIRouter()
 class ConnectionManager:
     """Manages WebSocket connections for real-time updates"""
 
-    def __init__(self):
+    def __init__(self, replay_size: int = settings.ws_replay_buffer_size):
         self.active_connections: List[WebSocket] = []
+        # (revision, serialized message) of recent event broadcasts
+        self.replay_buffer: Deque[Tuple[int, str]] = deque(maxlen=replay_size)
+        # Changes at or below this revision may be missing from the buffer
+        self.replay_floor = revision_clock.now()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        WS_CONNECTIONS.set(len(self.active_connections))
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        WS_CONNECTIONS.set(len(self.active_connections))
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
 
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
+    async def broadcast(self, message: dict, revision: Optional[int] = None):
+        """
+        Broadcast message to all connected clients
+        Messages with a revision are kept for replay on reconnect
+        """
         disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error sending message to client: {e}")
-                disconnected.append(connection)
+        with WS_BROADCAST_SECONDS.time():
+            # Serialize once, not once per client
+            text = dumps(message).decode()
+            if revision is not None:
+                self._remember(revision, text)
+            for connection in self.active_connections:
+                try:
+                    await connection.send_text(text)
+                except Exception as e:
+                    logger.error(f"Error sending message to client: {e}")
+                    disconnected.append(connection)
 
         # Remove disconnected clients
         for conn in disconnected:
             self.disconnect(conn)
 
+    def _remember(self, revision: int, text: str):
+        if len(self.replay_buffer) == self.replay_buffer.maxlen:
+            self.replay_floor = max(self.replay_floor, self.replay_buffer[0][0])
+        self.replay_buffer.append((revision, text))
+
+    async def replay(self, websocket: WebSocket, since: int) -> bool:
+        """
+        Resend buffered messages newer than a sync token
+        Returns False when the buffer no longer reaches back that far
+        """
+        if since < self.replay_floor:
+            return False
+        for revision, text in list(self.replay_buffer):
+            if revision > since:
+                await websocket.send_text(text)
+        return True
+
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send message to specific client"""
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(dumps(message).decode())
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
 
@@ -51,9 +87,14 @@ manager = ConnectionManager()
 
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(websocket: WebSocket, since: Optional[int] = None):
     """
     WebSocket endpoint for real-time earthquake updates
+
+    Clients reconnecting with ?since=<last revision seen> get the
+    new_earthquake and earthquake_updated messages they missed, or
+    resync_required if the replay buffer no longer covers the gap (then
+    use GET /api/events/changes)
     """
     await manager.connect(websocket)
 
@@ -68,6 +109,12 @@ async def websocket_endpoint(websocket: WebSocket):
             websocket,
         )
 
+        if since is not None and not await manager.replay(websocket, since):
+            await manager.send_personal_message(
+                {"type": "resync_required", "sync_token": str(since)},
+                websocket,
+            )
+
         # Keep connection alive and listen for messages
         while True:
             data = await websocket.receive_text()
@@ -95,9 +142,43 @@ async def notify_new_earthquake(event_data: dict):
 
     Call this function when a new earthquake is processed
     """
+    revision = event_data["event"].get("revision")
     message = {
         "type": "new_earthquake",
         "data": event_data,
+        "revision": str(revision) if revision is not None else None,
+        "timestamp": asyncio.get_event_loop().time(),
+    }
+    await manager.broadcast(message, revision=revision)
+
+
+async def notify_earthquake_updated(event_data: dict):
+    """
+    Notify all connected clients that USGS revised a stored earthquake
+
+    ``event_data`` carries the current event and impacts plus ``changes``
+    (field -> [old, new]) and ``reassessed`` (whether the impacts are new)
+    """
+    revision = event_data["event"].get("revision")
+    message = {
+        "type": "earthquake_updated",
+        "data": event_data,
+        "revision": str(revision) if revision is not None else None,
+        "timestamp": asyncio.get_event_loop().time(),
+    }
+    await manager.broadcast(message, revision=revision)
+
+
+async def notify_stats_update(stats: dict):
+    """
+    Push refreshed dashboard statistics to all connected clients
+
+    Sent after each poll that stored new events, so clients do not need to
+    poll the stats endpoint
+    """
+    message = {
+        "type": "stats_update",
+        "data": stats,
         "timestamp": asyncio.get_event_loop().time(),
     }
     await manager.broadcast(message)
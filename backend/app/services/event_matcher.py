@@ -0,0 +1,210 @@
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.seismic_event import AliasEvento, EventoSismico
+from app.services.event_priority import distance_km
+
+logger = logging.getLogger(__name__)
+
+# Reports of one earthquake from different networks agree within these
+# tolerances (the association window USGS itself uses)
+MATCH_SECONDS = 16.0
+MATCH_KM = 100.0
+MATCH_MAGNITUDE = 0.5
+
+# Grid cell size; one degree of latitude is ~111 km, more than MATCH_KM
+CELL_DEGREES = 1.0
+KM_PER_DEGREE = 111.2
+
+# (time bucket, latitude cell, longitude cell)
+CellKey = Tuple[int, int, int]
+
+
+def _epoch(fecha_utc: datetime) -> float:
+    # Stored datetimes are naive UTC
+    return fecha_utc.replace(tzinfo=timezone.utc).timestamp()
+
+
+def network_of(event_id: str) -> str:
+    """USGS IDs are the network code (its ``sources`` entry) plus the network's own code"""
+    return event_id[:2]
+
+
+@dataclass(slots=True)
+class _Entry:
+    event_id: str
+    timestamp: float
+    latitude: float
+    longitude: float
+    magnitude: float
+    networks: Set[str] = field(default_factory=set)
+    aliases: List[str] = field(default_factory=list)
+    cell: CellKey = (0, 0, 0)
+
+
+class EventMatcher:
+    """
+    Resolves incoming USGS reports to events already stored or queued
+
+    Two lookups, both in memory: an alias map (every known network ID ->
+    canonical event_id) and a spatio-temporal grid of recent events bucketed
+    by MATCH_SECONDS x CELL_DEGREES x CELL_DEGREES. A report whose IDs are
+    all new still matches an entry when origin time, distance and magnitude
+    agree within tolerance and the two come from different networks: a
+    network never publishes one earthquake twice, so a shared network means
+    two distinct events (aftershocks in a swarm).
+    """
+
+    def __init__(self):
+        self.aliases: Dict[str, str] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._cells: Dict[CellKey, List[_Entry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def warm(self, db: AsyncSession, since: datetime):
+        """Index events since ``since`` and their aliases"""
+        result = await db.execute(
+            select(
+                EventoSismico.event_id,
+                EventoSismico.fecha_utc,
+                EventoSismico.latitud,
+                EventoSismico.longitud,
+                EventoSismico.magnitud,
+            ).where(EventoSismico.fecha_utc >= since)
+        )
+        self.aliases.clear()
+        self._entries.clear()
+        self._cells.clear()
+        for event_id, fecha_utc, latitude, longitude, magnitude in result.all():
+            self.add(event_id, fecha_utc, float(latitude), float(longitude), float(magnitude))
+
+        result = await db.execute(
+            select(AliasEvento.alias_id, AliasEvento.event_id).where(
+                AliasEvento.event_id.in_(select(EventoSismico.event_id).where(EventoSismico.fecha_utc >= since))
+            )
+        )
+        for alias_id, event_id in result.all():
+            self.add_aliases(event_id, [alias_id])
+        logger.info(f"Event matcher indexed {len(self._entries)} events and {len(self.aliases)} aliases")
+
+    def _cell(self, timestamp: float, latitude: float, longitude: float) -> CellKey:
+        return (
+            int(timestamp // MATCH_SECONDS),
+            int(math.floor(latitude / CELL_DEGREES)),
+            int(math.floor(longitude / CELL_DEGREES)),
+        )
+
+    def add(
+        self,
+        event_id: str,
+        fecha_utc: datetime,
+        latitude: float,
+        longitude: float,
+        magnitude: float,
+        ids: Iterable[str] = (),
+    ):
+        """Index a stored or queued event under its canonical ID"""
+        if event_id in self._entries:
+            return
+        timestamp = _epoch(fecha_utc)
+        entry = _Entry(event_id, timestamp, latitude, longitude, magnitude, {network_of(event_id)})
+        entry.cell = self._cell(timestamp, latitude, longitude)
+        self._entries[event_id] = entry
+        self._cells.setdefault(entry.cell, []).append(entry)
+        self.add_aliases(event_id, ids)
+
+    def add_aliases(self, event_id: str, ids: Iterable[str]) -> List[str]:
+        """Map ``ids`` to ``event_id``; returns the ones not known before"""
+        added = []
+        entry = self._entries.get(event_id)
+        for alias_id in ids:
+            if alias_id == event_id or alias_id in self.aliases:
+                continue
+            self.aliases[alias_id] = event_id
+            added.append(alias_id)
+            if entry is not None:
+                entry.networks.add(network_of(alias_id))
+                entry.aliases.append(alias_id)
+        return added
+
+    def aliases_of(self, event_id: str) -> List[str]:
+        entry = self._entries.get(event_id)
+        return list(entry.aliases) if entry is not None else []
+
+    def discard(self, event_id: str):
+        """Forget an event that was queued but never stored"""
+        entry = self._entries.pop(event_id, None)
+        if entry is None:
+            return
+        self._remove_from_cell(entry)
+        for alias_id in entry.aliases:
+            self.aliases.pop(alias_id, None)
+
+    def _remove_from_cell(self, entry: _Entry):
+        cell = self._cells.get(entry.cell)
+        if cell is not None:
+            cell.remove(entry)
+            if not cell:
+                del self._cells[entry.cell]
+
+    def resolve(
+        self,
+        event_id: str,
+        ids: Iterable[str],
+        fecha_utc: datetime,
+        latitude: float,
+        longitude: float,
+        magnitude: float,
+    ) -> Optional[str]:
+        """Canonical event_id this report duplicates, or None if it is new"""
+        for candidate in (event_id, *ids):
+            canonical = self.aliases.get(candidate)
+            if canonical is not None:
+                return canonical
+            if candidate != event_id and candidate in self._entries:
+                # The preferred ID changed; the old one is what we stored
+                return candidate
+
+        networks = {network_of(event_id)} | {network_of(alias_id) for alias_id in ids}
+        timestamp = _epoch(fecha_utc)
+        bucket, lat_cell, lon_cell = self._cell(timestamp, latitude, longitude)
+        # Longitude cells shrink towards the poles
+        cell_km = KM_PER_DEGREE * CELL_DEGREES * max(math.cos(math.radians(latitude)), 0.01)
+        lon_span = min(180, math.ceil(MATCH_KM / cell_km))
+        lon_cells = int(360 / CELL_DEGREES)
+
+        best, best_score = None, None
+        for t in (bucket - 1, bucket, bucket + 1):
+            for la in (lat_cell - 1, lat_cell, lat_cell + 1):
+                for dlo in range(-lon_span, lon_span + 1):
+                    # Wrap across the antimeridian
+                    lo = (lon_cell + dlo + lon_cells // 2) % lon_cells - lon_cells // 2
+                    for entry in self._cells.get((t, la, lo), ()):
+                        seconds = abs(entry.timestamp - timestamp)
+                        if seconds > MATCH_SECONDS or abs(entry.magnitude - magnitude) > MATCH_MAGNITUDE:
+                            continue
+                        if entry.networks & networks:
+                            continue
+                        distance = distance_km(latitude, longitude, entry.latitude, entry.longitude)
+                        if distance > MATCH_KM:
+                            continue
+                        score = seconds / MATCH_SECONDS + distance / MATCH_KM
+                        if best_score is None or score < best_score:
+                            best, best_score = entry.event_id, score
+        return best
+
+    def forget_before(self, cutoff: datetime):
+        """Drop events older than ``cutoff`` and their aliases"""
+        limit = _epoch(cutoff)
+        stale = {event_id for event_id, entry in self._entries.items() if entry.timestamp < limit}
+        if not stale:
+            return
+        for event_id in stale:
+            self._remove_from_cell(self._entries.pop(event_id))
+        self.aliases = {alias_id: event_id for alias_id, event_id in self.aliases.items() if event_id not in stale}
@@ -0,0 +1,98 @@
+import math
+from typing import Tuple
+
+# Large metropolitan areas as (latitude, longitude, population in millions).
+# A coarse exposure proxy for ordering work, not an impact estimate: the AI
+# assessment decides which countries and cities are actually affected.
+POPULATION_CENTERS: Tuple[Tuple[float, float, float], ...] = (
+    (35.68, 139.69, 37.0),   # Tokyo
+    (28.61, 77.21, 32.0),    # Delhi
+    (31.23, 121.47, 28.0),   # Shanghai
+    (23.81, 90.41, 22.0),    # Dhaka
+    (-23.55, -46.63, 22.0),  # Sao Paulo
+    (19.43, -99.13, 22.0),   # Mexico City
+    (30.04, 31.24, 21.0),    # Cairo
+    (39.90, 116.40, 21.0),   # Beijing
+    (19.08, 72.88, 21.0),    # Mumbai
+    (34.69, 135.50, 19.0),   # Osaka
+    (40.71, -74.01, 18.8),   # New York
+    (29.56, 106.55, 17.0),   # Chongqing
+    (24.86, 67.01, 17.0),    # Karachi
+    (41.01, 28.98, 16.0),    # Istanbul
+    (-4.44, 15.27, 16.0),    # Kinshasa
+    (6.52, 3.38, 15.0),      # Lagos
+    (-34.60, -58.38, 15.0),  # Buenos Aires
+    (22.57, 88.36, 15.0),    # Kolkata
+    (14.60, 120.98, 14.0),   # Manila
+    (23.13, 113.26, 14.0),   # Guangzhou
+    (-22.91, -43.17, 13.6),  # Rio de Janeiro
+    (31.55, 74.34, 13.5),    # Lahore
+    (12.97, 77.59, 13.0),    # Bangalore
+    (22.54, 114.06, 13.0),   # Shenzhen
+    (55.76, 37.62, 12.6),    # Moscow
+    (34.05, -118.24, 12.5),  # Los Angeles
+    (4.71, -74.07, 11.3),    # Bogotá
+    (48.86, 2.35, 11.0),     # Paris
+    (-6.21, 106.85, 11.0),   # Jakarta
+    (-12.05, -77.04, 11.0),  # Lima
+    (13.76, 100.50, 11.0),   # Bangkok
+    (37.57, 126.98, 10.0),   # Seoul
+    (51.51, -0.13, 9.5),     # London
+    (30.57, 104.07, 9.5),    # Chengdu
+    (35.69, 51.39, 9.5),     # Tehran
+    (10.82, 106.63, 9.0),    # Ho Chi Minh City
+    (25.03, 121.57, 7.0),    # Taipei
+    (-33.45, -70.67, 6.8),   # Santiago
+    (16.87, 96.20, 5.6),     # Yangon
+    (37.77, -122.42, 4.7),   # San Francisco
+    (34.56, 69.21, 4.6),     # Kabul
+    (37.98, 23.73, 3.2),     # Athens
+    (14.63, -90.51, 3.0),    # Guatemala City
+    (10.48, -66.90, 2.9),    # Caracas
+    (18.59, -72.31, 2.8),    # Port-au-Prince
+    (-0.18, -78.47, 2.0),    # Quito
+    (-36.85, 174.76, 1.7),   # Auckland
+    (27.72, 85.32, 1.5),     # Kathmandu
+)
+
+EARTH_RADIUS_KM = 6371.0
+
+# The depth bonus shrinks linearly from the surface to zero at this depth
+SHALLOW_DEPTH_KM = 70.0
+
+# Exposure reaches zero at this multiple of the impact radius
+EXPOSURE_REACH = 3.0
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def population_exposure(latitude: float, longitude: float, radius_km: float) -> float:
+    """Millions of people in population centers near the impact radius, distance-weighted"""
+    reach = radius_km * EXPOSURE_REACH
+    exposure = 0.0
+    for lat, lon, millions in POPULATION_CENTERS:
+        distance = distance_km(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            exposure += millions
+        elif distance < reach:
+            exposure += millions * (reach - distance) / (reach - radius_km)
+    return exposure
+
+
+def event_priority(magnitude: float, depth_km: float, latitude: float, longitude: float, radius_km: float) -> float:
+    """
+    Processing priority of an earthquake; higher is assessed first
+
+    Magnitude dominates. A shallow focus adds up to half a magnitude unit,
+    and population exposure up to about one (log-scaled), so a M6.5 under a
+    megacity can overtake an offshore M7.
+    """
+    depth_bonus = max(0.0, SHALLOW_DEPTH_KM - depth_km) / SHALLOW_DEPTH_KM * 0.5
+    exposure_bonus = 0.5 * math.log10(1.0 + population_exposure(latitude, longitude, radius_km))
+    return magnitude + depth_bonus + exposure_bonus
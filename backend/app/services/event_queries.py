@@ -0,0 +1,101 @@
+"""
+Read-side queries shared by the API routes and the ingestion worker
+
+Kept apart from SeismicProcessor so serving reads does not import the
+ingestion pipeline (HTTP clients, inference).
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.seismic_event import AliasEvento, EventoSismico, ImpactoPais, EVENT_COLUMNS, IMPACT_COLUMNS
+
+
+async def get_event_with_impacts(
+    db: AsyncSession,
+    event_id: str,
+    impact_columns: Sequence = IMPACT_COLUMNS,
+) -> Optional[Dict[str, Any]]:
+    """
+    Get complete event data with all impact assessments
+    Other USGS network IDs of the event (alias_eventos) resolve to it as well
+    """
+    events = await get_events_with_impacts(db, [event_id], impact_columns)
+    if event_id in events:
+        return events[event_id]
+
+    canonical = await db.scalar(select(AliasEvento.event_id).where(AliasEvento.alias_id == event_id))
+    if canonical is None:
+        return None
+    events = await get_events_with_impacts(db, [canonical], impact_columns)
+    return events.get(canonical)
+
+
+async def get_events_with_impacts(
+    db: AsyncSession,
+    event_ids: List[str],
+    impact_columns: Sequence = IMPACT_COLUMNS,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Batch-load events and their impact assessments
+
+    Two queries regardless of how many IDs are requested. Only
+    ``impact_columns`` are selected, so summary views never read the
+    heavy TEXT/JSON columns from disk. Values are
+    returned as the database yields them (DECIMAL, datetime);
+    app.responses.dumps serializes them without a conversion pass.
+
+    Returns:
+        Dict of event_id -> {"event": ..., "impacts": [...]}, in request
+        order, for the IDs that exist
+    """
+    if not event_ids:
+        return {}
+
+    result = await db.execute(
+        select(*EVENT_COLUMNS).where(EventoSismico.event_id.in_(event_ids))
+    )
+    events = {row["event_id"]: dict(row) for row in result.mappings()}
+    if not events:
+        return {}
+
+    impacts = await get_impacts_for_events(db, active_versions(events.values()), impact_columns)
+
+    return {
+        event_id: {"event": events[event_id], "impacts": impacts.get(event_id, [])}
+        for event_id in event_ids
+        if event_id in events
+    }
+
+
+def active_versions(events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """event_id -> impact generation to serve, from rows selected with EVENT_COLUMNS"""
+    return {event["event_id"]: event["version_impactos"] for event in events}
+
+
+async def get_impacts_for_events(
+    db: AsyncSession,
+    versions: Dict[str, int],
+    impact_columns: Sequence = IMPACT_COLUMNS,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load impact assessments for many events, grouped by event_id
+
+    ``versions`` maps each event to its active impact generation
+    (eventos_sismicos.version_impactos); rows of other generations, such as
+    a re-inference campaign still running, are never read (the
+    (event_id, version_impactos) pairs are matched on idx_event_version).
+    """
+    if not versions:
+        return {}
+
+    result = await db.execute(
+        select(ImpactoPais.event_id.label("_event_id"), *impact_columns)
+        .where(tuple_(ImpactoPais.event_id, ImpactoPais.version_impactos).in_(list(versions.items())))
+        .order_by(ImpactoPais.id)
+    )
+
+    impacts: Dict[str, List[Dict[str, Any]]] = {}
+    for row in result.mappings():
+        impact = dict(row)
+        impacts.setdefault(impact.pop("_event_id"), []).append(impact)
+    return impacts
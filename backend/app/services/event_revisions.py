@@ -0,0 +1,59 @@
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List
+from app.config import settings
+from app.services.event_priority import distance_km
+
+
+def fingerprint(
+    magnitud: Any,
+    profundidad: Any,
+    latitud: Any,
+    longitud: Any,
+    fecha_utc: datetime,
+    lugar: Any,
+) -> bytes:
+    """
+    Digest of an event's material fields
+
+    Values are rounded to the eventos_sismicos column precision (and the
+    origin time to whole seconds, as DATETIME stores it), so a stored row
+    and the report it came from hash the same. Any difference is a USGS
+    revision; whether it is worth a new assessment is decided separately.
+    """
+    text = "|".join((
+        f"{float(magnitud):.1f}",
+        f"{float(profundidad):.2f}",
+        f"{float(latitud):.6f}",
+        f"{float(longitud):.6f}",
+        fecha_utc.strftime("%Y-%m-%dT%H:%M:%S"),
+        lugar or "",
+    ))
+    return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+
+def revision_changes(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Fields whose stored value differs, as field -> [old, new] (JSON friendly)"""
+    changes = {}
+    for field, digits in (("magnitud", 1), ("profundidad", 2), ("latitud", 6), ("longitud", 6)):
+        before, after = round(float(old[field]), digits), round(float(new[field]), digits)
+        if before != after:
+            changes[field] = [before, after]
+    before, after = old["fecha_utc"].replace(microsecond=0), new["fecha_utc"].replace(microsecond=0)
+    if before != after:
+        changes["fecha_utc"] = [before.isoformat(), after.isoformat()]
+    if (old["lugar"] or "") != (new["lugar"] or ""):
+        changes["lugar"] = [old["lugar"], new["lugar"]]
+    return changes
+
+
+def needs_reassessment(old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+    """True when a revision moves magnitude, depth or epicenter past the configured thresholds"""
+    if abs(float(new["magnitud"]) - float(old["magnitud"])) >= settings.revision_magnitude_threshold:
+        return True
+    if abs(float(new["profundidad"]) - float(old["profundidad"])) >= settings.revision_depth_threshold_km:
+        return True
+    moved = distance_km(
+        float(old["latitud"]), float(old["longitud"]), float(new["latitud"]), float(new["longitud"])
+    )
+    return moved >= settings.revision_location_threshold_km
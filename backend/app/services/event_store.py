@@ -0,0 +1,187 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.seismic_event import EventoSismico
+
+logger = logging.getLogger(__name__)
+
+INITIAL_CAPACITY = 4096
+
+# Sort keys accepted by query(); a leading "-" sorts descending
+SORT_FIELDS = ("fecha_utc", "magnitud", "profundidad")
+
+# attribute -> dtype; radii are NaN where radio_afectacion_km is NULL
+_COLUMNS = (
+    ("event_ids", object),
+    ("times", "datetime64[s]"),
+    ("magnitudes", np.float64),
+    ("depths", np.float64),
+    ("latitudes", np.float64),
+    ("longitudes", np.float64),
+    ("radii", np.float64),
+)
+
+
+def _as_datetime64(value: datetime) -> np.datetime64:
+    # Stored datetimes are naive UTC with whole seconds (DATETIME truncates)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value.replace(microsecond=0), "s")
+
+
+class EventStore:
+    """
+    Columnar in-memory mirror of eventos_sismicos for list queries
+
+    One NumPy array per filterable field (origin time, magnitude, depth,
+    position, radius) plus the event IDs, loaded at startup and appended to
+    as the ingestion worker commits events. Filters are vectorized masks and
+    each sort order is one cached argsort, so selecting a page of IDs never
+    touches the database; only the rows of that page are read from it.
+    Arrays grow by doubling, so appends are amortized O(1).
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.size = 0
+        self._allocate(capacity)
+        self._index: Dict[str, int] = {}
+        # sort key -> row positions in that order, dropped on every change
+        self._orders: Dict[str, np.ndarray] = {}
+        # Events recorded while a warm-up query runs, replayed onto the reloaded arrays
+        self._journals: List[List[tuple]] = []
+        self.ready = False
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _allocate(self, capacity: int):
+        for name, dtype in _COLUMNS:
+            column = np.empty(capacity, dtype=dtype)
+            if self.size:
+                column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    async def warm(self, db: AsyncSession):
+        """
+        Load every stored event
+
+        The arrays are rebuilt aside and swapped in, so the live store keeps
+        serving and recording commits while the query runs; those commits
+        are replayed onto the new arrays before the swap.
+        """
+        journal: List[tuple] = []
+        self._journals.append(journal)
+        try:
+            result = await db.execute(
+                select(
+                    EventoSismico.event_id,
+                    EventoSismico.fecha_utc,
+                    EventoSismico.magnitud,
+                    EventoSismico.profundidad,
+                    EventoSismico.latitud,
+                    EventoSismico.longitud,
+                    EventoSismico.radio_afectacion_km,
+                )
+            )
+            rows = result.all()
+        finally:
+            self._journals.remove(journal)
+
+        fresh = EventStore(max(INITIAL_CAPACITY, 2 * len(rows)))
+        for row in rows:
+            fresh.record_event(*row)
+        for event in journal:
+            fresh.record_event(*event)
+
+        self.size, self.capacity = fresh.size, fresh.capacity
+        for name, _ in _COLUMNS:
+            setattr(self, name, getattr(fresh, name))
+        self._index = fresh._index
+        self._orders = {}
+        self.ready = True
+        logger.info(f"Event store loaded {len(rows)} events")
+
+    def record_event(
+        self,
+        event_id: str,
+        fecha_utc: datetime,
+        magnitud: Any,
+        profundidad: Any,
+        latitud: Any,
+        longitud: Any,
+        radio_km: Any = None,
+    ):
+        """Append a committed event, or overwrite it if already stored (a revision)"""
+        for journal in self._journals:
+            journal.append((event_id, fecha_utc, magnitud, profundidad, latitud, longitud, radio_km))
+        position = self._index.get(event_id)
+        if position is None:
+            if self.size == self.capacity:
+                self._allocate(2 * self.capacity)
+            position = self.size
+            self.size += 1
+            self._index[event_id] = position
+            self.event_ids[position] = event_id
+        self.times[position] = _as_datetime64(fecha_utc)
+        self.magnitudes[position] = float(magnitud)
+        self.depths[position] = float(profundidad)
+        self.latitudes[position] = float(latitud)
+        self.longitudes[position] = float(longitud)
+        self.radii[position] = float(radio_km) if radio_km is not None else np.nan
+        self._orders.clear()
+
+    def _order(self, sort: str) -> np.ndarray:
+        order = self._orders.get(sort)
+        if order is None:
+            field = sort.lstrip("-")
+            values = {
+                "fecha_utc": lambda: self.times[:self.size].astype(np.int64),
+                "magnitud": lambda: self.magnitudes[:self.size],
+                "profundidad": lambda: self.depths[:self.size],
+            }[field]()
+            # Stable, so ties keep insertion (commit) order either way
+            order = np.argsort(-values if sort.startswith("-") else values, kind="stable")
+            self._orders[sort] = order
+        return order
+
+    def query(
+        self,
+        min_magnitude: Optional[float] = None,
+        max_magnitude: Optional[float] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        sort: str = "-fecha_utc",
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[List[str], int]:
+        """
+        IDs of one page of matching events in ``sort`` order, and the number
+        of events matching the filters
+        """
+        n = self.size
+        mask = None
+        conditions = (
+            (min_magnitude is not None, lambda: self.magnitudes[:n] >= min_magnitude),
+            (max_magnitude is not None, lambda: self.magnitudes[:n] <= max_magnitude),
+            (start is not None, lambda: self.times[:n] >= _as_datetime64(start)),
+            (end is not None, lambda: self.times[:n] <= _as_datetime64(end)),
+        )
+        for applies, condition in conditions:
+            if applies:
+                mask = condition() if mask is None else mask & condition()
+
+        order = self._order(sort)
+        if mask is None:
+            matched = n
+            page = order[offset:offset + limit]
+        else:
+            matched = int(np.count_nonzero(mask))
+            page = order[mask[order]][offset:offset + limit]
+        return self.event_ids[page].tolist(), matched
+
+
+event_store = EventStore()
@@ -0,0 +1,131 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+_WHITESPACE = re.compile(r"\s*")
+
+# A single feature larger than this without parsing means the stream is broken
+MAX_PENDING_CHARS = 4 * 1024 * 1024
+
+
+class _Incomplete(Exception):
+    """Raised when the buffer ends in the middle of a value"""
+
+
+class FeatureStreamParser:
+    """
+    Incremental parser for GeoJSON FeatureCollections
+
+    Bytes are fed in arbitrary chunks; each complete element of the top-level
+    ``features`` array is decoded on its own with the C JSON scanner and
+    handed back as soon as its closing brace arrives. Only the unparsed tail
+    of the stream is buffered, so memory stays proportional to one feature
+    rather than to the whole payload. Other top-level members (``metadata``,
+    ``bbox``) are decoded and kept in ``self.header``.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"  # start -> key -> colon -> value | array -> features/comma -> ... -> done
+        self._key = ""
+        self.header: Dict[str, Any] = {}
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Consume a chunk and return the features it completed"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        features = list(self._drain())
+        if len(self._buffer) - self._pos > MAX_PENDING_CHARS:
+            raise ValueError("GeoJSON element exceeds maximum size or stream is malformed")
+        return features
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Flush the stream; raises if the document is incomplete"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(b"", final=True)
+        self._pos = 0
+        features = list(self._drain())
+        if self._state != "done":
+            raise ValueError(f"Truncated GeoJSON document (state: {self._state})")
+        return features
+
+    def _skip_ws(self):
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+
+    def _peek(self) -> str:
+        self._skip_ws()
+        if self._pos >= len(self._buffer):
+            raise _Incomplete
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self._pos}, found {found!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            # Most likely cut at a chunk boundary; retried when more data arrives
+            raise _Incomplete
+        # A number at the very end of the buffer may continue in the next chunk
+        if end >= len(self._buffer) and isinstance(value, (int, float)):
+            raise _Incomplete
+        self._pos = end
+        return value
+
+    def _drain(self) -> Iterator[Dict[str, Any]]:
+        try:
+            while self._state != "done":
+                if self._state == "start":
+                    self._expect("{")
+                    self._state = "key"
+                elif self._state == "key":
+                    if self._peek() == "}":
+                        self._pos += 1
+                        self._state = "done"
+                        continue
+                    if self._peek() == ",":
+                        self._pos += 1
+                    self._key = self._value()
+                    self._state = "colon"
+                elif self._state == "colon":
+                    self._expect(":")
+                    self._state = "array" if self._key == "features" else "value"
+                elif self._state == "array":
+                    self._expect("[")
+                    self._state = "features"
+                elif self._state == "value":
+                    self.header[self._key] = self._value()
+                    self._state = "key"
+                elif self._state in ("features", "comma"):
+                    char = self._peek()
+                    if char == "]":
+                        self._pos += 1
+                        self._state = "key"
+                        continue
+                    if self._state == "comma":
+                        self._expect(",")
+                        self._state = "features"
+                        continue
+                    feature = self._value()
+                    self._state = "comma"
+                    yield feature
+        except _Incomplete:
+            return
+
+
+async def iter_features(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield GeoJSON features from an async byte stream as they complete"""
+    parser = FeatureStreamParser()
+    async for chunk in chunks:
+        for feature in parser.feed(chunk):
+            yield feature
+    for feature in parser.close():
+        yield feature
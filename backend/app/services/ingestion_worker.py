@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.database import create_primary_engine
+from app.metrics import POLL_CYCLE_SECONDS
+from app.models.seismic_event import IMPACT_SUMMARY_COLUMNS
+from app.services.event_queries import get_events_with_impacts
+from app.services.poll_scheduler import PollScheduler
+
+if TYPE_CHECKING:
+    from app.inference.backends import InferenceBackend
+    from app.services.seismic_processor import SeismicProcessor
+    from app.services.usgs_service import EarthquakeRecord
+
+logger = logging.getLogger(__name__)
+
+# Messages from the worker to the API loop:
+#   ("ready", {"known_events", "cached_inferences"})  warm-up finished
+#   ("committed", (EarthquakeRecord, impacts))   update in-memory read models
+#   ("revised", (EarthquakeRecord, impacts or None, changes))  same, for a USGS revision
+#   ("events", {event_id: {"event", "impacts"}})  broadcast as soon as the event is committed
+#   ("updated", {event_id: {"event", "impacts", "changes", "reassessed"}})  revisions, broadcast after a poll
+WorkerMessage = Tuple[str, Any]
+
+
+class IngestionWorker:
+    """
+    USGS poller and AI inference on a dedicated thread with its own event loop
+
+    The thread owns its database pool and HTTP clients, so a swarm of events
+    (stream parsing, inference calls, commits) never queues behind HTTP or
+    WebSocket work on the API loop. Decoding of inference responses goes to
+    a process pool. Results come back through ``outbox``, an asyncio.Queue
+    on the API loop, which is the only place the in-memory read models and
+    WebSocket connections are touched.
+    """
+
+    def __init__(self):
+        self.outbox: Optional["asyncio.Queue[WorkerMessage]"] = None
+        self.poll_count = 0
+        self.last_poll_at: Optional[float] = None
+        self.scheduler = PollScheduler()
+        # Set once the worker builds its inference client (status only)
+        self.inference_backends: List["InferenceBackend"] = []
+        # event_id -> (changes, reassessed) of revisions applied during the current poll
+        self._revised: Dict[str, Tuple[Dict[str, List[Any]], bool]] = {}
+        # Broadcasts of the events assessed during the current poll, and their magnitudes
+        self._deliveries: List[asyncio.Task] = []
+        self._assessed_magnitudes: List[float] = []
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._api_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread; call from the API event loop"""
+        self._api_loop = asyncio.get_running_loop()
+        self.outbox = asyncio.Queue()
+        self._thread = threading.Thread(target=self._thread_main, name="ingestion-worker", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """Cancel the current poll and wait for the thread to finish"""
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            logger.info("Ingestion worker stopped")
+
+    def _send(self, kind: str, payload: Any):
+        self._api_loop.call_soon_threadsafe(self.outbox.put_nowait, (kind, payload))
+
+    def _on_event_committed(self, earthquake: "EarthquakeRecord", impacts: List[Dict[str, Any]]):
+        self._send("committed", (earthquake, impacts))
+
+    def _on_event_revised(
+        self,
+        earthquake: "EarthquakeRecord",
+        impacts: Optional[List[Dict[str, Any]]],
+        changes: Dict[str, List[Any]],
+    ):
+        self._send("revised", (earthquake, impacts, changes))
+        self._revised[earthquake.event_id] = (changes, impacts is not None)
+
+    def _on_event_assessed(self, earthquake: "EarthquakeRecord", detected_at: float):
+        # Delivered while the next event in the queue is being assessed
+        self._assessed_magnitudes.append(earthquake.magnitud)
+        self._deliveries.append(asyncio.create_task(self._deliver(earthquake, detected_at)))
+
+    async def _deliver(self, earthquake: "EarthquakeRecord", detected_at: float):
+        """Broadcast one newly assessed event"""
+        from app.services.seismic_processor import observe_time_to_assessment
+
+        try:
+            async with self._session_factory() as db:
+                # Map/list clients never show AI reasoning; they fetch it on demand
+                events = await get_events_with_impacts(db, [earthquake.event_id], IMPACT_SUMMARY_COLUMNS)
+        except Exception as e:
+            logger.error(f"❌ Could not load {earthquake.event_id} for broadcast: {e}", exc_info=True)
+            return
+        if events:
+            self._send("events", events)
+            observe_time_to_assessment(earthquake, detected_at)
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._run())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _run(self):
+        # Imported here so the inference/HTTP stack loads on the worker
+        # thread instead of delaying API startup
+        from app.services.seismic_processor import SeismicProcessor
+
+        engine = create_primary_engine()
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self._session_factory = session_factory
+        cpu_pool = None
+        if settings.ingestion_cpu_workers > 0:
+            # spawn: forking a process that is running threads is unsafe
+            cpu_pool = ProcessPoolExecutor(
+                max_workers=settings.ingestion_cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        processor = SeismicProcessor(
+            cpu_executor=cpu_pool,
+            on_event_committed=self._on_event_committed,
+            on_event_revised=self._on_event_revised,
+            on_event_assessed=self._on_event_assessed,
+        )
+        self.inference_backends = processor.ai_client.backends
+
+        try:
+            try:
+                async with session_factory() as db:
+                    await processor.warm(db)
+            except Exception as e:
+                logger.error(f"❌ Ingestion warm-up failed, continuing cold: {e}", exc_info=True)
+            self._send("ready", {
+                "known_events": len(processor.known_event_ids),
+                "cached_inferences": len(processor.ai_client.cache),
+            })
+
+            self.scheduler.start()
+            while True:
+                await self._poll(processor, session_factory)
+                # Sleep until the next deadline (0 when catching up)
+                await asyncio.sleep(self.scheduler.next_delay())
+        finally:
+            await processor.aclose()
+            if cpu_pool is not None:
+                cpu_pool.shutdown(wait=False, cancel_futures=True)
+            await engine.dispose()
+
+    async def _poll(self, processor: "SeismicProcessor", session_factory):
+        self.poll_count += 1
+        start = time.perf_counter()
+        try:
+            async with session_factory() as db:
+                # Work left when the next deadline comes stays queued by priority
+                processed_ids = await processor.process_new_earthquakes(
+                    db, budget_seconds=self.scheduler.time_left()
+                )
+                revised, self._revised = self._revised, {}
+                updated = await get_events_with_impacts(db, list(revised), IMPACT_SUMMARY_COLUMNS)
+            await asyncio.gather(*self._deliveries)
+            if updated:
+                for event_id, event_data in updated.items():
+                    event_data["changes"], event_data["reassessed"] = revised[event_id]
+                self._send("updated", updated)
+            self.scheduler.record_poll(self._assessed_magnitudes)
+
+            elapsed = time.perf_counter() - start
+            POLL_CYCLE_SECONDS.observe(elapsed)
+            logger.info(
+                "📡 POLL #%d: %d new earthquake(s) in %.2fs, polling every %ds",
+                self.poll_count,
+                len(processed_ids),
+                elapsed,
+                self.scheduler.interval,
+                extra={"poll": self.poll_count, "processed": len(processed_ids), "elapsed_s": round(elapsed, 3)},
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ ERROR in polling task (poll #{self.poll_count}): {e}", exc_info=True)
+        finally:
+            # Only still pending if the poll failed or was cancelled
+            for task in self._deliveries:
+                task.cancel()
+            self._deliveries, self._assessed_magnitudes = [], []
+            self.last_poll_at = time.time()
+
+
+ingestion_worker = IngestionWorker()
@@ -0,0 +1,216 @@
+import logging
+import re
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+logger = logging.getLogger(__name__)
+
+# table -> (partitioning column, MariaDB function turning it into an integer)
+PARTITIONED_TABLES: Dict[str, Tuple[str, str]] = {
+    "eventos_sismicos": ("fecha_utc", "TO_DAYS"),
+    "impactos_pais": ("created_at", "UNIX_TIMESTAMP"),
+}
+
+# Compressed, unpartitioned copies that retention moves old partitions into
+ARCHIVE_SUFFIX = "_archive"
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# pYYYYMM holds rows before the first day of the following month
+_PARTITION_NAME = re.compile(r"^p(\d{4})(\d{2})$")
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_NAME.match(name or "")
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def _partition_clauses(table: str, first: date, last: date) -> List[str]:
+    """PARTITION definitions for every month from first to last inclusive"""
+    function = PARTITIONED_TABLES[table][1]
+    clauses = []
+    month = first
+    while month <= last:
+        boundary = _add_months(month, 1)
+        clauses.append(
+            f"PARTITION p{month:%Y%m} VALUES LESS THAN ({function}('{boundary:%Y-%m-%d}'))"
+        )
+        month = boundary
+    return clauses
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[str]:
+    """Partition names in order; empty if the table is not partitioned"""
+    result = await conn.execute(
+        text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ),
+        {"table": table},
+    )
+    return [name for (name,) in result.all() if name]
+
+
+async def _table_exists(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def apply_migrations(conn: AsyncConnection) -> List[str]:
+    """Run migrations/NNN_*.sql files not yet recorded in schema_migrations"""
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(100) PRIMARY KEY, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    result = await conn.execute(text("SELECT version FROM schema_migrations"))
+    applied = {version for (version,) in result.all()}
+
+    ran = []
+    for path in sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.sql")):
+        version = path.stem
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}")
+        sql = "\n".join(
+            line for line in path.read_text().splitlines() if not line.strip().startswith("--")
+        )
+        for statement in sql.split(";"):
+            if statement.strip():
+                await conn.execute(text(statement))
+        await conn.execute(
+            text("INSERT INTO schema_migrations (version) VALUES (:version)"),
+            {"version": version},
+        )
+        ran.append(version)
+    return ran
+
+
+async def partition_table(conn: AsyncConnection, table: str, months_ahead: int = 3) -> bool:
+    """
+    Convert an unpartitioned table to monthly RANGE partitions
+
+    Months run from the oldest row to ``months_ahead`` past today, plus a
+    catch-all ``pmax``. Rewrites the whole table once; returns False if it
+    was already partitioned.
+    """
+    if await list_partitions(conn, table):
+        return False
+
+    column, function = PARTITIONED_TABLES[table]
+    oldest = (await conn.execute(text(f"SELECT MIN({column}) FROM {table}"))).scalar()
+    this_month = _month_start(datetime.utcnow().date())
+    first = _month_start(oldest) if oldest else this_month
+    clauses = _partition_clauses(table, first, _add_months(this_month, months_ahead))
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+    logger.info(f"Partitioning {table} by month on {column} ({len(clauses)} partitions)")
+    await conn.execute(text(
+        f"ALTER TABLE {table} PARTITION BY RANGE ({function}({column})) ({', '.join(clauses)})"
+    ))
+    return True
+
+
+async def ensure_partitions(conn: AsyncConnection, table: str, months_ahead: int = 3) -> List[str]:
+    """Split pmax so monthly partitions exist up to ``months_ahead`` from now"""
+    names = await list_partitions(conn, table)
+    if not names or names[-1] != "pmax":
+        return []
+
+    this_month = _month_start(datetime.utcnow().date())
+    months = [month for month in map(_partition_month, names) if month]
+    first = _add_months(months[-1], 1) if months else this_month
+    last = _add_months(this_month, months_ahead)
+    if first > last:
+        return []
+
+    clauses = _partition_clauses(table, first, last)
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    await conn.execute(text(f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({', '.join(clauses)})"))
+    created = [clause.split()[1] for clause in clauses[:-1]]
+    logger.info(f"Created partitions {created[0]}..{created[-1]} on {table}")
+    return created
+
+
+async def _ensure_archive_table(conn: AsyncConnection, table: str) -> str:
+    archive = table + ARCHIVE_SUFFIX
+    if not await _table_exists(conn, archive):
+        await conn.execute(text(f"CREATE TABLE {archive} LIKE {table}"))
+        await conn.execute(text(f"ALTER TABLE {archive} REMOVE PARTITIONING"))
+        await conn.execute(text(f"ALTER TABLE {archive} ROW_FORMAT=COMPRESSED"))
+    return archive
+
+
+async def archive_partitions(conn: AsyncConnection, keep_months: int) -> List[str]:
+    """
+    Move monthly partitions older than ``keep_months`` into the archive tables
+
+    Impacts of archived events are moved along with them; impacts can never
+    be older than their event, so old impactos_pais partitions are left
+    empty of live references and are archived the same way. Copies use
+    INSERT IGNORE, so an interrupted run can simply be repeated.
+    """
+    cutoff = _add_months(_month_start(datetime.utcnow().date()), -keep_months)
+    moved = []
+
+    event_archive = await _ensure_archive_table(conn, "eventos_sismicos")
+    impact_archive = await _ensure_archive_table(conn, "impactos_pais")
+
+    for name in await list_partitions(conn, "eventos_sismicos"):
+        month = _partition_month(name)
+        if month is None or _add_months(month, 1) > cutoff:
+            continue
+        await conn.execute(text(
+            f"INSERT IGNORE INTO {impact_archive} SELECT i.* FROM impactos_pais i "
+            f"JOIN eventos_sismicos PARTITION ({name}) e ON e.event_id = i.event_id"
+        ))
+        await conn.execute(text(
+            f"DELETE i FROM impactos_pais i "
+            f"JOIN eventos_sismicos PARTITION ({name}) e ON e.event_id = i.event_id"
+        ))
+        await conn.execute(text(
+            f"INSERT IGNORE INTO {event_archive} SELECT * FROM eventos_sismicos PARTITION ({name})"
+        ))
+        await conn.execute(text(f"ALTER TABLE eventos_sismicos DROP PARTITION {name}"))
+        moved.append(f"eventos_sismicos.{name}")
+
+    for name in await list_partitions(conn, "impactos_pais"):
+        month = _partition_month(name)
+        if month is None or _add_months(month, 1) > cutoff:
+            continue
+        await conn.execute(text(
+            f"INSERT IGNORE INTO {impact_archive} SELECT * FROM impactos_pais PARTITION ({name})"
+        ))
+        await conn.execute(text(f"ALTER TABLE impactos_pais DROP PARTITION {name}"))
+        moved.append(f"impactos_pais.{name}")
+
+    if moved:
+        logger.info(f"Archived {len(moved)} partitions older than {cutoff:%Y-%m}")
+    return moved
+
+
+async def maintain_partitions(conn: AsyncConnection, months_ahead: int, keep_months: int):
+    """Periodic job: pre-create future partitions and apply retention (0 keeps everything)"""
+    for table in PARTITIONED_TABLES:
+        await ensure_partitions(conn, table, months_ahead)
+    if keep_months > 0:
+        await archive_partitions(conn, keep_months)
@@ -0,0 +1,151 @@
+import logging
+import math
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+from app.config import settings
+from app.metrics import POLL_INTERVAL_SECONDS, POLL_MISSED_TICKS
+
+logger = logging.getLogger(__name__)
+
+# Interval growth per consecutive poll without new events
+QUIET_RELAX_FACTOR = 1.25
+
+
+class PollScheduler:
+    """
+    Wall-clock deadlines for the USGS poller
+
+    Deadlines sit on a fixed grid (previous deadline + interval), so the
+    time a poll takes does not push the following ones back. The interval
+    adapts to activity: it drops to ``min_interval`` for ``fast_window``
+    seconds after an event of ``significant_magnitude`` or more, returns to
+    the base interval when events keep arriving, and grows by
+    QUIET_RELAX_FACTOR per empty poll up to ``max_interval``. Each sleep gets
+    up to ``jitter`` x interval of random offset, which never accumulates
+    into the grid. Ticks missed while a poll overran (or the process was
+    suspended) are coalesced into one immediate poll, and the grid moves to
+    the next deadline still in the future.
+    """
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        significant_magnitude: Optional[float] = None,
+        fast_window: Optional[float] = None,
+        jitter: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.base_interval = float(interval or settings.polling_interval_seconds)
+        self.min_interval = float(min_interval or settings.polling_min_interval_seconds)
+        self.max_interval = float(max_interval or settings.polling_max_interval_seconds)
+        self.significant_magnitude = (
+            significant_magnitude if significant_magnitude is not None else settings.polling_significant_magnitude
+        )
+        self.fast_window = float(fast_window or settings.polling_fast_window_seconds)
+        self.jitter = jitter if jitter is not None else settings.polling_jitter_ratio
+        self.clock = clock
+
+        self.interval = self.base_interval
+        self.fast_until = 0.0
+        self.quiet_polls = 0
+        self.missed_ticks = 0
+        self.last_deadline: Optional[float] = None
+        self.next_deadline: Optional[float] = None
+        self._next_wakeup: Optional[float] = None
+        POLL_INTERVAL_SECONDS.set(self.interval)
+
+    @property
+    def mode(self) -> str:
+        if self.clock() < self.fast_until:
+            return "fast"
+        return "quiet" if self.interval > self.base_interval else "normal"
+
+    def record_poll(self, magnitudes: Iterable[float]):
+        """Adapt the interval to the magnitudes of the events a poll found"""
+        now = self.clock()
+        magnitudes = list(magnitudes)
+        strongest = max(magnitudes, default=None)
+
+        if strongest is not None and strongest >= self.significant_magnitude:
+            if now >= self.fast_until:
+                logger.info(f"⚡ M{strongest} detected, polling every {self.min_interval:.0f}s")
+            self.fast_until = now + self.fast_window
+
+        if magnitudes:
+            self.quiet_polls = 0
+        else:
+            self.quiet_polls += 1
+
+        if now < self.fast_until:
+            interval = self.min_interval
+        elif magnitudes:
+            interval = self.base_interval
+        else:
+            interval = min(self.max_interval, self.base_interval * QUIET_RELAX_FACTOR ** self.quiet_polls)
+        self._set_interval(interval)
+
+    def _set_interval(self, interval: float):
+        if interval == self.interval:
+            return
+        self.interval = interval
+        POLL_INTERVAL_SECONDS.set(interval)
+        # Re-anchor so a tighter interval takes effect on this tick; never in
+        # the past, where next_delay would count the mode switch as missed ticks
+        if self.last_deadline is not None:
+            self.next_deadline = max(self.clock(), self.last_deadline) + interval
+
+    def start(self):
+        """Anchor the grid at the start of the first poll"""
+        now = self.clock()
+        self.last_deadline = now
+        self.next_deadline = now + self.interval
+        self._next_wakeup = now
+
+    def next_delay(self) -> float:
+        """Seconds to sleep before the next poll; also advances the grid"""
+        if self.last_deadline is None:
+            self.start()
+        now = self.clock()
+
+        deadline = self.next_deadline
+        if now >= deadline:
+            # Behind schedule: poll right away and skip the ticks already missed
+            missed = math.floor((now - deadline) / self.interval)
+            if missed:
+                self.missed_ticks += missed
+                POLL_MISSED_TICKS.inc(missed)
+                logger.warning(f"Poll scheduler missed {missed} tick(s), catching up")
+            self.last_deadline = deadline + missed * self.interval
+            self.next_deadline = self.last_deadline + self.interval
+            self._next_wakeup = now
+            return 0.0
+
+        self.last_deadline = deadline
+        self.next_deadline = deadline + self.interval
+        offset = random.uniform(-self.jitter, self.jitter) * self.interval
+        # Never sleep past the following deadline (wall clock stepped back)
+        delay = min(max(deadline + offset - now, 0.0), self.interval * (1 + self.jitter))
+        self._next_wakeup = now + delay
+        return delay
+
+    def time_left(self) -> float:
+        """Seconds until the deadline after the current tick"""
+        if self.next_deadline is None:
+            return self.interval
+        return max(self.next_deadline - self.clock(), 0.0)
+
+    def status(self) -> Dict[str, Any]:
+        next_poll = self._next_wakeup
+        return {
+            "mode": self.mode,
+            "current_interval_seconds": round(self.interval, 1),
+            "next_poll_at": (
+                datetime.fromtimestamp(next_poll, tz=timezone.utc).isoformat() if next_poll else None
+            ),
+            "next_poll_in_seconds": round(max(next_poll - self.clock(), 0.0), 1) if next_poll else None,
+            "missed_ticks": self.missed_ticks,
+        }
@@ -0,0 +1,107 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from app.config import settings
+from app.services.event_store import event_store
+from app.services.radius_calculator import RadiusCalculator
+from app.services.stats_aggregator import stats_aggregator
+from app.services.tile_index import tile_index
+
+if TYPE_CHECKING:
+    from app.services.usgs_service import EarthquakeRecord
+
+# Called after each commit with the event and its impact assessments
+CommitListener = Callable[["EarthquakeRecord", List[Dict[str, Any]]], None]
+
+# Called after a stored event is revised: the new values, the new impact
+# assessments (None when they were kept) and field -> [old, new] changes
+RevisionListener = Callable[["EarthquakeRecord", Optional[List[Dict[str, Any]]], Dict[str, List[Any]]], None]
+
+
+class RecentWrites:
+    """
+    Event IDs committed or revised in the last ``window`` seconds
+
+    A lagging read replica may not have them yet (or still serve the
+    previous values), so routes read these events from the primary.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        # event_id -> time.monotonic() of the last write, oldest first
+        self._written: "OrderedDict[str, float]" = OrderedDict()
+
+    def touch(self, event_id: str):
+        now = time.monotonic()
+        self._written.pop(event_id, None)
+        self._written[event_id] = now
+        while self._written:
+            oldest, written_at = next(iter(self._written.items()))
+            if now - written_at < self.window:
+                break
+            del self._written[oldest]
+
+    def __contains__(self, event_id: str) -> bool:
+        written_at = self._written.get(event_id)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+
+recent_writes = RecentWrites(settings.replica_max_lag_seconds)
+
+
+def record_committed_event(earthquake: "EarthquakeRecord", impacts: List[Dict[str, Any]]):
+    """Feed a committed event to the in-memory read models (stats, map tiles, event list)"""
+    recent_writes.touch(earthquake.event_id)
+    stats_aggregator.record_event(
+        earthquake.event_id,
+        earthquake.fecha_utc,
+        earthquake.magnitud,
+        earthquake.lugar,
+        impacts,
+    )
+    tile_index.record_event(
+        earthquake.event_id,
+        earthquake.latitud,
+        earthquake.longitud,
+        earthquake.magnitud,
+    )
+    event_store.record_event(
+        earthquake.event_id,
+        earthquake.fecha_utc,
+        earthquake.magnitud,
+        earthquake.profundidad,
+        earthquake.latitud,
+        earthquake.longitud,
+        RadiusCalculator.calculate_radius(earthquake.magnitud, earthquake.profundidad),
+    )
+
+
+def record_revised_event(
+    earthquake: "EarthquakeRecord",
+    impacts: Optional[List[Dict[str, Any]]],
+    changes: Dict[str, List[Any]],
+):
+    """Move a revised event in the in-memory read models"""
+    recent_writes.touch(earthquake.event_id)
+    stats_aggregator.revise_event(
+        earthquake.event_id,
+        earthquake.fecha_utc,
+        earthquake.magnitud,
+        earthquake.lugar,
+        impacts,
+    )
+    tile_index.revise_event(
+        earthquake.event_id,
+        earthquake.latitud,
+        earthquake.longitud,
+        earthquake.magnitud,
+    )
+    event_store.record_event(
+        earthquake.event_id,
+        earthquake.fecha_utc,
+        earthquake.magnitud,
+        earthquake.profundidad,
+        earthquake.latitud,
+        earthquake.longitud,
+        RadiusCalculator.calculate_radius(earthquake.magnitud, earthquake.profundidad),
+    )
@@ -0,0 +1,326 @@
+"""
+Bulk re-inference campaigns over stored events
+
+A campaign re-assesses the events matching a filter with one model and
+prompt version. Its impactos_pais rows carry version_impactos = campaign id
+and stay invisible to the API (which serves each event's
+eventos_sismicos.version_impactos generation) until the campaign is
+activated, which points every covered event at the new rows in a single
+transaction. Live ingestion keeps writing generation 0 meanwhile.
+
+Progress is checkpointed per chunk: an event is done once its rows for the
+campaign exist, so an interrupted run simply resumes with the events still
+pending, and running a completed campaign again retries its failures.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, bindparam, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.config import settings
+from app.inference.huggingface_client import FALLBACK_MODEL, PROMPT_VERSION, HuggingFaceInferenceClient
+from app.models.seismic_event import CampaniaInferencia, EventoSismico, ImpactoPais
+from app.services.radius_calculator import RadiusCalculator
+from app.services.revisions import revision_clock
+from app.services.seismic_processor import impact_rows
+
+logger = logging.getLogger(__name__)
+
+# Events assessed between checkpoints (one commit each)
+CHUNK_SIZE = 50
+
+# campanias_inferencia.estado
+RUNNING = "en_curso"
+COMPLETED = "completada"
+ACTIVE = "activada"
+
+FILTER_KEYS = ("since", "until", "min_magnitude", "max_magnitude", "event_ids")
+
+# Columns an assessment needs
+_EVENT_FIELDS = (
+    EventoSismico.event_id,
+    EventoSismico.fecha_utc,
+    EventoSismico.magnitud,
+    EventoSismico.profundidad,
+    EventoSismico.latitud,
+    EventoSismico.longitud,
+    EventoSismico.lugar,
+    EventoSismico.radio_afectacion_km,
+)
+
+
+def event_filter(filtro: Dict[str, Any]) -> List[Any]:
+    """
+    WHERE conditions for a campaign filter
+
+    Keys: since / until (ISO dates on fecha_utc), min_magnitude /
+    max_magnitude and event_ids; all optional, an empty filter selects
+    every stored event.
+    """
+    unknown = set(filtro) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown campaign filter keys: {', '.join(sorted(unknown))}")
+    conditions = []
+    if filtro.get("since"):
+        conditions.append(EventoSismico.fecha_utc >= datetime.fromisoformat(filtro["since"]))
+    if filtro.get("until"):
+        conditions.append(EventoSismico.fecha_utc <= datetime.fromisoformat(filtro["until"]))
+    if filtro.get("min_magnitude") is not None:
+        conditions.append(EventoSismico.magnitud >= filtro["min_magnitude"])
+    if filtro.get("max_magnitude") is not None:
+        conditions.append(EventoSismico.magnitud <= filtro["max_magnitude"])
+    if filtro.get("event_ids"):
+        conditions.append(EventoSismico.event_id.in_(filtro["event_ids"]))
+    return conditions
+
+
+def _has_rows(campaign_id: int):
+    # Served by idx_event_version
+    return exists().where(
+        ImpactoPais.event_id == EventoSismico.event_id,
+        ImpactoPais.version_impactos == campaign_id,
+    )
+
+
+class RateLimiter:
+    """Spaces calls at least 60 / per_minute seconds apart (0 = unlimited)"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def create_campaign(db: AsyncSession, filtro: Dict[str, Any], model: str) -> CampaniaInferencia:
+    """Register a campaign for the events matching ``filtro``, assessed with ``model``"""
+    total = await db.scalar(select(func.count(EventoSismico.id)).where(*event_filter(filtro)))
+    campaign = CampaniaInferencia(
+        modelo_ia=model,
+        version_prompt=PROMPT_VERSION,
+        filtro=filtro,
+        estado=RUNNING,
+        total_eventos=total or 0,
+    )
+    db.add(campaign)
+    await db.commit()
+    await db.refresh(campaign)
+    logger.info(f"Created inference campaign {campaign.id} for {campaign.total_eventos} events with {model}")
+    return campaign
+
+
+class CampaignRunner:
+    """
+    Runs a campaign's pending events through the inference layer
+
+    At most ``concurrency`` assessments are in flight and at most
+    ``rate_per_minute`` start per minute, so a campaign can share the
+    backends with live ingestion. Assessments that end in the rule-based
+    fallback are not written; they stay pending for the next run, and an
+    activation leaves those events on their current impacts.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        client: Optional[HuggingFaceInferenceClient] = None,
+        concurrency: Optional[int] = None,
+        rate_per_minute: Optional[float] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.client = client or HuggingFaceInferenceClient()
+        self.semaphore = asyncio.Semaphore(max(1, concurrency or settings.campaign_concurrency))
+        self.limiter = RateLimiter(settings.campaign_rate_per_minute if rate_per_minute is None else rate_per_minute)
+        self.chunk_size = chunk_size
+
+    def _use_model(self, model: str):
+        """Ask every backend for the campaign's model"""
+        if model == self.client.model:
+            return
+        self.client.model = model
+        for backend in self.client.backends:
+            backend.model = model
+
+    async def run(self, campaign_id: int) -> CampaniaInferencia:
+        async with self.session_factory() as db:
+            campaign = await db.get(CampaniaInferencia, campaign_id)
+            if campaign is None:
+                raise ValueError(f"Campaign {campaign_id} does not exist")
+            if campaign.estado == ACTIVE:
+                raise ValueError(f"Campaign {campaign_id} is already active")
+            if campaign.version_prompt != PROMPT_VERSION:
+                raise ValueError(
+                    f"Campaign {campaign_id} uses prompt version {campaign.version_prompt}, "
+                    f"this build has {PROMPT_VERSION}"
+                )
+            conditions = event_filter(campaign.filtro or {})
+            # Failures are counted per run; those events are retried by the next one
+            await db.execute(
+                update(CampaniaInferencia)
+                .where(CampaniaInferencia.id == campaign_id)
+                .values(estado=RUNNING, fallos=0)
+            )
+            await db.commit()
+            await self.client.cache.load(db)
+        self._use_model(campaign.modelo_ia)
+
+        cursor: Optional[Tuple[datetime, str]] = None
+        started = time.perf_counter()
+        assessed = 0
+        while True:
+            chunk = await self._pending(campaign_id, conditions, cursor)
+            if not chunk:
+                break
+            results = await asyncio.gather(*(self._assess(event) for event in chunk))
+            written = await self._checkpoint(campaign_id, chunk, results)
+            assessed += len(chunk)
+            cursor = (chunk[-1].fecha_utc, chunk[-1].event_id)
+            logger.info(
+                f"Campaign {campaign_id}: {written}/{len(chunk)} events written "
+                f"({assessed / (time.perf_counter() - started) * 60:.1f} events/min)"
+            )
+
+        # Every selected event was attempted; the ones that failed keep their current impacts
+        async with self.session_factory() as db:
+            campaign = await db.get(CampaniaInferencia, campaign_id)
+            campaign.estado = COMPLETED
+            await db.commit()
+        logger.info(
+            f"Campaign {campaign_id} completed: {campaign.eventos_procesados}/{campaign.total_eventos} events, "
+            f"{campaign.fallos} failed in this run"
+        )
+        return campaign
+
+    async def _pending(
+        self, campaign_id: int, conditions: List[Any], cursor: Optional[Tuple[datetime, str]]
+    ) -> Sequence[Any]:
+        """Next chunk of events without rows for the campaign, newest first, after ``cursor``"""
+        query = select(*_EVENT_FIELDS).where(*conditions, ~_has_rows(campaign_id))
+        if cursor is not None:
+            fecha_utc, event_id = cursor
+            # Skips events that failed earlier in this run
+            query = query.where(or_(
+                EventoSismico.fecha_utc < fecha_utc,
+                and_(EventoSismico.fecha_utc == fecha_utc, EventoSismico.event_id > event_id),
+            ))
+        query = query.order_by(EventoSismico.fecha_utc.desc(), EventoSismico.event_id).limit(self.chunk_size)
+        async with self.session_factory() as db:
+            return (await db.execute(query)).all()
+
+    async def _assess(self, event: Any) -> Optional[List[Dict[str, Any]]]:
+        """Impacts for one event, or None if no backend produced an assessment"""
+        magnitud, profundidad = float(event.magnitud), float(event.profundidad)
+        radio_km = (
+            float(event.radio_afectacion_km)
+            if event.radio_afectacion_km is not None
+            else RadiusCalculator.calculate_radius(magnitud, profundidad)
+        )
+        async with self.semaphore:
+            await self.limiter.wait()
+            impacts = await self.client.infer_impact(
+                latitud=float(event.latitud),
+                longitud=float(event.longitud),
+                magnitud=magnitud,
+                profundidad=profundidad,
+                radio_km=radio_km,
+                lugar=event.lugar or "",
+            )
+        if not impacts or impacts[0].get("modelo_ia") == FALLBACK_MODEL:
+            logger.warning(f"Campaign assessment of {event.event_id} failed, left pending")
+            return None
+        return impacts
+
+    async def _checkpoint(
+        self, campaign_id: int, chunk: Sequence[Any], results: List[Optional[List[Dict[str, Any]]]]
+    ) -> int:
+        """Write a chunk's impact rows and the campaign counters in one commit"""
+        written = 0
+        async with self.session_factory() as db:
+            for event, impacts in zip(chunk, results):
+                if impacts is not None:
+                    db.add_all(impact_rows(event.event_id, impacts, campaign_id))
+                    written += 1
+            await db.execute(
+                update(CampaniaInferencia)
+                .where(CampaniaInferencia.id == campaign_id)
+                .values(
+                    eventos_procesados=CampaniaInferencia.eventos_procesados + written,
+                    fallos=CampaniaInferencia.fallos + (len(chunk) - written),
+                    checkpoint_at=func.now(),
+                )
+            )
+            await db.commit()
+            await self.client.cache.flush(db)
+        return written
+
+
+async def activate_campaign(db: AsyncSession, campaign_id: int) -> int:
+    """
+    Make a completed campaign's impacts the ones the API serves
+
+    Every event the campaign wrote rows for is pointed at them, and given a
+    new sync revision so /changes and reconnecting clients pick up the new
+    assessment, in one transaction: readers see either the previous
+    generation of every event or the campaign's. Returns the number of
+    events switched.
+    """
+    campaign = await db.get(CampaniaInferencia, campaign_id)
+    if campaign is None:
+        raise ValueError(f"Campaign {campaign_id} does not exist")
+    if campaign.estado != COMPLETED:
+        raise ValueError(f"Campaign {campaign_id} is {campaign.estado}, only a completed campaign can be activated")
+
+    covered = (*event_filter(campaign.filtro or {}), _has_rows(campaign_id))
+    event_ids = (await db.scalars(select(EventoSismico.event_id).where(*covered))).all()
+
+    campaign.estado = ACTIVE
+    campaign.activated_at = func.now()
+    await db.flush()
+    if event_ids:
+        table = EventoSismico.__table__
+        connection = await db.connection()
+        # Revisions are taken last, right before the commit, so they are not
+        # committed long after higher ones from other writers
+        await connection.execute(
+            update(table).where(*covered).values(version_impactos=campaign_id)
+        )
+        # One revision per event so /changes pages never split a tie
+        await connection.execute(
+            update(table)
+            .where(table.c.event_id == bindparam("b_event_id"))
+            .values(revision=bindparam("b_revision")),
+            [{"b_event_id": event_id, "b_revision": revision_clock.next()} for event_id in event_ids],
+        )
+    await db.commit()
+    logger.info(f"Activated inference campaign {campaign_id} on {len(event_ids)} events")
+    return len(event_ids)
+
+
+async def campaign_status(db: AsyncSession) -> List[Dict[str, Any]]:
+    result = await db.execute(select(CampaniaInferencia).order_by(CampaniaInferencia.id))
+    return [
+        {
+            "id": campaign.id,
+            "modelo_ia": campaign.modelo_ia,
+            "version_prompt": campaign.version_prompt,
+            "filtro": campaign.filtro,
+            "estado": campaign.estado,
+            "total_eventos": campaign.total_eventos,
+            "eventos_procesados": campaign.eventos_procesados,
+            "fallos": campaign.fallos,
+            "checkpoint_at": campaign.checkpoint_at,
+            "activated_at": campaign.activated_at,
+        }
+        for campaign in result.scalars()
+    ]
+
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class RevisionClock:
+    """
+    Monotonic revision numbers for sync tokens
+
+    Revisions are microseconds since the epoch, bumped by one when two are
+    requested within the same microsecond (or the wall clock steps back), so
+    they are strictly increasing within a process and roughly ordered by
+    time across processes. Rows written before revisions existed carry their
+    primary key instead, which is always far below any clock value.
+
+    Writers take a revision right before committing, never before slow work
+    (inference), so revisions become visible in roughly increasing order.
+    The API loop and the ingestion worker thread share the clock.
+    """
+
+    def __init__(self):
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            self._last = max(self._last + 1, time.time_ns() // 1000)
+            return self._last
+
+    def now(self) -> int:
+        """Current clock value without consuming a revision"""
+        return max(self._last, time.time_ns() // 1000)
+
+
+revision_clock = RevisionClock()
@@ -1,15 +1,95 @@
+import heapq
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import time
+from concurrent.futures import Executor
+from dataclasses import replace
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.seismic_event import EventoSismico, ImpactoPais
+from sqlalchemy import delete, func, select
+from app.config import settings
+from app.models.seismic_event import AliasEvento, CampaniaInferencia, EventoSismico, ImpactoPais
+from app.services.event_matcher import EventMatcher
+from app.services.event_priority import event_priority
+from app.services.event_revisions import fingerprint, needs_reassessment, revision_changes
 from app.services.radius_calculator import RadiusCalculator
-from app.services.usgs_service import USGSService
-from app.inference.huggingface_client import HuggingFaceInferenceClient
+from app.services.usgs_service import USGSService, EarthquakeRecord
+from app.inference.huggingface_client import PROMPT_VERSION, HuggingFaceInferenceClient
+from app.metrics import (
+    ASSESSMENT_QUEUE_DEPTH,
+    ASSESSMENTS_DEFERRED,
+    DB_COMMIT_SECONDS,
+    EVENTS_PROCESSED,
+    EVENT_CACHE_HITS,
+    EVENTS_MERGED,
+    EVENTS_REVISED,
+    REVISION_REASSESSMENTS,
+    SIGNIFICANT_TIME_TO_ASSESSMENT_SECONDS,
+    TIME_TO_ASSESSMENT_SECONDS,
+)
+from app.services.read_models import (
+    CommitListener,
+    RevisionListener,
+    record_committed_event,
+    record_revised_event,
+)
+from app.services.revisions import revision_clock
 
 logger = logging.getLogger(__name__)
 
+# Event IDs remembered in memory; covers the 24h USGS query window with margin
+KNOWN_EVENTS_WINDOW = timedelta(hours=26)
+
+# EventoSismico columns a USGS revision can change
+REVISED_FIELDS = ("magnitud", "profundidad", "latitud", "longitud", "fecha_utc", "lugar")
+
+# Called once a queued event is assessed and committed, with its time.monotonic() detection time
+AssessmentListener = Callable[[EarthquakeRecord, float], None]
+
+
+def observe_time_to_assessment(earthquake: EarthquakeRecord, detected_at: float):
+    """Record how long an event took from detection to reaching clients"""
+    waited = time.monotonic() - detected_at
+    TIME_TO_ASSESSMENT_SECONDS.observe(waited)
+    if earthquake.magnitud >= settings.polling_significant_magnitude:
+        SIGNIFICANT_TIME_TO_ASSESSMENT_SECONDS.observe(waited)
+
+
+def _fingerprint(earthquake: EarthquakeRecord) -> bytes:
+    return fingerprint(
+        earthquake.magnitud,
+        earthquake.profundidad,
+        earthquake.latitud,
+        earthquake.longitud,
+        earthquake.fecha_utc,
+        earthquake.lugar,
+    )
+
+
+def impact_rows(event_id: str, impacts: List[Dict[str, Any]], version: int = 0) -> List[ImpactoPais]:
+    """impactos_pais rows of one assessment; ``version`` 0 is live ingestion, else a campaign id"""
+    return [
+        ImpactoPais(
+            event_id=event_id,
+            version_impactos=version,
+            modelo_ia=impact_data.get("modelo_ia"),
+            version_prompt=PROMPT_VERSION,
+            pais=impact_data["pais"],
+            ciudades_afectadas=impact_data.get("ciudades_afectadas", []),
+            muertes_estimadas=impact_data.get("muertes_estimadas", 0),
+            heridos_estimados=impact_data.get("heridos_estimados", 0),
+            perdidas_monetarias_usd=impact_data.get("perdidas_monetarias_usd", 0),
+            nivel_destruccion=impact_data.get("nivel_destruccion", "Bajo"),
+            fuentes_inferidas=impact_data.get("fuentes_inferidas", []),
+            razonamiento_ia=impact_data.get("razonamiento"),  # NEW: AI reasoning
+            factores_considerados=impact_data.get("factores_considerados"),  # NEW: Factors considered
+            codigo_construccion=impact_data.get("codigo_construccion"),  # NEW: Building code
+            nivel_preparacion_sismica=impact_data.get("nivel_preparacion_sismica", "Media"),
+            densidad_poblacional=impact_data.get("densidad_poblacional", "Media"),
+        )
+        for impact_data in impacts
+    ]
+
 
 class SeismicProcessor:
     """
@@ -17,46 +97,233 @@ class SeismicProcessor:
     Orchestrates the entire pipeline from ingestion to impact assessment
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        cpu_executor: Optional[Executor] = None,
+        on_event_committed: CommitListener = record_committed_event,
+        on_event_revised: RevisionListener = record_revised_event,
+        on_event_assessed: AssessmentListener = observe_time_to_assessment,
+    ):
         self.usgs_service = USGSService()
         self.radius_calculator = RadiusCalculator()
-        self.ai_client = HuggingFaceInferenceClient()
+        self.ai_client = HuggingFaceInferenceClient(cpu_executor)
+        # The ingestion worker thread hands this over to the API loop instead
+        self.on_event_committed = on_event_committed
+        self.on_event_revised = on_event_revised
+        # The ingestion worker broadcasts from here, without waiting for the rest of the queue
+        self.on_event_assessed = on_event_assessed
+        # event_id -> fecha_utc of events already stored, so a poll re-reading
+        # the last 24h does not hit the database once per feature
+        self.known_event_ids: Dict[str, datetime] = {}
+        # event_id -> fingerprint of the stored material fields; a report
+        # hashing the same is skipped without touching the database
+        self.fingerprints: Dict[str, bytes] = {}
+        # Other network IDs and near-identical reports of stored/queued events
+        self.matcher = EventMatcher()
+        # New events and revisions waiting for an impact assessment:
+        # (-priority, sequence, detected_at, earthquake)
+        self._queue: List[Tuple[float, int, float, EarthquakeRecord]] = []
+        # event_id -> latest report of a queued new event (revisions replace it)
+        self._queued: Dict[str, EarthquakeRecord] = {}
+        # event_id -> (latest report, fingerprint) of a queued reassessment of a stored event
+        self._reassessments: Dict[str, Tuple[EarthquakeRecord, bytes]] = {}
+        self._sequence = 0
+
+    async def warm(self, db: AsyncSession):
+        """Preload recent event IDs, their aliases and the inference cache"""
+        since = datetime.utcnow() - KNOWN_EVENTS_WINDOW
+        result = await db.execute(
+            select(
+                EventoSismico.event_id,
+                EventoSismico.fecha_utc,
+                *(getattr(EventoSismico, field) for field in REVISED_FIELDS),
+            ).where(EventoSismico.fecha_utc >= since)
+        )
+        rows = result.all()
+        self.known_event_ids = {row[0]: row[1] for row in rows}
+        self.fingerprints = {row[0]: fingerprint(*row[2:]) for row in rows}
+        logger.info(f"Preloaded {len(self.known_event_ids)} recent event IDs")
+        await self.matcher.warm(db, since)
+        # Downtime since the newest stored event is backfilled on the first poll
+        latest = await db.scalar(select(func.max(EventoSismico.fecha_utc)))
+        self.usgs_service.resume_from(latest)
+        await self.ai_client.cache.load(db)
+
+    async def aclose(self):
+        await self.usgs_service.aclose()
+        await self.ai_client.aclose()
 
-    async def process_new_earthquakes(self, db: AsyncSession) -> List[str]:
+    def _forget_old_events(self):
+        cutoff = datetime.utcnow() - KNOWN_EVENTS_WINDOW
+        stale = [event_id for event_id, fecha in self.known_event_ids.items() if fecha < cutoff]
+        for event_id in stale:
+            del self.known_event_ids[event_id]
+            self.fingerprints.pop(event_id, None)
+        self.matcher.forget_before(cutoff)
+
+    async def process_new_earthquakes(self, db: AsyncSession, budget_seconds: Optional[float] = None) -> List[str]:
         """
-        Fetch and process new earthquakes from USGS
+        Fetch new earthquakes from USGS and assess them by priority
+
+        New events go on a heap keyed by event_priority (magnitude, shallow
+        depth, population exposure), so the slow AI assessment runs for the
+        events that matter first. With ``budget_seconds`` the queue is only
+        drained until the budget is spent: the remaining low-priority jobs
+        stay queued, and events detected by the next poll can overtake them.
+
+        Reports of stored events whose material fields changed (USGS keeps
+        refining magnitude, depth and location in the first hour) update the
+        stored event; see _revise_stored_event. Cosmetic revisions are applied
+        right away; those needing a new assessment join the same heap and
+        budget as new events, so an aftershock swarm being refined does not
+        hold back a new mainshock.
 
         Returns:
             List of processed event IDs
         """
-        # Fetch recent earthquakes
-        earthquakes = await self.usgs_service.fetch_recent_earthquakes()
+        self._forget_old_events()
+        # event_id -> (report, fingerprint), applied once the stream is closed
+        revised: Dict[str, Tuple[EarthquakeRecord, bytes]] = {}
 
-        processed_ids = []
-
-        for eq_data in earthquakes:
+        # Earthquakes are consumed as they are parsed from the USGS stream
+        async for earthquake in self.usgs_service.stream_new_earthquakes():
             try:
-                # Check if event already exists
-                existing = await self._get_event_by_id(db, eq_data["event_id"])
-                if existing:
-                    logger.info(f"Event {eq_data['event_id']} already processed, skipping")
+                if earthquake.event_id in self.known_event_ids or earthquake.event_id in self._queued:
+                    self._check_revision(earthquake.event_id, earthquake, revised)
                     continue
 
-                # Process the earthquake
-                event_id = await self.process_single_earthquake(db, eq_data)
-                if event_id:
-                    processed_ids.append(event_id)
+                # Same quake under another network ID, or a near-identical report
+                canonical = self.matcher.resolve(
+                    earthquake.event_id,
+                    earthquake.ids,
+                    earthquake.fecha_utc,
+                    earthquake.latitud,
+                    earthquake.longitud,
+                    earthquake.magnitud,
+                )
+                if canonical is None:
+                    # Older than the preloaded window, or stored by another instance
+                    canonical = await self._find_stored_event(db, earthquake)
+                    if canonical == earthquake.event_id:
+                        self.known_event_ids[canonical] = earthquake.fecha_utc
+                        logger.debug("Event %s already processed", canonical)
+                        self._check_revision(canonical, earthquake, revised)
+                        continue
+                if canonical is not None:
+                    await self._merge_duplicate(db, canonical, earthquake)
+                    if canonical in earthquake.ids:
+                        # USGS changed the preferred ID: this is the event itself, not another network's report
+                        self._check_revision(canonical, earthquake, revised)
+                    continue
+
+                self._enqueue(earthquake)
+
+            except Exception as e:
+                logger.error(f"Error queueing earthquake {earthquake.event_id}: {e}")
+                continue
+
+        for earthquake, digest in revised.values():
+            await self._revise_stored_event(db, earthquake, digest)
+
+        return await self._drain_queue(db, budget_seconds)
+
+    def _check_revision(
+        self,
+        event_id: str,
+        earthquake: EarthquakeRecord,
+        revised: Dict[str, Tuple[EarthquakeRecord, bytes]],
+    ):
+        """Collect a report of a known event into ``revised`` if its material fields changed"""
+        if earthquake.event_id != event_id:
+            earthquake = replace(earthquake, event_id=event_id)
+        if event_id in self._queued:
+            # Not assessed yet, so the latest values are simply assessed instead
+            self._queued[event_id] = earthquake
+            EVENT_CACHE_HITS.inc()
+            return
+        digest = _fingerprint(earthquake)
+        if event_id in self._reassessments:
+            # Checked against the stored values again when drained
+            self._reassessments[event_id] = (earthquake, digest)
+            return
+        if self.fingerprints.get(event_id) == digest:
+            EVENT_CACHE_HITS.inc()
+            return
+        revised[event_id] = (earthquake, digest)
+
+    def _push(self, earthquake: EarthquakeRecord):
+        radio_km = self.radius_calculator.calculate_radius(earthquake.magnitud, earthquake.profundidad)
+        priority = event_priority(
+            earthquake.magnitud, earthquake.profundidad, earthquake.latitud, earthquake.longitud, radio_km
+        )
+        self._sequence += 1
+        # heapq is a min-heap; the sequence keeps equal priorities in arrival order
+        heapq.heappush(self._queue, (-priority, self._sequence, time.monotonic(), earthquake))
+        ASSESSMENT_QUEUE_DEPTH.set(len(self._queue))
+
+    def _enqueue(self, earthquake: EarthquakeRecord):
+        self._push(earthquake)
+        self._queued[earthquake.event_id] = earthquake
+        self.matcher.add(
+            earthquake.event_id,
+            earthquake.fecha_utc,
+            earthquake.latitud,
+            earthquake.longitud,
+            earthquake.magnitud,
+            earthquake.ids,
+        )
+
+    async def _drain_queue(self, db: AsyncSession, budget_seconds: Optional[float]) -> List[str]:
+        processed_ids = []
+        failed = False
+        deadline = time.monotonic() + budget_seconds if budget_seconds is not None else None
+
+        while self._queue:
+            if deadline is not None and time.monotonic() >= deadline:
+                ASSESSMENTS_DEFERRED.inc(len(self._queue))
+                logger.info(f"⏸️ {len(self._queue)} lower-priority assessment(s) deferred to the next poll")
+                break
 
+            neg_priority, _, detected_at, earthquake = heapq.heappop(self._queue)
+            ASSESSMENT_QUEUE_DEPTH.set(len(self._queue))
+            if earthquake.event_id in self._reassessments:
+                earthquake, digest = self._reassessments.pop(earthquake.event_id)
+                await self._revise_stored_event(db, earthquake, digest, defer_reassessment=False)
+                continue
+
+            earthquake = self._queued.pop(earthquake.event_id, earthquake)
+            try:
+                event_id = await self.process_single_earthquake(db, earthquake)
             except Exception as e:
-                logger.error(f"Error processing earthquake {eq_data.get('event_id')}: {e}")
+                logger.error(f"Error processing earthquake {earthquake.event_id}: {e}")
+                event_id = None
+
+            if not event_id:
+                failed = True
+                self.matcher.discard(earthquake.event_id)
                 continue
 
+            processed_ids.append(event_id)
+            self.known_event_ids[event_id] = earthquake.fecha_utc
+            self.fingerprints[event_id] = _fingerprint(earthquake)
+            logger.debug(
+                "Assessed %s (priority %.2f) %.1fs after detection",
+                event_id,
+                -neg_priority,
+                time.monotonic() - detected_at,
+            )
+            self.on_event_assessed(earthquake, detected_at)
+
+        if failed:
+            # An unchanged feed would answer 304 and never retry the failures
+            self.usgs_service.forget_validators()
+
         return processed_ids
 
     async def process_single_earthquake(
         self,
         db: AsyncSession,
-        eq_data: Dict[str, Any]
+        earthquake: EarthquakeRecord
     ) -> Optional[str]:
         """
         Process a single earthquake event through the complete pipeline
@@ -66,125 +333,207 @@ class SeismicProcessor:
         2. Use AI to infer affected countries and impact
         3. Save to database
 
+        The sync revision is taken right before the commit, after the
+        inference call: a revision taken earlier could be committed after
+        higher ones written meanwhile and be skipped by /changes clients.
+
         Returns:
             Event ID if successful, None otherwise
         """
         try:
             # Step 1: Calculate radius
             radio_km = self.radius_calculator.calculate_radius(
-                eq_data["magnitud"],
-                eq_data["profundidad"]
+                earthquake.magnitud,
+                earthquake.profundidad
             )
 
-            eq_data["radio_afectacion_km"] = radio_km
-
             logger.info(
-                f"Processing earthquake {eq_data['event_id']}: "
-                f"Mag {eq_data['magnitud']}, Depth {eq_data['profundidad']}km, "
-                f"Radius {radio_km}km"
+                "Processing earthquake %s: Mag %s, Depth %skm, Radius %skm",
+                earthquake.event_id,
+                earthquake.magnitud,
+                earthquake.profundidad,
+                radio_km,
+                extra={"event_detail": True, "event_id": earthquake.event_id},
             )
 
-            # Step 2: Create event record
-            evento = EventoSismico(**eq_data)
-            db.add(evento)
-            await db.flush()  # Get the ID without committing
-
-            # Step 3: Use AI to infer impact
+            # Step 2: Use AI to infer impact
             impacts = await self.ai_client.infer_impact(
-                latitud=eq_data["latitud"],
-                longitud=eq_data["longitud"],
-                magnitud=eq_data["magnitud"],
-                profundidad=eq_data["profundidad"],
+                latitud=earthquake.latitud,
+                longitud=earthquake.longitud,
+                magnitud=earthquake.magnitud,
+                profundidad=earthquake.profundidad,
                 radio_km=radio_km,
-                lugar=eq_data.get("lugar", ""),
+                lugar=earthquake.lugar or "",
             )
 
-            # Step 4: Save impact assessments
-            for impact_data in impacts:
-                impacto = ImpactoPais(
-                    event_id=eq_data["event_id"],
-                    pais=impact_data["pais"],
-                    ciudades_afectadas=impact_data.get("ciudades_afectadas", []),
-                    muertes_estimadas=impact_data.get("muertes_estimadas", 0),
-                    heridos_estimados=impact_data.get("heridos_estimados", 0),
-                    perdidas_monetarias_usd=impact_data.get("perdidas_monetarias_usd", 0),
-                    nivel_destruccion=impact_data.get("nivel_destruccion", "Bajo"),
-                    fuentes_inferidas=impact_data.get("fuentes_inferidas", []),
-                    razonamiento_ia=impact_data.get("razonamiento"),  # NEW: AI reasoning
-                    factores_considerados=impact_data.get("factores_considerados"),  # NEW: Factors considered
-                    codigo_construccion=impact_data.get("codigo_construccion"),  # NEW: Building code
-                    nivel_preparacion_sismica=impact_data.get("nivel_preparacion_sismica", "Media"),
-                    densidad_poblacional=impact_data.get("densidad_poblacional", "Media"),
-                )
-                db.add(impacto)
+            # Step 3: Save the event and its impact assessments
+            # event_id is only unique per fecha_utc in the partitioned table, and
+            # POST /process can store the same event as the ingestion worker. The
+            # locking read blocks a concurrent insert of the event until this
+            # transaction ends (InnoDB gap lock on idx_event), so one of two
+            # racing writers sees the other's row or fails on a deadlock and
+            # rolls back, instead of storing a second copy.
+            stored = await db.scalar(
+                select(EventoSismico.id).where(EventoSismico.event_id == earthquake.event_id).with_for_update()
+            )
+            if stored is not None:
+                await db.rollback()
+                logger.info(f"Earthquake {earthquake.event_id} was stored meanwhile by another writer")
+                return None
+            db.add(EventoSismico(
+                **earthquake.as_dict(),
+                radio_afectacion_km=radio_km,
+                revision=revision_clock.next(),
+            ))
+            # Other network IDs, including any merged while the event was queued
+            for alias_id in self.matcher.aliases_of(earthquake.event_id):
+                db.add(AliasEvento(alias_id=alias_id, event_id=earthquake.event_id))
+            db.add_all(impact_rows(earthquake.event_id, impacts))
 
-            await db.commit()
+            with DB_COMMIT_SECONDS.time():
+                await db.commit()
+            EVENTS_PROCESSED.inc()
+            self.on_event_committed(earthquake, impacts)
+            await self.ai_client.cache.flush(db)
 
             logger.info(
-                f"Successfully processed earthquake {eq_data['event_id']} "
-                f"with {len(impacts)} impact assessments"
+                "Successfully processed earthquake %s with %d impact assessments",
+                earthquake.event_id,
+                len(impacts),
+                extra={"event_id": earthquake.event_id, "impacts": len(impacts)},
             )
 
-            return eq_data["event_id"]
+            return earthquake.event_id
 
         except Exception as e:
             await db.rollback()
             logger.error(f"Error in process_single_earthquake: {e}")
             return None
 
-    async def _get_event_by_id(self, db: AsyncSession, event_id: str) -> Optional[EventoSismico]:
-        """Get event by ID from database"""
-        result = await db.execute(
-            select(EventoSismico).where(EventoSismico.event_id == event_id)
-        )
-        return result.scalar_one_or_none()
-
-    async def get_event_with_impacts(
+    async def _revise_stored_event(
         self,
         db: AsyncSession,
-        event_id: str
-    ) -> Optional[Dict[str, Any]]:
+        earthquake: EarthquakeRecord,
+        digest: bytes,
+        defer_reassessment: bool = True,
+    ):
         """
-        Get complete event data with all impact assessments
+        Apply a USGS revision to a stored event
+
+        The event row always takes the new values and a new sync revision.
+        The impact assessment is re-run only when magnitude, depth or
+        epicenter moved past the revision_* thresholds; smaller (cosmetic)
+        revisions cost no inference. With ``defer_reassessment`` such a
+        revision is queued by priority instead and nothing is written yet.
         """
-        # Get event
-        event = await self._get_event_by_id(db, event_id)
-        if not event:
-            return None
+        event_id = earthquake.event_id
+        try:
+            evento = await db.scalar(select(EventoSismico).where(EventoSismico.event_id == event_id))
+            if evento is None:
+                return
+            stored = {field: getattr(evento, field) for field in REVISED_FIELDS}
+            values = earthquake.as_dict()
+            changes = revision_changes(stored, values)
+            if not changes:
+                # First report seen for an event stored before this process started
+                self.fingerprints[event_id] = digest
+                return
 
-        # Get impacts
-        result = await db.execute(
-            select(ImpactoPais).where(ImpactoPais.event_id == event_id)
+            reassess = needs_reassessment(stored, values)
+            if reassess and defer_reassessment:
+                await db.rollback()
+                self._reassessments[event_id] = (earthquake, digest)
+                self._push(earthquake)
+                return
+            radio_km = self.radius_calculator.calculate_radius(earthquake.magnitud, earthquake.profundidad)
+            for field in REVISED_FIELDS:
+                setattr(evento, field, values[field])
+            evento.radio_afectacion_km = radio_km
+
+            impacts = None
+            if reassess:
+                impacts = await self.ai_client.infer_impact(
+                    latitud=earthquake.latitud,
+                    longitud=earthquake.longitud,
+                    magnitud=earthquake.magnitud,
+                    profundidad=earthquake.profundidad,
+                    radio_km=radio_km,
+                    lugar=earthquake.lugar or "",
+                )
+                # Live rows are replaced. Rows of campaigns not activated yet were
+                # assessed from the old values, so they go too and a later
+                # activation leaves the event on these impacts; generations of
+                # activated campaigns are kept but no longer served
+                pending_campaigns = select(CampaniaInferencia.id).where(CampaniaInferencia.activated_at.is_(None))
+                await db.execute(
+                    delete(ImpactoPais).where(
+                        ImpactoPais.event_id == event_id,
+                        (ImpactoPais.version_impactos == 0) | ImpactoPais.version_impactos.in_(pending_campaigns),
+                    )
+                )
+                db.add_all(impact_rows(event_id, impacts))
+                evento.version_impactos = 0
+
+            # Taken after the inference call, right before the commit (see process_single_earthquake)
+            evento.revision = revision_clock.next()
+            with DB_COMMIT_SECONDS.time():
+                await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error revising earthquake {event_id}: {e}")
+            # Retry with the next full feed download
+            self.usgs_service.forget_validators()
+            return
+
+        self.fingerprints[event_id] = digest
+        self.known_event_ids[event_id] = earthquake.fecha_utc
+        EVENTS_REVISED.inc()
+        if reassess:
+            REVISION_REASSESSMENTS.inc()
+        self.on_event_revised(earthquake, impacts, changes)
+        if impacts is not None:
+            await self.ai_client.cache.flush(db)
+
+        logger.info(
+            "✏️ Earthquake %s revised by USGS (%s), %s",
+            event_id,
+            ", ".join(changes),
+            "impacts reassessed" if reassess else "impacts kept",
+            extra={"event_id": event_id, "changes": changes, "reassessed": reassess},
         )
-        impacts = result.scalars().all()
-
-        return {
-            "event": {
-                "event_id": event.event_id,
-                "magnitud": float(event.magnitud),
-                "profundidad": float(event.profundidad),
-                "latitud": float(event.latitud),
-                "longitud": float(event.longitud),
-                "fecha_utc": event.fecha_utc.isoformat(),
-                "lugar": event.lugar,
-                "radio_afectacion_km": float(event.radio_afectacion_km) if event.radio_afectacion_km else None,
-                "fuente_api": event.fuente_api,
-            },
-            "impacts": [
-                {
-                    "pais": impact.pais,
-                    "ciudades_afectadas": impact.ciudades_afectadas,
-                    "muertes_estimadas": impact.muertes_estimadas,
-                    "heridos_estimados": impact.heridos_estimados,
-                    "perdidas_monetarias_usd": impact.perdidas_monetarias_usd,
-                    "nivel_destruccion": impact.nivel_destruccion.value,
-                    "fuentes_inferidas": impact.fuentes_inferidas,
-                    "razonamiento_ia": impact.razonamiento_ia,  # NEW: AI reasoning
-                    "factores_considerados": impact.factores_considerados,  # NEW: Factors considered
-                    "codigo_construccion": impact.codigo_construccion,  # NEW: Building code
-                    "nivel_preparacion_sismica": impact.nivel_preparacion_sismica,
-                    "densidad_poblacional": impact.densidad_poblacional,
-                }
-                for impact in impacts
-            ],
-        }
+
+    async def _find_stored_event(self, db: AsyncSession, earthquake: EarthquakeRecord) -> Optional[str]:
+        """Canonical event_id of a stored event matching any of the report's IDs"""
+        ids = {earthquake.event_id, *earthquake.ids}
+        event_id = await db.scalar(
+            select(EventoSismico.event_id).where(EventoSismico.event_id.in_(ids)).limit(1)
+        )
+        if event_id is None:
+            event_id = await db.scalar(
+                select(AliasEvento.event_id).where(AliasEvento.alias_id.in_(ids)).limit(1)
+            )
+        if event_id is not None:
+            # Known aliases are not written again when merging
+            result = await db.execute(select(AliasEvento.alias_id).where(AliasEvento.event_id == event_id))
+            self.matcher.add_aliases(event_id, result.scalars().all())
+        return event_id
+
+    async def _merge_duplicate(self, db: AsyncSession, canonical: str, earthquake: EarthquakeRecord):
+        """Record a duplicate report's IDs as aliases instead of storing it again"""
+        added = self.matcher.add_aliases(canonical, (earthquake.event_id, *earthquake.ids))
+        EVENT_CACHE_HITS.inc()
+        if not added:
+            return
+
+        EVENTS_MERGED.inc()
+        logger.info(f"🔗 {earthquake.event_id} is a duplicate of {canonical}, merged aliases {added}")
+        if canonical in self._queued:
+            # Written together with the event when it is stored
+            return
+        try:
+            for alias_id in added:
+                db.add(AliasEvento(alias_id=alias_id, event_id=canonical))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Could not store aliases of {canonical}: {e}")
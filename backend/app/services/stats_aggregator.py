@@ -0,0 +1,282 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, date
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.seismic_event import CURRENT_IMPACTS, EventoSismico, ImpactoPais
+
+logger = logging.getLogger(__name__)
+
+# Longest window the stats endpoint accepts
+MAX_WINDOW_DAYS = 365
+
+# (pais, impact rows, deaths, injuries, losses)
+CountryTotals = Tuple[str, int, int, int, int]
+
+
+@dataclass(slots=True)
+class _EventEntry:
+    event_id: str
+    fecha_utc: datetime
+    magnitud: float
+    lugar: Optional[str]
+    countries: Tuple[CountryTotals, ...]
+
+
+@dataclass(slots=True)
+class _DayBucket:
+    """Running totals for every event whose fecha_utc falls on one UTC day"""
+
+    events: List[_EventEntry] = field(default_factory=list)
+    magnitude_sum: float = 0.0
+    highest: Optional[_EventEntry] = None
+    deaths: int = 0
+    injuries: int = 0
+    losses: int = 0
+    # pais -> [impact rows, deaths]
+    countries: Dict[str, List[int]] = field(default_factory=dict)
+
+    def add(self, entry: _EventEntry):
+        self.events.append(entry)
+        self.magnitude_sum += entry.magnitud
+        if self.highest is None or entry.magnitud > self.highest.magnitud:
+            self.highest = entry
+        for pais, rows, deaths, injuries, losses in entry.countries:
+            self.deaths += deaths
+            self.injuries += injuries
+            self.losses += losses
+            totals = self.countries.setdefault(pais, [0, 0])
+            totals[0] += rows
+            totals[1] += deaths
+
+    def remove(self, entry: _EventEntry):
+        self.events.remove(entry)
+        self.magnitude_sum -= entry.magnitud
+        if self.highest is entry:
+            self.highest = max(self.events, key=lambda event: event.magnitud, default=None)
+        for pais, rows, deaths, injuries, losses in entry.countries:
+            self.deaths -= deaths
+            self.injuries -= injuries
+            self.losses -= losses
+            totals = self.countries[pais]
+            totals[0] -= rows
+            totals[1] -= deaths
+            if totals[0] <= 0:
+                del self.countries[pais]
+
+
+def _country_totals(impacts: List[Dict[str, Any]]) -> Tuple[CountryTotals, ...]:
+    countries: Dict[str, List[int]] = {}
+    for impact in impacts:
+        totals = countries.setdefault(impact["pais"], [0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += int(impact.get("muertes_estimadas") or 0)
+        totals[2] += int(impact.get("heridos_estimados") or 0)
+        totals[3] += int(impact.get("perdidas_monetarias_usd") or 0)
+    return tuple((pais, *totals) for pais, totals in countries.items())
+
+
+class StatsAggregator:
+    """
+    In-memory incremental version of GET /api/events/stats/summary
+
+    Events are kept in per-day buckets with running sums, so recording a
+    committed event is O(1) and a summary only merges at most 366 buckets
+    (plus an exact scan of the partial day at the window's start). Warmed
+    from the database at startup; until then ``ready`` is False and callers
+    fall back to SQL.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[date, _DayBucket] = {}
+        self._entries: Dict[str, _EventEntry] = {}
+        # Changes received while a warm-up query runs, replayed onto the reloaded buckets
+        self._journals: List[List[Tuple[str, tuple]]] = []
+        self.ready = False
+
+    async def warm(self, db: AsyncSession):
+        """
+        Load the last MAX_WINDOW_DAYS of events and impact totals
+
+        The buckets are rebuilt aside and swapped in, so the live ones keep
+        serving summaries and recording commits while the queries run; those
+        commits are replayed onto the new buckets before the swap.
+        """
+        journal: List[Tuple[str, tuple]] = []
+        self._journals.append(journal)
+        try:
+            events, impacts = await self._load(db)
+        finally:
+            self._journals.remove(journal)
+
+        fresh = StatsAggregator()
+        for event_id, fecha_utc, magnitud, lugar in events:
+            fresh._add(_EventEntry(event_id, fecha_utc, float(magnitud), lugar, tuple(impacts.get(event_id, ()))))
+        for method, args in journal:
+            getattr(fresh, method)(*args)
+        self._buckets, self._entries = fresh._buckets, fresh._entries
+
+        self.ready = True
+        logger.info(f"Stats aggregator warmed with {len(events)} events")
+
+    async def _load(self, db: AsyncSession) -> Tuple[List[Any], Dict[str, List[CountryTotals]]]:
+        """Events of the window and their impact totals per country"""
+        start = datetime.utcnow() - timedelta(days=MAX_WINDOW_DAYS + 1)
+
+        result = await db.execute(
+            select(
+                EventoSismico.event_id,
+                EventoSismico.fecha_utc,
+                EventoSismico.magnitud,
+                EventoSismico.lugar,
+            ).where(EventoSismico.fecha_utc >= start)
+        )
+        events = result.all()
+
+        result = await db.execute(
+            select(
+                ImpactoPais.event_id,
+                ImpactoPais.pais,
+                func.count(ImpactoPais.id),
+                func.sum(ImpactoPais.muertes_estimadas),
+                func.sum(ImpactoPais.heridos_estimados),
+                func.sum(ImpactoPais.perdidas_monetarias_usd),
+            )
+            .join(EventoSismico, CURRENT_IMPACTS)
+            # created_at bound only prunes impactos_pais partitions
+            .where(EventoSismico.fecha_utc >= start, ImpactoPais.created_at >= start)
+            .group_by(ImpactoPais.event_id, ImpactoPais.pais)
+        )
+        impacts: Dict[str, List[CountryTotals]] = {}
+        for event_id, pais, rows, deaths, injuries, losses in result.all():
+            impacts.setdefault(event_id, []).append(
+                (pais, int(rows), int(deaths or 0), int(injuries or 0), int(losses or 0))
+            )
+        return events, impacts
+
+    def record_event(
+        self,
+        event_id: str,
+        fecha_utc: datetime,
+        magnitud: float,
+        lugar: Optional[str],
+        impacts: List[Dict[str, Any]],
+    ):
+        """Add a newly committed event and its impact assessments"""
+        self._journal("record_event", (event_id, fecha_utc, magnitud, lugar, impacts))
+        self._add(_EventEntry(event_id, fecha_utc, float(magnitud), lugar, _country_totals(impacts)))
+
+    def revise_event(
+        self,
+        event_id: str,
+        fecha_utc: datetime,
+        magnitud: float,
+        lugar: Optional[str],
+        impacts: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """Replace a revised event; ``impacts`` None keeps its current assessments"""
+        self._journal("revise_event", (event_id, fecha_utc, magnitud, lugar, impacts))
+        previous = self._entries.pop(event_id, None)
+        if previous is not None:
+            self._buckets[previous.fecha_utc.date()].remove(previous)
+        if impacts is not None:
+            countries = _country_totals(impacts)
+        elif previous is not None:
+            countries = previous.countries
+        else:
+            # Outside the window before the revision; nothing to carry over
+            return
+        self._add(_EventEntry(event_id, fecha_utc, float(magnitud), lugar, countries))
+
+    def _journal(self, method: str, args: tuple):
+        for journal in self._journals:
+            journal.append((method, args))
+
+    def _add(self, entry: _EventEntry):
+        if entry.event_id in self._entries:
+            return
+        if entry.fecha_utc < datetime.utcnow() - timedelta(days=MAX_WINDOW_DAYS + 1):
+            return
+        self._entries[entry.event_id] = entry
+        self._buckets.setdefault(entry.fecha_utc.date(), _DayBucket()).add(entry)
+
+    def _evict(self, now: datetime):
+        oldest = (now - timedelta(days=MAX_WINDOW_DAYS + 1)).date()
+        for day in [day for day in self._buckets if day < oldest]:
+            for entry in self._buckets.pop(day).events:
+                self._entries.pop(entry.event_id, None)
+
+    def summary(self, days: int = 30) -> Dict[str, Any]:
+        """Same payload as the SQL-backed stats endpoint"""
+        now = datetime.utcnow()
+        self._evict(now)
+        start = now - timedelta(days=days)
+
+        total = 0
+        magnitude_sum = 0.0
+        highest: Optional[_EventEntry] = None
+        deaths = injuries = losses = 0
+        countries: Dict[str, List[int]] = {}
+
+        for day, bucket in self._buckets.items():
+            if day < start.date():
+                continue
+            if day > start.date():
+                # Whole day inside the window: use the running totals
+                total += len(bucket.events)
+                magnitude_sum += bucket.magnitude_sum
+                if bucket.highest and (highest is None or bucket.highest.magnitud > highest.magnitud):
+                    highest = bucket.highest
+                deaths += bucket.deaths
+                injuries += bucket.injuries
+                losses += bucket.losses
+                for pais, (rows, country_deaths) in bucket.countries.items():
+                    totals = countries.setdefault(pais, [0, 0])
+                    totals[0] += rows
+                    totals[1] += country_deaths
+                continue
+
+            # First day of the window is partial: check each event
+            for entry in bucket.events:
+                if entry.fecha_utc < start:
+                    continue
+                total += 1
+                magnitude_sum += entry.magnitud
+                if highest is None or entry.magnitud > highest.magnitud:
+                    highest = entry
+                for pais, rows, country_deaths, country_injuries, country_losses in entry.countries:
+                    deaths += country_deaths
+                    injuries += country_injuries
+                    losses += country_losses
+                    totals = countries.setdefault(pais, [0, 0])
+                    totals[0] += rows
+                    totals[1] += country_deaths
+
+        most_affected = sorted(countries.items(), key=lambda item: item[1][1], reverse=True)[:10]
+
+        return {
+            "period_days": days,
+            "total_events": total,
+            "average_magnitude": round(magnitude_sum / total, 4) if total else 0,
+            "highest_magnitude_event": {
+                "event_id": highest.event_id,
+                "magnitud": highest.magnitud,
+                "lugar": highest.lugar,
+                "fecha_utc": highest.fecha_utc,
+            }
+            if highest
+            else None,
+            "estimated_casualties": {
+                "deaths": deaths,
+                "injuries": injuries,
+                "economic_losses_usd": losses,
+            },
+            "most_affected_countries": [
+                {"country": pais, "event_count": rows, "total_deaths": country_deaths}
+                for pais, (rows, country_deaths) in most_affected
+            ],
+        }
+
+
+stats_aggregator = StatsAggregator()
@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.seismic_event import EventoSismico
+from app.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Deepest tile zoom served; a global seismic map has nothing to show past this
+MAX_TILE_ZOOM = 12
+
+# Each tile is split into 2^CLUSTER_BITS x 2^CLUSTER_BITS cluster cells (8 x 8)
+CLUSTER_BITS = 3
+
+# Cluster levels are materialized every MATERIALIZED_STEP levels up from the
+# finest; the levels in between are merged from the next finer one on render
+MATERIALIZED_STEP = 3
+
+# Rendered tiles kept in memory (least recently used evicted first)
+MAX_CACHED_TILES = 4096
+
+# Events indexed between yields to the event loop while warming
+WARM_CHUNK_SIZE = 2000
+
+# Web Mercator cannot represent the poles
+MAX_LATITUDE = 85.05112878
+
+# (zoom, x, y)
+TileKey = Tuple[int, int, int]
+
+
+@dataclass(slots=True)
+class _Cell:
+    """Running cluster for every event inside one grid cell"""
+
+    count: int = 0
+    max_magnitude: float = 0.0
+    max_event_id: str = ""
+    latitude_sum: float = 0.0
+    longitude_sum: float = 0.0
+    # event_id -> magnitude; kept by finest-level cells once they hold two events
+    members: Optional[Dict[str, float]] = None
+
+    def add(self, event_id: str, latitude: float, longitude: float, magnitude: float, track_members: bool = False):
+        if track_members and self.count:
+            if self.members is None:
+                # A single-event cell's only member is its maximum
+                self.members = {self.max_event_id: self.max_magnitude}
+            self.members[event_id] = magnitude
+        if self.count == 0 or magnitude > self.max_magnitude:
+            self.max_magnitude = magnitude
+            self.max_event_id = event_id
+        self.count += 1
+        self.latitude_sum += latitude
+        self.longitude_sum += longitude
+
+    def remove(self, event_id: str, latitude: float, longitude: float):
+        """Subtract an event; the caller recomputes the maximum if it was this one"""
+        self.count -= 1
+        self.latitude_sum -= latitude
+        self.longitude_sum -= longitude
+        if self.members is not None:
+            del self.members[event_id]
+
+    def merge(self, other: "_Cell"):
+        """Add another cell's events (without members)"""
+        if self.count == 0 or other.max_magnitude > self.max_magnitude:
+            self.max_magnitude = other.max_magnitude
+            self.max_event_id = other.max_event_id
+        self.count += other.count
+        self.latitude_sum += other.latitude_sum
+        self.longitude_sum += other.longitude_sum
+
+
+def _key(cx: int, cy: int) -> int:
+    # One int per cell instead of a tuple; cell coordinates stay below 2^32
+    return cx << 32 | cy
+
+
+def _mercator(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Project to Web Mercator coordinates normalized to [0, 1)"""
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    x = (longitude + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1 - 1e-12), min(max(y, 0.0), 1 - 1e-12)
+
+
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) of a slippy-map tile"""
+    n = 2 ** z
+
+    def latitude(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return latitude(y + 1), x / n * 360.0 - 180.0, latitude(y), (x + 1) / n * 360.0 - 180.0
+
+
+class TileIndex:
+    """
+    Grid pyramid of event clusters for /api/events/tiles/{z}/{x}/{y}
+
+    A cluster level is tile zoom + CLUSTER_BITS. Every event is added to one
+    cell of every MATERIALIZED_STEP-th level, finest first; a tile at a level
+    in between merges at most 4^(MATERIALIZED_STEP - 1) finer cells per
+    cluster, so its cost never depends on how many events it covers.
+    Finest-level cells keep their members and every coarser cell can be
+    rebuilt from its children, so a revision only touches the cells it
+    leaves. Rendered tiles are cached as JSON bytes and dropped when a new
+    event lands inside them. Warmed from the database at startup; until then
+    ``ready`` is False and tiles are built from SQL.
+    """
+
+    def __init__(self, max_zoom: int = MAX_TILE_ZOOM):
+        self.max_zoom = max_zoom
+        self._finest = max_zoom + CLUSTER_BITS
+        # Finest first, so a revision can rebuild a cell from its updated children
+        self._materialized = list(range(self._finest, CLUSTER_BITS - 1, -MATERIALIZED_STEP))
+        # materialized cluster level -> _key(cell x, cell y) -> cell
+        self._levels: Dict[int, Dict[int, _Cell]] = {level: {} for level in self._materialized}
+        # event_id -> (latitude, longitude, magnitude)
+        self._events: Dict[str, Tuple[float, float, float]] = {}
+        self._cache: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        # Changes received while a warm-up runs, replayed onto the rebuilt index
+        self._journals: List[List[Tuple[str, tuple]]] = []
+        self.ready = False
+
+    async def warm(self, db: AsyncSession):
+        """
+        Index every stored event
+
+        The index is rebuilt aside and swapped in, so the live one keeps
+        serving tiles and recording commits meanwhile; those commits are
+        replayed onto the new index before the swap.
+        """
+        journal: List[Tuple[str, tuple]] = []
+        self._journals.append(journal)
+        try:
+            result = await db.execute(
+                select(
+                    EventoSismico.event_id,
+                    EventoSismico.latitud,
+                    EventoSismico.longitud,
+                    EventoSismico.magnitud,
+                )
+            )
+            rows = result.all()
+
+            fresh = TileIndex(self.max_zoom)
+            for start in range(0, len(rows), WARM_CHUNK_SIZE):
+                fresh.add_events(rows[start:start + WARM_CHUNK_SIZE])
+                # Keep serving requests between chunks of a large table
+                await asyncio.sleep(0)
+        finally:
+            self._journals.remove(journal)
+
+        for method, args in journal:
+            getattr(fresh, method)(*args)
+        self._levels, self._events = fresh._levels, fresh._events
+        self._cache.clear()
+        self.ready = True
+        logger.info(f"Tile index warmed with {len(rows)} events")
+
+    def add_events(self, rows: Iterable[Tuple[str, float, float, float]]):
+        for event_id, latitude, longitude, magnitude in rows:
+            self.record_event(event_id, latitude, longitude, magnitude)
+
+    def record_event(self, event_id: str, latitude: float, longitude: float, magnitude: float):
+        """Add a committed event and invalidate the cached tiles containing it"""
+        self._journal("record_event", (event_id, latitude, longitude, magnitude))
+        if event_id in self._events:
+            return
+        self._insert(event_id, latitude, longitude, magnitude)
+
+    def _insert(self, event_id: str, latitude: Any, longitude: Any, magnitude: Any):
+        latitude, longitude, magnitude = float(latitude), float(longitude), float(magnitude)
+        self._events[event_id] = (latitude, longitude, magnitude)
+
+        for level, cx, cy in self._cells_of(latitude, longitude):
+            cells = self._levels[level]
+            key = _key(cx, cy)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = _Cell()
+            cell.add(event_id, latitude, longitude, magnitude, track_members=level == self._finest)
+        self._invalidate(latitude, longitude)
+
+    def revise_event(self, event_id: str, latitude: float, longitude: float, magnitude: float):
+        """Move a revised event to its new position and magnitude"""
+        self._journal("revise_event", (event_id, latitude, longitude, magnitude))
+        previous = self._events.pop(event_id, None)
+        if previous is not None:
+            old_latitude, old_longitude, _ = previous
+            for level, cx, cy in self._cells_of(old_latitude, old_longitude):
+                cells = self._levels[level]
+                key = _key(cx, cy)
+                cell = cells[key]
+                cell.remove(event_id, old_latitude, old_longitude)
+                if cell.count == 0:
+                    del cells[key]
+                elif cell.max_event_id == event_id:
+                    # Its brightest event left: rebuilt from members or the (already updated) finer cells
+                    self._recompute_maximum(level, cx, cy, cell)
+            self._invalidate(old_latitude, old_longitude)
+        self._insert(event_id, latitude, longitude, magnitude)
+
+    def _journal(self, method: str, args: tuple):
+        for journal in self._journals:
+            journal.append((method, args))
+
+    def _recompute_maximum(self, level: int, cx: int, cy: int, cell: _Cell):
+        if cell.members is not None:
+            cell.max_event_id, cell.max_magnitude = max(cell.members.items(), key=lambda member: member[1])
+            return
+        cell.max_magnitude, cell.max_event_id = 0.0, ""
+        for child in self._children(level + MATERIALIZED_STEP, cx, cy, MATERIALIZED_STEP):
+            if not cell.max_event_id or child.max_magnitude > cell.max_magnitude:
+                cell.max_magnitude, cell.max_event_id = child.max_magnitude, child.max_event_id
+
+    def _children(self, level: int, cx: int, cy: int, shift: int) -> Iterator[_Cell]:
+        """Non-empty cells of materialized ``level`` inside cell (cx, cy) of level - shift"""
+        cells = self._levels[level]
+        side = 1 << shift
+        for x in range(cx << shift, (cx << shift) + side):
+            for y in range(cy << shift, (cy << shift) + side):
+                child = cells.get(_key(x, y))
+                if child is not None:
+                    yield child
+
+    def _cells_of(self, latitude: float, longitude: float) -> Iterator[Tuple[int, int, int]]:
+        """(cluster level, cell x, cell y) of a point at every materialized level, finest first"""
+        mx, my = _mercator(latitude, longitude)
+        for level in self._materialized:
+            scale = 2 ** level
+            yield level, int(mx * scale), int(my * scale)
+
+    def _invalidate(self, latitude: float, longitude: float):
+        """Drop the cached tile containing a point at every zoom"""
+        if not self._cache:
+            return
+        mx, my = _mercator(latitude, longitude)
+        for z in range(self.max_zoom + 1):
+            scale = 2 ** z
+            self._cache.pop((z, int(mx * scale), int(my * scale)), None)
+
+    def tile(self, z: int, x: int, y: int) -> bytes:
+        """Serialized tile payload, from the cache when possible"""
+        key = (z, x, y)
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+            return body
+
+        body = dumps(self._render(z, x, y))
+        self._cache[key] = body
+        if len(self._cache) > MAX_CACHED_TILES:
+            self._cache.popitem(last=False)
+        return body
+
+    def _cell(self, level: int, cx: int, cy: int) -> Optional[_Cell]:
+        """Cluster cell at any level, merged from the next finer materialized level if needed"""
+        shift = (self._finest - level) % MATERIALIZED_STEP
+        if shift == 0:
+            return self._levels[level].get(_key(cx, cy))
+        cell = None
+        for child in self._children(level + shift, cx, cy, shift):
+            if cell is None:
+                cell = _Cell()
+            cell.merge(child)
+        return cell
+
+    def _render(self, z: int, x: int, y: int) -> dict:
+        level = z + CLUSTER_BITS
+        side = 2 ** CLUSTER_BITS
+        clusters = []
+        total = 0
+        for cx in range(x * side, (x + 1) * side):
+            for cy in range(y * side, (y + 1) * side):
+                cell = self._cell(level, cx, cy)
+                if cell is None:
+                    continue
+                total += cell.count
+                clusters.append({
+                    "count": cell.count,
+                    "max_magnitude": cell.max_magnitude,
+                    "max_magnitude_event_id": cell.max_event_id,
+                    "latitude": round(cell.latitude_sum / cell.count, 5),
+                    "longitude": round(cell.longitude_sum / cell.count, 5),
+                })
+
+        return {"z": z, "x": x, "y": y, "total_events": total, "clusters": clusters}
+
+
+async def tile_from_database(db: AsyncSession, z: int, x: int, y: int) -> bytes:
+    """Build one tile straight from SQL, used while the index is warming"""
+    min_lat, min_lon, max_lat, max_lon = tile_bounds(z, x, y)
+    # Edge rows of the Mercator world also hold everything beyond +-85 degrees
+    if y == 0:
+        max_lat = 90.0
+    if y == 2 ** z - 1:
+        min_lat = -90.0
+
+    result = await db.execute(
+        select(
+            EventoSismico.event_id,
+            EventoSismico.latitud,
+            EventoSismico.longitud,
+            EventoSismico.magnitud,
+        ).where(
+            EventoSismico.latitud.between(min_lat, max_lat),
+            EventoSismico.longitud.between(min_lon, max_lon),
+        )
+    )
+    index = TileIndex(max_zoom=z)
+    index.add_events(result.all())
+    return dumps(index._render(z, x, y))
+
+
+tile_index = TileIndex()
@@ -1,11 +1,57 @@
 import httpx
 import logging
+import time
+from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from app.config import settings
+from app.metrics import USGS_FETCH_SECONDS, USGS_NOT_MODIFIED, PARSE_FAILURES
+from app.services.geojson_stream import iter_features
 
 logger = logging.getLogger(__name__)
 
+# Bytes read from the socket per parser step
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Event-time window covered by each summary feed (..._hour.geojson, ..._day.geojson)
+FEED_WINDOWS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+    "month": timedelta(days=30),
+}
+
+# Overlap between consecutive fetch windows, for clock skew and late publication
+SYNC_OVERLAP = timedelta(minutes=10)
+
+
+def feed_window(feed_url: str) -> timedelta:
+    """Window of a summary feed from its name, e.g. 4.5_day.geojson -> 1 day"""
+    name = feed_url.rsplit("/", 1)[-1].split(".geojson")[0]
+    return FEED_WINDOWS.get(name.rsplit("_", 1)[-1], FEED_WINDOWS["hour"])
+
+
+@dataclass(slots=True)
+class EarthquakeRecord:
+    """Compact earthquake record parsed from a USGS GeoJSON feature"""
+
+    event_id: str
+    magnitud: float
+    profundidad: float
+    latitud: float
+    longitud: float
+    fecha_utc: datetime
+    lugar: str
+    fuente_api: str = "USGS"
+    # Every network ID the event is published under (the feature's "ids")
+    ids: Tuple[str, ...] = ()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Column values for EventoSismico"""
+        data = asdict(self)
+        del data["ids"]
+        return data
+
 
 class USGSService:
     """
@@ -15,13 +61,31 @@ class USGSService:
     def __init__(self):
         self.api_url = settings.usgs_api_url
         self.min_magnitude = settings.min_magnitude_threshold
+        self.feed_url = settings.usgs_feed_url
+        self.feed_window = feed_window(self.feed_url)
+        # Start of the last successful fetch; anything older was seen
+        self.synced_until: Optional[datetime] = None
+        # feed URL -> conditional request headers from its last 200 response
+        self._validators: Dict[str, Dict[str, str]] = {}
+        # Kept open across polls so each one reuses the pooled TLS connection
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30.0)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def fetch_recent_earthquakes(
         self,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         min_magnitude: Optional[float] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[EarthquakeRecord]:
         """
         Fetch recent earthquakes from USGS
 
@@ -33,6 +97,24 @@ class USGSService:
         Returns:
             List of earthquake events
         """
+        return [
+            earthquake
+            async for earthquake in self.stream_recent_earthquakes(start_time, end_time, min_magnitude)
+        ]
+
+    async def stream_recent_earthquakes(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        min_magnitude: Optional[float] = None
+    ) -> AsyncIterator[EarthquakeRecord]:
+        """
+        Stream recent earthquakes from USGS as they are parsed
+
+        The response body is parsed incrementally, one feature at a time, so
+        memory stays flat regardless of the size of the query window. Errors
+        are logged and end the stream early, like an empty result.
+        """
         if start_time is None:
             start_time = datetime.utcnow() - timedelta(hours=24)
 
@@ -42,7 +124,61 @@ class USGSService:
         if min_magnitude is None:
             min_magnitude = self.min_magnitude
 
-        params = {
+        params = self._query_params(start_time, end_time, min_magnitude)
+
+        logger.debug(f"📡 USGS API Call Details:")
+        logger.debug(f"   URL: {self.api_url}")
+        logger.debug(f"   Time range: {start_time.strftime('%Y-%m-%d %H:%M:%S')} to {end_time.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        logger.debug(f"   Min magnitude: {min_magnitude}")
+
+        try:
+            async for earthquake in self._stream_features(self.api_url, params):
+                yield earthquake
+        except Exception as e:
+            logger.error(f"   ❌ USGS API Error: Failed to fetch earthquakes from USGS: {e}", exc_info=True)
+
+    async def stream_new_earthquakes(self) -> AsyncIterator[EarthquakeRecord]:
+        """
+        Stream earthquakes published since the last successful poll
+
+        In "feed" mode the static summary feed is fetched with
+        If-None-Match/If-Modified-Since, so a poll with nothing new costs a
+        single 304 and no parsing. When the last sync is older than the
+        feed's window (downtime, failed polls) the gap is filled from the
+        FDSN query endpoint instead. "query" mode always reads the last 24h
+        from the query endpoint.
+        """
+        if settings.usgs_ingestion_mode != "feed":
+            async for earthquake in self.stream_recent_earthquakes():
+                yield earthquake
+            return
+
+        started = datetime.utcnow()
+        try:
+            if self.synced_until is None or started - self.synced_until <= self.feed_window - SYNC_OVERLAP:
+                source = self._stream_features(
+                    self.feed_url, conditional=True, min_magnitude=self.min_magnitude
+                )
+            else:
+                start_time = max(
+                    self.synced_until - SYNC_OVERLAP,
+                    started - timedelta(hours=settings.usgs_gap_fill_max_hours),
+                )
+                logger.info(f"⏪ Filling ingestion gap since {start_time:%Y-%m-%d %H:%M:%S} UTC from the query API")
+                source = self._stream_features(
+                    self.api_url, self._query_params(start_time, started, self.min_magnitude)
+                )
+            async for earthquake in source:
+                yield earthquake
+        except Exception as e:
+            logger.error(f"   ❌ USGS API Error: Failed to fetch earthquakes from USGS: {e}", exc_info=True)
+            return
+
+        self.synced_until = started
+
+    @staticmethod
+    def _query_params(start_time: datetime, end_time: datetime, min_magnitude: float) -> Dict[str, Any]:
+        return {
             "format": "geojson",
             "starttime": start_time.strftime("%Y-%m-%dT%H:%M:%S"),
             "endtime": end_time.strftime("%Y-%m-%dT%H:%M:%S"),
@@ -50,37 +186,73 @@ class USGSService:
             "orderby": "time",
         }
 
-        try:
-            logger.debug(f"📡 USGS API Call Details:")
-            logger.debug(f"   URL: {self.api_url}")
-            logger.debug(f"   Time range: {start_time.strftime('%Y-%m-%d %H:%M:%S')} to {end_time.strftime('%Y-%m-%d %H:%M:%S')} UTC")
-            logger.debug(f"   Min magnitude: {min_magnitude}")
+    def forget_validators(self):
+        """Make the next feed poll a full GET"""
+        self._validators.clear()
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(self.api_url, params=params)
-                response.raise_for_status()
-                data = response.json()
+    def resume_from(self, latest: Optional[datetime]):
+        """Seed the sync point at startup, e.g. with the newest stored event"""
+        if self.synced_until is None and latest is not None:
+            self.synced_until = latest
 
-                earthquakes = []
-                for feature in data.get("features", []):
-                    earthquake = self._parse_earthquake_feature(feature)
-                    if earthquake:
-                        earthquakes.append(earthquake)
+    async def _stream_features(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        conditional: bool = False,
+        min_magnitude: Optional[float] = None,
+    ) -> AsyncIterator[EarthquakeRecord]:
+        """Parse a GeoJSON response incrementally; raises on HTTP errors"""
+        headers = self._validators.get(url, {}) if conditional else {}
+        client = self._http()
+        count = 0
+        start = time.perf_counter()
+        async with client.stream("GET", url, params=params, headers=headers) as response:
+            # Time to the response headers, for 304s and errors too
+            USGS_FETCH_SECONDS.observe(time.perf_counter() - start)
+            if response.status_code == 304:
+                USGS_NOT_MODIFIED.inc()
+                logger.debug("USGS feed not modified, nothing to parse")
+                return
+            response.raise_for_status()
+            if conditional:
+                self._remember_validators(url, response.headers)
 
-                logger.info(f"   ✅ USGS API Response: Retrieved {len(earthquakes)} earthquake(s) from USGS")
+            async for feature in iter_features(response.aiter_bytes(STREAM_CHUNK_SIZE)):
+                earthquake = self._parse_earthquake_feature(feature)
+                if earthquake is None:
+                    PARSE_FAILURES.inc()
+                    continue
+                # Feeds are published per magnitude band, not per threshold
+                if min_magnitude is not None and earthquake.magnitud < min_magnitude:
+                    continue
 
-                # Log details if earthquakes were found
-                if earthquakes:
-                    for eq in earthquakes:
-                        logger.info(f"      - {eq['event_id']}: Magnitude {eq['magnitud']}, Location: {eq['lugar']}")
+                count += 1
+                # Per-event details are sampled by the logging pipeline
+                logger.info(
+                    "%s: Magnitude %s, Location: %s",
+                    earthquake.event_id,
+                    earthquake.magnitud,
+                    earthquake.lugar,
+                    extra={"event_detail": True, "event_id": earthquake.event_id},
+                )
+                yield earthquake
 
-                return earthquakes
+        logger.info(
+            "USGS API Response: Retrieved %d earthquake(s) from USGS",
+            count,
+            extra={"features": count},
+        )
 
-        except Exception as e:
-            logger.error(f"   ❌ USGS API Error: Failed to fetch earthquakes from USGS: {e}", exc_info=True)
-            return []
+    def _remember_validators(self, url: str, headers: httpx.Headers):
+        validators = {}
+        if "etag" in headers:
+            validators["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            validators["If-Modified-Since"] = headers["last-modified"]
+        self._validators[url] = validators
 
-    def _parse_earthquake_feature(self, feature: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _parse_earthquake_feature(self, feature: Dict[str, Any]) -> Optional[EarthquakeRecord]:
         """
         Parse USGS GeoJSON feature into standardized format
 
@@ -112,22 +284,25 @@ class USGSService:
             # Convert time from milliseconds to datetime
             fecha_utc = datetime.utcfromtimestamp(time_ms / 1000)
 
-            return {
-                "event_id": event_id,
-                "magnitud": float(magnitude),
-                "profundidad": float(depth),
-                "latitud": float(latitude),
-                "longitud": float(longitude),
-                "fecha_utc": fecha_utc,
-                "lugar": place,
-                "fuente_api": "USGS",
-            }
+            # ",us7000abcd,at00xyz," lists the preferred ID and its aliases
+            ids = tuple(alias for alias in (properties.get("ids") or "").split(",") if alias)
+
+            return EarthquakeRecord(
+                event_id=event_id,
+                magnitud=float(magnitude),
+                profundidad=float(depth),
+                latitud=float(latitude),
+                longitud=float(longitude),
+                fecha_utc=fecha_utc,
+                lugar=place,
+                ids=ids,
+            )
 
         except Exception as e:
             logger.error(f"Error parsing earthquake feature: {e}")
             return None
 
-    async def fetch_single_earthquake(self, event_id: str) -> Optional[Dict[str, Any]]:
+    async def fetch_single_earthquake(self, event_id: str) -> Optional[EarthquakeRecord]:
         """
         Fetch details for a specific earthquake by ID
         """
@@ -138,16 +313,16 @@ class USGSService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+            client = self._http()
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
 
-                features = data.get("features", [])
-                if features:
-                    return self._parse_earthquake_feature(features[0])
+            features = data.get("features", [])
+            if features:
+                return self._parse_earthquake_feature(features[0])
 
-                return None
+            return None
 
         except Exception as e:
             logger.error(f"Error fetching earthquake {event_id}: {e}")
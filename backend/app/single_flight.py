@@ -0,0 +1,76 @@
+"""
+Single-flight coalescing of identical concurrent reads
+
+A new_earthquake broadcast makes every connected client fetch the same
+event detail and stats within the same second. With SingleFlight, the
+first request for a key (the leader) runs the queries; identical requests
+arriving while it is in flight (followers) await its result instead of
+opening their own database round-trips.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from app.metrics import SINGLE_FLIGHT_RATIO, SINGLE_FLIGHT_REQUESTS
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The leader's request went away before finishing; followers run on their own"""
+
+
+def _retrieve(future: asyncio.Future):
+    # A leader without followers must not log "exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """
+    Shares one in-flight computation among concurrent callers with the same key
+
+    Nothing is cached: the key is forgotten as soon as the leader finishes,
+    so a request arriving afterwards reads fresh data. Results are shared
+    as-is, so compute functions should return immutable values (serialized
+    bytes). Exceptions reach the followers too, except a cancelled leader,
+    after which each follower computes its own result.
+    """
+
+    def __init__(self, route: str):
+        self.route = route
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _record(self, role: str):
+        SINGLE_FLIGHT_REQUESTS.inc(self.route, role)
+        SINGLE_FLIGHT_RATIO.set(self.route, value=self.followers / (self.leaders + self.followers))
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.followers += 1
+            self._record("follower")
+            try:
+                # Shielded so a follower that disconnects does not cancel the leader's result
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                return await compute()
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve)
+        self._inflight[key] = future
+        self.leaders += 1
+        self._record("leader")
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,127 @@
+"""
+USGS GeoJSON feeds and Hugging Face chat responses replayed by the stub servers
+
+Feeds are generated from a fixed seed so every run (and every machine)
+replays byte-identical payloads in the FDSN ``format=geojson`` layout.
+"""
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Epoch all scenarios are anchored to, so timestamps never depend on "now"
+ANCHOR = datetime(2025, 11, 20, 12, 0, 0, tzinfo=timezone.utc)
+
+# Subduction zones and regions the generator draws epicenters from
+REGIONS = [
+    ("Chile", -33.4, -71.6, "Valparaíso, Chile"),
+    ("Japan", 38.3, 142.4, "Miyagi, Japan"),
+    ("Indonesia", -3.5, 128.2, "Banda Sea, Indonesia"),
+    ("Mexico", 16.9, -99.9, "Guerrero, Mexico"),
+    ("Turkey", 37.2, 37.0, "Kahramanmaraş, Turkey"),
+    ("Nepal", 28.2, 84.7, "Gorkha, Nepal"),
+    ("Philippines", 10.3, 126.1, "Mindanao, Philippines"),
+    ("New Zealand", -42.7, 173.0, "Kaikōura, New Zealand"),
+    ("Alaska", 56.0, -149.1, "Kodiak, Alaska"),
+    ("Tonga", -20.5, -175.4, "Tonga Trench"),
+]
+
+SCENARIOS = {
+    # A routine day: a handful of M4.5+ events worldwide
+    "quiet_day": {"count": 8, "window": timedelta(days=1), "swarm": False},
+    # A M7.8 mainshock followed by hundreds of aftershocks in one region
+    "major_swarm": {"count": 400, "window": timedelta(days=2), "swarm": True},
+    # Historical catch-up over a year of global M4.5+ seismicity
+    "year_backfill": {"count": 7000, "window": timedelta(days=365), "swarm": False},
+}
+
+
+def _feature(rng: random.Random, index: int, when: datetime, lat: float, lon: float, mag: float, place: str) -> Dict[str, Any]:
+    depth = round(rng.choice([rng.uniform(2, 35), rng.uniform(35, 120), rng.uniform(120, 650)]), 2)
+    event_id = f"bench{index:06d}"
+    return {
+        "type": "Feature",
+        "properties": {
+            "mag": mag,
+            "place": place,
+            "time": int(when.timestamp() * 1000),
+            "updated": int(when.timestamp() * 1000) + 60000,
+            "tz": None,
+            "url": f"https://earthquake.usgs.gov/earthquakes/eventpage/{event_id}",
+            "detail": f"https://earthquake.usgs.gov/fdsnws/event/1/query?eventid={event_id}&format=geojson",
+            "felt": None,
+            "cdi": None,
+            "mmi": None,
+            "alert": None,
+            "status": "reviewed",
+            "tsunami": 0,
+            "sig": int(mag * 100),
+            "net": "us",
+            "code": f"{index:06d}",
+            "ids": f",{event_id},",
+            "sources": ",us,",
+            "types": ",origin,phase-data,",
+            "nst": None,
+            "dmin": round(rng.uniform(0.5, 8.0), 3),
+            "rms": round(rng.uniform(0.4, 1.4), 2),
+            "gap": rng.randint(15, 180),
+            "magType": "mww" if mag >= 5.5 else "mb",
+            "type": "earthquake",
+            "title": f"M {mag} - {place}",
+        },
+        "geometry": {"type": "Point", "coordinates": [lon, lat, depth]},
+        "id": event_id,
+    }
+
+
+def build_feed(scenario: str, seed: int = 20251120) -> Dict[str, Any]:
+    """Build the GeoJSON FeatureCollection for a named scenario"""
+    spec = SCENARIOS[scenario]
+    rng = random.Random(f"{scenario}:{seed}")
+    start = ANCHOR - spec["window"]
+    span = spec["window"].total_seconds()
+
+    features: List[Dict[str, Any]] = []
+    if spec["swarm"]:
+        _, lat0, lon0, place = rng.choice(REGIONS)
+        features.append(_feature(rng, 0, start + timedelta(minutes=5), lat0, lon0, 7.8, place))
+        for i in range(1, spec["count"]):
+            # Omori-like decay: aftershocks cluster early in the window
+            offset = span * (rng.random() ** 3)
+            mag = round(min(7.0, 4.5 + rng.expovariate(2.2)), 1)
+            lat = round(lat0 + rng.gauss(0, 0.4), 4)
+            lon = round(lon0 + rng.gauss(0, 0.4), 4)
+            features.append(_feature(rng, i, start + timedelta(seconds=offset), lat, lon, mag, place))
+    else:
+        for i in range(spec["count"]):
+            _, lat0, lon0, place = rng.choice(REGIONS)
+            offset = rng.uniform(0, span)
+            mag = round(min(8.5, 4.5 + rng.expovariate(2.0)), 1)
+            lat = round(lat0 + rng.uniform(-3, 3), 4)
+            lon = round(lon0 + rng.uniform(-3, 3), 4)
+            features.append(_feature(rng, i, start + timedelta(seconds=offset), lat, lon, mag, place))
+
+    # FDSN orderby=time returns newest first
+    features.sort(key=lambda f: f["properties"]["time"], reverse=True)
+
+    return {
+        "type": "FeatureCollection",
+        "metadata": {
+            "generated": int(ANCHOR.timestamp() * 1000),
+            "url": "https://earthquake.usgs.gov/fdsnws/event/1/query",
+            "title": "USGS Earthquakes",
+            "status": 200,
+            "api": "1.14.1",
+            "count": len(features),
+        },
+        "features": features,
+    }
+
+
+def load_hf_responses() -> List[Dict[str, Any]]:
+    """Canned chat completion bodies in the HF router (OpenAI-compatible) format"""
+    with open(FIXTURES_DIR / "hf_chat_responses.json", encoding="utf-8") as f:
+        return json.load(f)
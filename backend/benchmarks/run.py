@@ -0,0 +1,335 @@
+"""
+Seismic pipeline benchmark harness
+
+Replays recorded-format USGS feeds and canned HF chat responses through
+local stub servers, drives the ingestion pipeline, the REST endpoints and
+the WebSocket fan-out, and reports throughput, p50/p99 latency and memory.
+
+Usage (from backend/):
+    python -m benchmarks.run                          # all scenarios, SQLite
+    python -m benchmarks.run -s major_swarm --save-baseline
+    python -m benchmarks.run --compare                # fail on regressions
+    python -m benchmarks.run --db-url mysql+aiomysql://user:pw@localhost/seismic_bench
+
+WARNING: the target database's tables are dropped and recreated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# Settings are read at import time; give the app harmless defaults
+_tmp_dir = Path(tempfile.mkdtemp(prefix="seismic_bench_"))
+os.environ.setdefault("HUGGINGFACE_API_TOKEN", "bench-token")
+os.environ.setdefault("MARIADB_PASSWORD", "bench")
+os.environ.setdefault("LOG_DIR", str(_tmp_dir / "logs"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+import websockets  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.database import Base, get_db, get_read_db  # noqa: E402
+from app.inference.backends import InferenceBackend  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.seismic_event import IMPACT_SUMMARY_COLUMNS  # noqa: E402
+from app.routes import websocket as ws_routes  # noqa: E402
+from app.services.event_queries import get_events_with_impacts  # noqa: E402
+from app.services.seismic_processor import SeismicProcessor  # noqa: E402
+from app.services.event_store import event_store  # noqa: E402
+from app.services.tile_index import tile_index  # noqa: E402
+from benchmarks.fixtures import SCENARIOS, build_feed, load_hf_responses  # noqa: E402
+from benchmarks.stubs import USGS_FEED_PATH, USGS_QUERY_PATH, StubServer, hf_stub_app, usgs_stub_app  # noqa: E402
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Metrics where a larger number is an improvement
+HIGHER_IS_BETTER = ("events_per_s", "requests_per_s", "messages_per_s")
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p99/mean in milliseconds"""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+    p99_index = min(len(ordered) - 1, int(round(0.99 * (len(ordered) - 1))))
+    return {
+        "n": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[p99_index] * 1000, 3),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+async def _reset_schema(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def bench_ingestion(session_factory, usgs_url: str, hf_url: str, trace_memory: bool) -> Tuple[Dict[str, Any], List[str]]:
+    """Run one process_new_earthquakes pass over the scenario feed, then an unchanged re-poll"""
+    processor = SeismicProcessor()
+    processor.usgs_service.api_url = usgs_url + USGS_QUERY_PATH
+    processor.usgs_service.feed_url = usgs_url + USGS_FEED_PATH
+    processor.ai_client.backends = [InferenceBackend("stub", hf_url, processor.ai_client.model)]
+
+    per_event: List[float] = []
+    process_single = processor.process_single_earthquake
+
+    async def timed_single(db, earthquake):
+        start = time.perf_counter()
+        try:
+            return await process_single(db, earthquake)
+        finally:
+            per_event.append(time.perf_counter() - start)
+
+    processor.process_single_earthquake = timed_single
+
+    if trace_memory:
+        tracemalloc.start()
+    async with session_factory() as db:
+        start = time.perf_counter()
+        processed = await processor.process_new_earthquakes(db)
+        elapsed = time.perf_counter() - start
+
+        # Nothing changed upstream: a conditional GET answered with 304
+        start = time.perf_counter()
+        await processor.process_new_earthquakes(db)
+        repoll_elapsed = time.perf_counter() - start
+    await processor.aclose()
+    peak_mb = None
+    if trace_memory:
+        peak_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+
+    result = {
+        "events": len(processed),
+        "total_s": round(elapsed, 3),
+        "events_per_s": round(len(processed) / elapsed, 2) if elapsed else 0.0,
+        "per_event": _summary(per_event),
+        "repoll_ms": round(repoll_elapsed * 1000, 3),
+        "max_rss_mb": _max_rss_mb(),
+    }
+    if peak_mb is not None:
+        result["traced_peak_mb"] = peak_mb
+    return result, processed
+
+
+async def bench_api(base_url: str, event_ids: List[str], requests_per_endpoint: int) -> Dict[str, Any]:
+    """Hit each read endpoint sequentially and record per-request latency"""
+    sample_ids = event_ids[: max(20, requests_per_endpoint)]
+    endpoints = {
+        "list_500": lambda i: "/api/events/?limit=500",
+        "list_filtered": lambda i: "/api/events/?limit=100&min_magnitude=5.5",
+        "list_100_impacts": lambda i: "/api/events/?limit=100&include=impacts",
+        "detail": lambda i: f"/api/events/{sample_ids[i % len(sample_ids)]}",
+        "detail_summary": lambda i: f"/api/events/{sample_ids[i % len(sample_ids)]}?view=summary",
+        "batch_20": lambda i: "/api/events/batch?ids=" + ",".join(sample_ids[:20]),
+        "stats_summary": lambda i: "/api/events/stats/summary?days=365",
+        "country": lambda i: "/api/events/country/Japan?limit=100",
+        "tile_z0": lambda i: "/api/events/tiles/0/0/0",
+        "tile_z3": lambda i: f"/api/events/tiles/3/{i % 8}/{2 + i % 4}",
+    }
+
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        for name, path_for in endpoints.items():
+            samples = []
+            response_bytes = 0
+            start_all = time.perf_counter()
+            for i in range(requests_per_endpoint):
+                start = time.perf_counter()
+                response = await client.get(path_for(i))
+                samples.append(time.perf_counter() - start)
+                response.raise_for_status()
+                response_bytes = len(response.content)
+            elapsed = time.perf_counter() - start_all
+            results[name] = {
+                **_summary(samples),
+                "requests_per_s": round(requests_per_endpoint / elapsed, 2),
+                "response_bytes": response_bytes,
+            }
+    return results
+
+
+async def bench_websocket(base_url: str, session_factory, event_ids: List[str], clients: int, messages: int) -> Dict[str, Any]:
+    """Broadcast real event payloads to many connected /ws clients"""
+    ws_url = base_url.replace("http://", "ws://") + "/ws"
+    connections = [await websockets.connect(ws_url, max_size=None) for _ in range(clients)]
+    for conn in connections:
+        await conn.recv()  # Welcome message
+
+    async with session_factory() as db:
+        # Same projection the poller broadcasts
+        events = await get_events_with_impacts(db, event_ids[:messages], IMPACT_SUMMARY_COLUMNS)
+    payloads = list(events.values())
+
+    samples = []
+    start_all = time.perf_counter()
+    for payload in payloads:
+        start = time.perf_counter()
+        await ws_routes.notify_new_earthquake(payload)
+        await asyncio.gather(*(conn.recv() for conn in connections))
+        samples.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - start_all
+
+    for conn in connections:
+        await conn.close()
+
+    return {
+        "clients": clients,
+        **_summary(samples),
+        "messages_per_s": round(len(payloads) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+async def run_scenario(scenario: str, args) -> Dict[str, Any]:
+    db_url = args.db_url or f"sqlite+aiosqlite:///{_tmp_dir / f'{scenario}.db'}"
+    engine = create_async_engine(db_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await _reset_schema(engine)
+
+    async def bench_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = bench_get_db
+    app.dependency_overrides[get_read_db] = bench_get_db
+
+    feed = build_feed(scenario)
+    async with StubServer(usgs_stub_app(feed)) as usgs, \
+            StubServer(hf_stub_app(load_hf_responses(), args.hf_latency_ms / 1000)) as hf, \
+            StubServer(app) as api:
+        ingestion, processed = await bench_ingestion(
+            session_factory,
+            usgs.base_url,
+            f"{hf.base_url}/v1/chat/completions",
+            args.trace_memory,
+        )
+        # The app warms these at startup; the benchmark runs without lifespan
+        async with session_factory() as db:
+            await tile_index.warm(db)
+            await event_store.warm(db)
+        api_results = await bench_api(api.base_url, processed, args.requests)
+        ws_results = await bench_websocket(api.base_url, session_factory, processed, args.ws_clients, args.ws_messages)
+
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_read_db, None)
+    await engine.dispose()
+
+    return {
+        "features": len(feed["features"]),
+        "ingestion": ingestion,
+        "api": api_results,
+        "websocket": ws_results,
+    }
+
+
+def _flatten(prefix: str, value: Any, out: Dict[str, float]):
+    if isinstance(value, dict):
+        for key, sub in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, sub, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """List metrics that regressed by more than ``threshold`` (fraction)"""
+    current, previous = {}, {}
+    _flatten("", results["scenarios"], current)
+    _flatten("", baseline["scenarios"], previous)
+
+    regressions = []
+    for key, old in previous.items():
+        new = current.get(key)
+        leaf = key.rsplit(".", 1)[-1]
+        if new is None or old == 0 or not (leaf.endswith("_ms") or leaf.endswith("_mb") or leaf in HIGHER_IS_BETTER):
+            continue
+        change = (new - old) / old
+        if leaf in HIGHER_IS_BETTER:
+            change = -change
+        if change > threshold:
+            regressions.append(f"{key}: {old:g} -> {new:g} ({change:+.1%} worse)")
+    return regressions
+
+
+async def main_async(args) -> int:
+    scenarios = args.scenario or list(SCENARIOS)
+    results = {
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "sqlite" if not args.db_url else args.db_url.split("://", 1)[0],
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        print(f"▶ {scenario} ({SCENARIOS[scenario]['count']} features)", flush=True)
+        results["scenarios"][scenario] = await run_scenario(scenario, args)
+        print(json.dumps(results["scenarios"][scenario], indent=2), flush=True)
+
+    baseline_path = BASELINE_DIR / f"{args.label}.json"
+    exit_code = 0
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"No baseline at {baseline_path}")
+            exit_code = 2
+        else:
+            regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+            if regressions:
+                print(f"❌ {len(regressions)} regression(s) vs {baseline_path.name}:")
+                for line in regressions:
+                    print(f"   {line}")
+                exit_code = 1
+            else:
+                print(f"✅ No regressions beyond {args.threshold:.0%} vs {baseline_path.name}")
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline saved to {baseline_path}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    return exit_code
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seismic pipeline benchmarks")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS), help="Scenario to run (repeatable, default: all)")
+    parser.add_argument("--db-url", help="SQLAlchemy async URL (default: temporary SQLite file)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per API endpoint")
+    parser.add_argument("--ws-clients", type=int, default=50, help="Concurrent WebSocket clients")
+    parser.add_argument("--ws-messages", type=int, default=20, help="Broadcasts per scenario")
+    parser.add_argument("--hf-latency-ms", type=float, default=0.0, help="Artificial latency added by the HF stub")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peak during ingestion (slower)")
+    parser.add_argument("--label", default="default", help="Baseline name")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the baseline for --label")
+    parser.add_argument("--compare", action="store_true", help="Compare against the saved baseline and exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression before failing (fraction)")
+    parser.add_argument("-o", "--output", help="Also write results JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    return asyncio.run(main_async(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Local stand-ins for the USGS FDSN API and the Hugging Face chat router
+
+Both are tiny Starlette apps served by uvicorn on 127.0.0.1 inside the
+benchmark's event loop, so the real httpx code paths (connection setup,
+response decoding) are exercised without touching the network.
+"""
+import asyncio
+import hashlib
+import json
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+
+USGS_QUERY_PATH = "/fdsnws/event/1/query"
+USGS_FEED_PATH = "/earthquakes/feed/v1.0/summary/4.5_day.geojson"
+
+
+def usgs_stub_app(feed: Dict[str, Any]) -> Starlette:
+    """
+    Serve one pre-rendered GeoJSON feed from the FDSN query path and from a
+    summary feed path, which honours If-None-Match like the real feeds
+    """
+    body = json.dumps(feed).encode()
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+    async def query(request: Request) -> Response:
+        return Response(body, media_type="application/json")
+
+    async def summary(request: Request) -> Response:
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+    return Starlette(routes=[Route(USGS_QUERY_PATH, query), Route(USGS_FEED_PATH, summary)])
+
+
+def hf_stub_app(responses: List[Dict[str, Any]], latency_s: float = 0.0) -> Starlette:
+    """
+    Serve canned chat completions
+
+    The response is picked from a hash of the prompt, so the same event
+    always gets the same answer across runs.
+    """
+    bodies = [json.dumps(r, ensure_ascii=False).encode() for r in responses]
+
+    async def completions(request: Request) -> Response:
+        payload = await request.body()
+        digest = hashlib.blake2b(payload, digest_size=4).digest()
+        if latency_s:
+            await asyncio.sleep(latency_s)
+        return Response(bodies[int.from_bytes(digest, "big") % len(bodies)], media_type="application/json")
+
+    return Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+
+
+class StubServer:
+    """Run an ASGI app on an ephemeral localhost port for the duration of a block"""
+
+    def __init__(self, app, lifespan: str = "off"):
+        self.app = app
+        self.lifespan = lifespan
+        self.server: Optional[uvicorn.Server] = None
+        self.task: Optional[asyncio.Task] = None
+        self.address: Tuple[str, int] = ("127.0.0.1", 0)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.address[0]}:{self.address[1]}"
+
+    async def __aenter__(self) -> "StubServer":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Accepted sockets inherit this; avoids 40 ms delayed-ACK stalls on loopback
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.bind(("127.0.0.1", 0))
+        self.address = sock.getsockname()
+
+        config = uvicorn.Config(self.app, lifespan=self.lifespan, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.task = asyncio.create_task(self.server.serve(sockets=[sock]))
+        while not self.server.started:
+            await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.should_exit = True
+        await self.task
@@ -0,0 +1,88 @@
+"""
+Bulk re-inference campaigns over stored events
+
+    python -m campaigns create --since 2024-01-01 --min-magnitude 6 [--model NAME] [--run]
+    python -m campaigns run 3 [--concurrency 4] [--rate 30]   # resumes from the last checkpoint
+    python -m campaigns activate 3                          # switch the served impacts atomically
+    python -m campaigns status
+
+Run from the backend directory with the same environment as the API.
+"""
+import argparse
+import asyncio
+import json
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.inference.huggingface_client import HuggingFaceInferenceClient
+from app.services.reinference import CampaignRunner, activate_campaign, campaign_status, create_campaign
+
+
+async def run_campaign(args, campaign_id: int):
+    client = HuggingFaceInferenceClient()
+    runner = CampaignRunner(AsyncSessionLocal, client, args.concurrency, args.rate)
+    try:
+        campaign = await runner.run(campaign_id)
+    finally:
+        await client.aclose()
+    print(
+        f"Campaign {campaign.id}: {campaign.estado}, {campaign.eventos_procesados}/{campaign.total_eventos} "
+        f"events assessed, {campaign.fallos} failed in this run"
+    )
+
+
+async def main(args):
+    try:
+        if args.command == "create":
+            filtro = {
+                key: value
+                for key, value in (
+                    ("since", args.since),
+                    ("until", args.until),
+                    ("min_magnitude", args.min_magnitude),
+                    ("max_magnitude", args.max_magnitude),
+                    ("event_ids", args.event_ids.split(",") if args.event_ids else None),
+                )
+                if value is not None
+            }
+            async with AsyncSessionLocal() as db:
+                campaign = await create_campaign(
+                    db, filtro, args.model or settings.huggingface_model or "Qwen/Qwen2.5-7B-Instruct"
+                )
+            print(f"Created campaign {campaign.id} ({campaign.total_eventos} events)")
+            if args.run:
+                await run_campaign(args, campaign.id)
+        elif args.command == "run":
+            await run_campaign(args, args.campaign_id)
+        elif args.command == "activate":
+            async with AsyncSessionLocal() as db:
+                switched = await activate_campaign(db, args.campaign_id)
+            print(f"Campaign {args.campaign_id} active on {switched} events")
+        elif args.command == "status":
+            async with AsyncSessionLocal() as db:
+                for campaign in await campaign_status(db):
+                    print(json.dumps(campaign, default=str))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m campaigns", description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["create", "run", "activate", "status"])
+    parser.add_argument("campaign_id", type=int, nargs="?")
+    parser.add_argument("--since", help="ISO date, events at or after it")
+    parser.add_argument("--until", help="ISO date, events at or before it")
+    parser.add_argument("--min-magnitude", type=float)
+    parser.add_argument("--max-magnitude", type=float)
+    parser.add_argument("--event-ids", help="Comma-separated event IDs")
+    parser.add_argument("--model", help="Model to ask every backend for (default: HUGGINGFACE_MODEL)")
+    parser.add_argument("--run", action="store_true", help="Start the campaign right after creating it")
+    parser.add_argument("--concurrency", type=int, default=settings.campaign_concurrency)
+    parser.add_argument("--rate", type=float, default=settings.campaign_rate_per_minute, help="Assessments per minute")
+    args = parser.parse_args()
+    if args.command in ("run", "activate") and args.campaign_id is None:
+        parser.error(f"{args.command} needs a campaign id")
+    try:
+        asyncio.run(main(args))
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")
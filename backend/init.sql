@@ -1,8 +1,26 @@
 -- Initialization script for seismic database
 
+-- eventos_sismicos and impactos_pais are RANGE-partitioned by month. They
+-- start with a single catch-all partition; the backend splits it into
+-- monthly partitions at startup (see app/services/partitions.py).
+-- Partitioning requires the date column in every unique key and rules out
+-- foreign keys, so event_id uniqueness is enforced by the application.
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(100) PRIMARY KEY,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Already part of the schema below
+INSERT IGNORE INTO schema_migrations (version) VALUES
+    ('001_add_event_revision'),
+    ('002_partition_keys'),
+    ('003_event_aliases'),
+    ('004_impact_versions');
+
 CREATE TABLE IF NOT EXISTS eventos_sismicos (
-    id INT AUTO_INCREMENT PRIMARY KEY,
-    event_id VARCHAR(50) UNIQUE NOT NULL,
+    id INT AUTO_INCREMENT,
+    event_id VARCHAR(50) NOT NULL,
     magnitud DECIMAL(3,1) NOT NULL,
     profundidad DECIMAL(6,2) NOT NULL,
     latitud DECIMAL(9,6) NOT NULL,
@@ -11,14 +29,22 @@ CREATE TABLE IF NOT EXISTS eventos_sismicos (
     lugar VARCHAR(255),
     radio_afectacion_km DECIMAL(8,2),
     fuente_api VARCHAR(50) DEFAULT 'USGS',
+    revision BIGINT NOT NULL DEFAULT 0,
+    version_impactos INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, fecha_utc),
+    UNIQUE KEY uq_event_fecha (event_id, fecha_utc),
     INDEX idx_fecha (fecha_utc),
     INDEX idx_magnitud (magnitud),
-    INDEX idx_event (event_id)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    INDEX idx_event (event_id),
+    INDEX idx_revision (revision)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (TO_DAYS(fecha_utc)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
 
 CREATE TABLE IF NOT EXISTS impactos_pais (
-    id INT AUTO_INCREMENT PRIMARY KEY,
+    id INT AUTO_INCREMENT,
     event_id VARCHAR(50) NOT NULL,
     pais VARCHAR(100) NOT NULL,
     ciudades_afectadas JSON,
@@ -32,12 +58,45 @@ CREATE TABLE IF NOT EXISTS impactos_pais (
     codigo_construccion VARCHAR(255),
     nivel_preparacion_sismica VARCHAR(50),
     densidad_poblacional VARCHAR(50),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (event_id) REFERENCES eventos_sismicos(event_id) ON DELETE CASCADE,
+    version_impactos INT NOT NULL DEFAULT 0,
+    modelo_ia VARCHAR(100),
+    version_prompt VARCHAR(20),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at),
     INDEX idx_event_pais (event_id, pais),
+    INDEX idx_event_version (event_id, version_impactos),
     INDEX idx_pais (pais),
     INDEX idx_nivel (nivel_destruccion),
     INDEX idx_fecha (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- Alternate USGS network IDs of stored events (merged duplicates, old preferred IDs)
+CREATE TABLE IF NOT EXISTS alias_eventos (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    alias_id VARCHAR(50) NOT NULL,
+    event_id VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_alias (alias_id),
+    INDEX idx_alias_event (event_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Bulk re-assessments; impactos_pais.version_impactos = id for the rows they wrote
+CREATE TABLE IF NOT EXISTS campanias_inferencia (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    modelo_ia VARCHAR(100) NOT NULL,
+    version_prompt VARCHAR(20) NOT NULL,
+    filtro JSON,
+    estado VARCHAR(20) NOT NULL DEFAULT 'en_curso',
+    total_eventos INT NOT NULL DEFAULT 0,
+    eventos_procesados INT NOT NULL DEFAULT 0,
+    fallos INT NOT NULL DEFAULT 0,
+    checkpoint_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    activated_at TIMESTAMP NULL,
+    INDEX idx_activated (activated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 CREATE TABLE IF NOT EXISTS cache_inferencias (
@@ -0,0 +1,9 @@
+-- Sync token column for GET /api/events/changes and /ws replay
+-- Existing rows get their primary key as revision, which sorts below every
+-- clock-based revision written afterwards.
+
+ALTER TABLE eventos_sismicos
+    ADD COLUMN revision BIGINT NOT NULL DEFAULT 0 AFTER fuente_api,
+    ADD INDEX idx_revision (revision);
+
+UPDATE eventos_sismicos SET revision = id WHERE revision = 0;
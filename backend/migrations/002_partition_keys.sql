@@ -0,0 +1,18 @@
+-- Prepare eventos_sismicos and impactos_pais for monthly RANGE partitioning
+-- MariaDB requires the partitioning column in every unique key and does not
+-- support foreign keys on partitioned tables. event_id uniqueness is
+-- enforced by SeismicProcessor, which checks before inserting. The
+-- partitions themselves are created by `python -m migrations apply`.
+
+ALTER TABLE impactos_pais DROP FOREIGN KEY impactos_pais_ibfk_1;
+
+ALTER TABLE impactos_pais
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, created_at);
+
+ALTER TABLE eventos_sismicos
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, fecha_utc),
+    DROP INDEX event_id,
+    ADD UNIQUE KEY uq_event_fecha (event_id, fecha_utc);
@@ -0,0 +1,13 @@
+-- Alternate USGS network IDs of stored events
+-- An event published under several network IDs (the feature's "ids"
+-- property) or whose preferred ID changed is stored once; the other IDs are
+-- recorded here and resolved to the canonical event_id.
+
+CREATE TABLE IF NOT EXISTS alias_eventos (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    alias_id VARCHAR(50) NOT NULL,
+    event_id VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_alias (alias_id),
+    INDEX idx_alias_event (event_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,39 @@
+-- Versioned impact assessments for bulk re-inference campaigns
+-- Every impactos_pais row belongs to a generation: 0 for live ingestion,
+-- or the campanias_inferencia.id that wrote it. eventos_sismicos points at
+-- the generation the API serves, so a campaign's rows stay invisible until
+-- it is activated, which flips all its events in one transaction.
+
+ALTER TABLE eventos_sismicos
+    ADD COLUMN version_impactos INT NOT NULL DEFAULT 0 AFTER revision;
+
+ALTER TABLE impactos_pais
+    ADD COLUMN version_impactos INT NOT NULL DEFAULT 0 AFTER densidad_poblacional,
+    ADD COLUMN modelo_ia VARCHAR(100) NULL AFTER version_impactos,
+    ADD COLUMN version_prompt VARCHAR(20) NULL AFTER modelo_ia,
+    ADD INDEX idx_event_version (event_id, version_impactos);
+
+-- Archive tables created by earlier retention runs need the same columns,
+-- their partitions are copied with SELECT *
+ALTER TABLE IF EXISTS eventos_sismicos_archive
+    ADD COLUMN IF NOT EXISTS version_impactos INT NOT NULL DEFAULT 0 AFTER revision;
+
+ALTER TABLE IF EXISTS impactos_pais_archive
+    ADD COLUMN IF NOT EXISTS version_impactos INT NOT NULL DEFAULT 0 AFTER densidad_poblacional,
+    ADD COLUMN IF NOT EXISTS modelo_ia VARCHAR(100) NULL AFTER version_impactos,
+    ADD COLUMN IF NOT EXISTS version_prompt VARCHAR(20) NULL AFTER modelo_ia;
+
+CREATE TABLE IF NOT EXISTS campanias_inferencia (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    modelo_ia VARCHAR(100) NOT NULL,
+    version_prompt VARCHAR(20) NOT NULL,
+    filtro JSON,
+    estado VARCHAR(20) NOT NULL DEFAULT 'en_curso',
+    total_eventos INT NOT NULL DEFAULT 0,
+    eventos_procesados INT NOT NULL DEFAULT 0,
+    fallos INT NOT NULL DEFAULT 0,
+    checkpoint_at TIMESTAMP NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    activated_at TIMESTAMP NULL,
+    INDEX idx_activated (activated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,56 @@
+"""
+Schema migrations and partition maintenance
+
+    python -m migrations apply              # pending NNN_*.sql files, then partition tables
+    python -m migrations ensure             # pre-create monthly partitions
+    python -m migrations archive --keep-months 24
+    python -m migrations status
+
+Run from the backend directory with the same environment as the API.
+"""
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import engine
+from app.services.partitions import (
+    PARTITIONED_TABLES,
+    apply_migrations,
+    archive_partitions,
+    ensure_partitions,
+    list_partitions,
+    partition_table,
+)
+
+
+async def main(args):
+    async with engine.begin() as conn:
+        if args.command == "apply":
+            ran = await apply_migrations(conn)
+            print(f"Applied migrations: {', '.join(ran) or 'none'}")
+            for table in PARTITIONED_TABLES:
+                if await partition_table(conn, table, args.months_ahead):
+                    print(f"Partitioned {table}")
+        elif args.command == "ensure":
+            for table in PARTITIONED_TABLES:
+                created = await ensure_partitions(conn, table, args.months_ahead)
+                print(f"{table}: {len(created)} new partitions")
+        elif args.command == "archive":
+            moved = await archive_partitions(conn, args.keep_months)
+            print(f"Archived: {', '.join(moved) or 'nothing'}")
+        elif args.command == "status":
+            for table in PARTITIONED_TABLES:
+                names = await list_partitions(conn, table)
+                print(f"{table}: {', '.join(names) if names else 'not partitioned'}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m migrations", description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=["apply", "ensure", "archive", "status"])
+    parser.add_argument("--months-ahead", type=int, default=settings.partition_months_ahead)
+    parser.add_argument("--keep-months", type=int, default=settings.partition_retention_months)
+    args = parser.parse_args()
+    if args.command == "archive" and args.keep_months <= 0:
+        parser.error("archive needs --keep-months > 0 (or PARTITION_RETENTION_MONTHS)")
+    asyncio.run(main(args))
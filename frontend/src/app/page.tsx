@@ -28,7 +28,7 @@ export default function Home() {
   const fetchEvents = useCallback(async () => {
     try {
       setLoading(true);
-      const response = await eventsApi.getEvents({
+      const response = await eventsApi.getEventsColumnar({
         limit: 100,  // Fetch all events for map and statistics
         ...filters,
       });
@@ -71,6 +71,9 @@ export default function Home() {
         fetchEvents();
         // Show notification (you could add a toast here)
         console.log('New earthquake detected:', message.data);
+      } else if (message.type === 'resync_required') {
+        // Missed more events than the server buffers while disconnected
+        fetchEvents();
       }
     });
 
@@ -1,5 +1,13 @@
 import axios from 'axios';
-import { EventsResponse, EventWithImpacts, Statistics } from '@/types';
+import {
+  EventsResponse,
+  EventsColumnsResponse,
+  EventsBatchResponse,
+  EventTile,
+  EventWithImpacts,
+  SeismicEvent,
+  Statistics,
+} from '@/types';
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -8,24 +16,57 @@ const api = axios.create({
   timeout: 30000,
 });
 
+export type EventsQuery = {
+  limit?: number;
+  offset?: number;
+  min_magnitude?: number;
+  max_magnitude?: number;
+  start_date?: string;
+  end_date?: string;
+  include?: 'impacts';
+};
+
 export const eventsApi = {
-  getEvents: async (params?: {
-    limit?: number;
-    offset?: number;
-    min_magnitude?: number;
-    max_magnitude?: number;
-    start_date?: string;
-    end_date?: string;
-  }): Promise<EventsResponse> => {
+  getEvents: async (params?: EventsQuery): Promise<EventsResponse> => {
     const response = await api.get('/api/events/', { params });
     return response.data;
   },
 
+  // Same filters as getEvents, fetched in the compact columnar layout
+  getEventsColumnar: async (params?: EventsQuery): Promise<EventsResponse> => {
+    const response = await api.get<EventsColumnsResponse>('/api/events/', {
+      params: { ...params, format: 'columns' },
+    });
+    const { columns, data, ...page } = response.data;
+    const events = Array.from({ length: page.total }, (_, i) => {
+      const event: Record<string, any> = {};
+      columns.forEach((name) => {
+        event[name] = data[name][i];
+      });
+      return event as SeismicEvent;
+    });
+    return { ...page, events };
+  },
+
   getEventDetail: async (eventId: string): Promise<EventWithImpacts> => {
     const response = await api.get(`/api/events/${eventId}`);
     return response.data;
   },
 
+  // Several events with impacts in one request (max 200 IDs)
+  getEventsBatch: async (eventIds: string[]): Promise<EventsBatchResponse> => {
+    const response = await api.get('/api/events/batch', {
+      params: { ids: eventIds.join(',') },
+    });
+    return response.data;
+  },
+
+  // Pre-aggregated clusters for one map tile (zoom 0-12)
+  getEventTile: async (z: number, x: number, y: number): Promise<EventTile> => {
+    const response = await api.get(`/api/events/tiles/${z}/${x}/${y}`);
+    return response.data;
+  },
+
   getEventsByCountry: async (
     countryName: string,
     params?: { limit?: number; offset?: number }
@@ -1,9 +1,11 @@
-import { EventWithImpacts } from '@/types';
+import { EventWithImpacts, Statistics } from '@/types';
 
 type WebSocketMessage = {
-  type: 'connection' | 'new_earthquake' | 'pong' | 'echo';
+  type: 'connection' | 'new_earthquake' | 'stats_update' | 'resync_required' | 'pong' | 'echo';
   message?: string;
-  data?: EventWithImpacts;
+  data?: EventWithImpacts | Statistics;  // Statistics for stats_update (last 30 days)
+  revision?: string | null;  // new_earthquake only; sent back as ?since= on reconnect
+  sync_token?: string;  // resync_required: refetch via /api/events/changes
   timestamp?: number;
 };
 
@@ -15,6 +17,7 @@ class WebSocketClient {
   private handlers: MessageHandler[] = [];
   private reconnectInterval: number = 5000;
   private reconnectTimer: NodeJS.Timeout | null = null;
+  private lastRevision: string | null = null;
 
   constructor(url: string) {
     this.url = url;
@@ -26,7 +29,11 @@ class WebSocketClient {
     }
 
     try {
-      this.ws = new WebSocket(this.url);
+      // Ask the server to replay anything missed while disconnected
+      const url = this.lastRevision
+        ? `${this.url}${this.url.includes('?') ? '&' : '?'}since=${this.lastRevision}`
+        : this.url;
+      this.ws = new WebSocket(url);
 
       this.ws.onopen = () => {
         console.log('WebSocket connected');
@@ -39,6 +46,9 @@ class WebSocketClient {
       this.ws.onmessage = (event) => {
         try {
           const message: WebSocketMessage = JSON.parse(event.data);
+          if (message.type === 'new_earthquake' && message.revision) {
+            this.lastRevision = message.revision;
+          }
           this.handlers.forEach((handler) => handler(message));
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
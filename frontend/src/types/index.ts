@@ -8,6 +8,7 @@ export interface SeismicEvent {
   lugar: string;
   radio_afectacion_km: number | null;
   fuente_api: string;
+  impacts?: ImpactData[];  // Only with include=impacts
 }
 
 export interface ImpactData {
@@ -17,7 +18,7 @@ export interface ImpactData {
   heridos_estimados: number;
   perdidas_monetarias_usd: number;
   nivel_destruccion: 'BAJO' | 'MODERADO' | 'ALTO' | 'CATASTROFICO' | 'Bajo' | 'Moderado' | 'Alto' | 'Catastrofico';
-  fuentes_inferidas: string[];
+  fuentes_inferidas?: string[];  // Omitted in view=summary
   razonamiento_ia?: string;  // NEW: AI reasoning explanation
   factores_considerados?: string[];  // NEW: Factors considered by AI
   codigo_construccion?: string;  // NEW: Building code information
@@ -37,6 +38,38 @@ export interface EventsResponse {
   events: SeismicEvent[];
 }
 
+// GET /api/events/?format=columns: one array per field
+export interface EventsColumnsResponse {
+  total: number;
+  limit: number;
+  offset: number;
+  columns: (keyof SeismicEvent)[];
+  data: Record<string, any[]>;
+}
+
+// GET /api/events/tiles/{z}/{x}/{y}: up to 8x8 clusters per slippy-map tile
+export interface TileCluster {
+  count: number;
+  max_magnitude: number;
+  max_magnitude_event_id: string;
+  latitude: number;
+  longitude: number;
+}
+
+export interface EventTile {
+  z: number;
+  x: number;
+  y: number;
+  total_events: number;
+  clusters: TileCluster[];
+}
+
+export interface EventsBatchResponse {
+  total: number;
+  events: EventWithImpacts[];
+  missing: string[];
+}
+
 export interface Statistics {
   period_days: number;
   total_events: number;
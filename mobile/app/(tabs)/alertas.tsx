@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import {
   View,
   StyleSheet,
@@ -72,6 +72,8 @@ export default function AlertasScreen() {
   const [events, setEvents] = useState<SeismicEvent[]>([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
+  // Highest revision seen; pull-to-refresh only downloads newer changes
+  const syncToken = useRef<string | null>(null);
 
   useEffect(() => {
     fetchEvents();
@@ -86,6 +88,8 @@ export default function AlertasScreen() {
         (a, b) => new Date(b.fecha_utc).getTime() - new Date(a.fecha_utc).getTime()
       );
       setEvents(sorted);
+      const revisions = sorted.map((event) => event.revision ?? 0);
+      syncToken.current = revisions.length ? String(Math.max(...revisions)) : null;
     } catch (err) {
       console.error('Error fetching events:', err);
     } finally {
@@ -93,9 +97,39 @@ export default function AlertasScreen() {
     }
   };
 
+  const fetchChanges = async (since: string) => {
+    try {
+      let token = since;
+      const changed: SeismicEvent[] = [];
+      let hasMore = true;
+      while (hasMore) {
+        const response = await eventsApi.getChanges(token);
+        changed.push(...response.events);
+        token = response.sync_token;
+        hasMore = response.has_more;
+      }
+      syncToken.current = token;
+      if (!changed.length) return;
+
+      setEvents((current) => {
+        const byId = new Map(current.map((event) => [event.event_id, event]));
+        changed.forEach((event) => byId.set(event.event_id, event));
+        return Array.from(byId.values())
+          .sort((a, b) => new Date(b.fecha_utc).getTime() - new Date(a.fecha_utc).getTime())
+          .slice(0, 50);
+      });
+    } catch (err) {
+      console.error('Error fetching event changes:', err);
+    }
+  };
+
   const onRefresh = async () => {
     setRefreshing(true);
-    await fetchEvents();
+    if (syncToken.current) {
+      await fetchChanges(syncToken.current);
+    } else {
+      await fetchEvents();
+    }
     setRefreshing(false);
   };
 
@@ -1,5 +1,5 @@
 import axios, { AxiosInstance } from 'axios';
-import { SeismicEvent, EventsListResponse, FilterValues } from './types';
+import { SeismicEvent, EventsListResponse, EventChangesResponse, FilterValues } from './types';
 import { apiConfig } from './config';
 
 const API_BASE_URL = apiConfig.apiUrl;
@@ -82,6 +82,18 @@ class EventsAPI {
     }
   }
 
+  async getChanges(since: string, limit?: number): Promise<EventChangesResponse> {
+    try {
+      const params = new URLSearchParams({ since });
+      if (limit) params.append('limit', limit.toString());
+      const response = await this.client.get<EventChangesResponse>('/events/changes', { params });
+      return response.data;
+    } catch (error) {
+      console.error('❌ Error fetching event changes:', error);
+      throw error;
+    }
+  }
+
   async getEventDetail(eventId: string): Promise<SeismicEvent> {
     try {
       const response = await this.client.get<SeismicEvent>(`/events/${eventId}`);
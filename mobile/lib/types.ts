@@ -10,6 +10,7 @@ export interface SeismicEvent {
   lugar: string;
   radio_afectacion_km?: number;
   fuente_api: string;
+  revision?: number;
   created_at: string;
 }
 
@@ -40,6 +41,14 @@ export interface EventsListResponse {
   offset: number;
 }
 
+// Events created or updated after a sync token, oldest change first
+export interface EventChangesResponse {
+  events: SeismicEvent[];
+  total: number;
+  sync_token: string;
+  has_more: boolean;
+}
+
 // Filter Interface
 export interface FilterValues {
   minMagnitude?: number;